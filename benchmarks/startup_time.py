@@ -0,0 +1,63 @@
+"""
+Startup-time benchmark for the command line entry point.
+
+Measures how long `python main.py --help` and loading the settings take, and checks
+that no heavy subsystem is imported before a command needs it.
+Exits with status 1 on regression, so it can be run as a CI step:
+
+    python benchmarks/startup_time.py --runs 10 --max-ms 250
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be loaded by importing main or building settings
+HEAVY_MODULES = ('cv2', 'numpy', 'pytesseract', 'spylls', 'pymorphy2', 'sqlite3', 'kraken', 'torch')
+
+IMPORT_CHECK = (
+    "import sys, main, config.settings as s; s.get_settings(); "
+    "print(','.join(m for m in {modules!r} if m in sys.modules))"
+)
+
+def time_command(command, runs):
+    """Returns wall times (ms) of running the command `runs` times."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help="Number of measured runs")
+    parser.add_argument('--max-ms', type=float, default=250.0, help="Allowed median startup time")
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(time_command([sys.executable, '-c', 'pass'], args.runs))
+    startup = statistics.median(time_command([sys.executable, 'main.py', '--help'], args.runs))
+    print(f"Interpreter startup: {baseline:.1f} ms")
+    print(f"main.py --help:      {startup:.1f} ms (overhead {startup - baseline:.1f} ms)")
+
+    loaded = subprocess.run(
+        [sys.executable, '-c', IMPORT_CHECK.format(modules=HEAVY_MODULES)],
+        cwd=REPO_DIR, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+    failed = False
+    if loaded:
+        print(f"[!] Heavy modules imported at startup: {loaded}")
+        failed = True
+    if startup > args.max_ms:
+        print(f"[!] Startup time {startup:.1f} ms exceeds {args.max_ms:.1f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,396 @@
 import os
+import json
 
-# --- Image Processing Settings ---
-settings = {
-    # --- Path Settings ---
-    # All paths are relative to current working directory
-    'BASE_DIR': os.getcwd(),
-
-    # Image folders
-    'INPUT_FOLDER': os.path.join(os.getcwd(), "input_images"),
-    'PROCESSED_FOLDER': os.path.join(os.getcwd(), "processed_images"),
-
-    # Output directory
-    'OUTPUT_DIR': os.path.join(os.getcwd(), "output"),
-
-    # Main recognition output file
-    'OUTPUT_TEXT_FILE': os.path.join(os.getcwd(), "output", "recognized_text.txt"),
-
-    # Post-processing files
-    'CLEANED_TEXT_FILE': os.path.join(os.getcwd(), "output", "cleaned_text.txt"),
-    'SPELLCHECKED_TEXT_FILE': os.path.join(os.getcwd(), "output", "spell_checked_text.txt"),
-    'TSV_OUTPUT_FILE': os.path.join(os.getcwd(), "output", "recognized_text.tsv"),
-
-    # Dictionaries
-    'CUSTOM_DICTIONARIES_DIR': os.path.join(os.getcwd(), "resources", "dictionaries", "custom_ru"),
-    'HUNSPELL_DICT_PATH': os.path.join(os.getcwd(), "resources", "dictionaries", "ru_RU"),
-
-    # Logs
-    'SPELLCHECK_LOG_PATH': os.path.join(os.getcwd(), "logs", "spell_log.txt"),
-    
-    # --- Operation Modes ---
-    'ENABLE_OCR': True,                              # Enable OCR text recognition (False = image processing only)
-    'SKIP_PREPROCESSING': True,                      # Skip preprocessing (True = OCR only without image enhancement)
-    'ENABLE_POSTPROCESSING': True,                   # Enable postprocessing (cleanup, spellcheck, formatting)
-    
-    # --- Color Settings ---
-    'FORCE_GRAYSCALE': True,                          # Convert images to grayscale before processing
-    
-    # --- Brightness/Contrast Settings ---
-    'APPLY_BRIGHTNESS': True,                         # Enable brightness correction
-    'BRIGHTNESS_GRADIENT_TYPE': 'vertical',           # Gradient type: 'radial', 'horizontal', 'vertical', 'edges'
-    'BRIGHTNESS_GRADIENT_DIRECTION': 'top_to_bottom', # Gradient direction 
-                                                      # ('left_to_right', 'right_to_left', 'top_to_bottom', 'bottom_to_top')
-    'BRIGHTNESS_STRENGTH': 0.1,                       # Brightness effect strength (0-1)
-    'ENHANCE_CONTRAST': True,                         # Enable contrast enhancement
-    'CONTRAST_CLIP_LIMIT': (1, 99),                   # Histogram clip percentiles for contrast stretching
-    'CORRECT_BRIGHTNESS_CONTRAST_GAMMA': True,        # Enable brightness, contrast, gamma correction
-    'BRIGHTNESS': -73,                                # Brightness adjustment (-255 to +255),
-                                                      # working value: -73 (optimized for specific use case)
-    'CONTRAST': 30,                                   # Contrast adjustment (-127 to +127), 
-                                                      # working value: 30 (optimized for specific use case)
-    'GAMMA': 4.80,                                    # Gamma correction (1.0=no change), 
-                                                      # working value: 4.80 (optimized for specific use case)
-    
-    # --- Cropping Settings ---
-    'CROP': True,                                     # Enable automatic image cropping
-    'CROP_PADDING': 0,                                # Additional padding (in pixels) for cropped edges
-
-    'STABILITY_RANGE': 10,                            # Pixel range for edge detection stability zone
-                                                      # the area after brightness transition where luminosity should stabilize
-
-    'CENTER_BOX_MARGIN': {                            # Margins from image edges defining the central area 
-                                                      # where edge detection begins (avoids false border detection)
-        'left': 0.15,                                 # Left margin as percentage of image width
-        'right': 0.15,                                # Right margin as percentage of image width
-        'top': 0.15,                                  # Top margin as percentage of image height
-        'bottom': 0.15                                # Bottom margin as percentage of image height
-    },
+# Environment variable with the path to a JSON configuration file
+CONFIG_ENV_VAR = 'DOCUMENTARIUM_CONFIG'
 
-    'BRIGHTNESS_DIFF_THRESHOLD': {                    # Brightness difference threshold for edge detection
-        'left': 30,                                   # Left edge threshold (0-255)
-        'right': 30,                                  # Right edge threshold (0-255)
-        'top': 30,                                    # Top edge threshold (0-255)
-        'bottom': 30                                  # Bottom edge threshold (0-255)
-    },
-    
-    # --- Rotation Settings ---
-    'ROTATE': True,                                   # Enable automatic image rotation
-    'ROTATION_ANGLE': 90,                             # Rotation angle (degrees or 'auto')
-    'ROTATION_METHOD': 'auto',                        # Rotation detection method ('auto','horizontal','vertical')
-    'FINE_ROTATION': True,                            # Enable fine rotation adjustment after initial rotation
-    
-    # --- OCR Settings ---
-    'DOCUMENT_TYPE': 'typewritten',                   # Document content type ('typewritten' or 'handwritten')    
-    'OCR_LANGUAGE': 'rus',                            # Language code for OCR engine ('rus', 'deu', 'lav', or 'auto')
-    'SPELLCHECK_LANGUAGE': 'ru'                       # Language code for spell checker (ISO format: 'ru', 'de', 'lv')
+# Prefix of environment variables overriding single settings, e.g. DOCUMENTARIUM_GAMMA=2.5
+ENV_PREFIX = 'DOCUMENTARIUM_'
 
+# OCR speed/accuracy profiles (OCR_PROFILE): engine, segmentation, resolution, preprocessing steps
+# and confidence cutoff. Compare them on ground truth pages with `python main.py evaluate`.
+OCR_PROFILES = {
+    # LSTM engine on binarized pages reduced to 200 dpi, no deskew or illumination correction
+    'fast': {
+        'OCR_ENGINE_MODE': 1,
+        'OCR_PAGE_SEGMENTATION_MODE': 6,
+        'NORMALIZE_RESOLUTION': True,
+        'RESOLUTION_TARGET_DPI': 200,
+        'FINE_ROTATION': False,
+        'APPLY_BRIGHTNESS': False,
+        'BINARIZE': True,
+        'OCR_MIN_CONFIDENCE': 40,
+    },
+    # LSTM engine on binarized pages at 300 dpi, full preprocessing
+    'balanced': {
+        'OCR_ENGINE_MODE': 1,
+        'OCR_PAGE_SEGMENTATION_MODE': 6,
+        'NORMALIZE_RESOLUTION': True,
+        'RESOLUTION_TARGET_DPI': 300,
+        'FINE_ROTATION': True,
+        'APPLY_BRIGHTNESS': True,
+        'BINARIZE': True,
+        'OCR_MIN_CONFIDENCE': 50,
+    },
+    # Default engine on greyscale pages at native resolution, full preprocessing
+    'accurate': {
+        'OCR_ENGINE_MODE': 3,
+        'OCR_PAGE_SEGMENTATION_MODE': 6,
+        'NORMALIZE_RESOLUTION': False,
+        'FINE_ROTATION': True,
+        'APPLY_BRIGHTNESS': True,
+        'BINARIZE': False,
+        'OCR_MIN_CONFIDENCE': 50,
+    },
 }
 
-# --- Create Required Directories ---
-os.makedirs(settings['INPUT_FOLDER'], exist_ok=True)
-os.makedirs(settings['PROCESSED_FOLDER'], exist_ok=True)
-os.makedirs(settings['OUTPUT_DIR'], exist_ok=True)
+# Profile settings read only by the preprocessing steps (no effect with SKIP_PREPROCESSING)
+PREPROCESSING_KEYS = ('FINE_ROTATION', 'APPLY_BRIGHTNESS', 'BINARIZE')
+
+def default_settings(base_dir=None, output_dir=None) -> dict:
+    """
+    Returns the default settings with all paths under the base directory.
+
+    Args:
+        base_dir (str): Base directory (current working directory if not set)
+        output_dir (str): Directory of the result files (default: "output" under the base directory)
+
+    Returns:
+        dict: Default settings
+    """
+    base_dir = base_dir or os.getcwd()
+    output_dir = output_dir or os.path.join(base_dir, "output")
+
+    # --- Image Processing Settings ---
+    return {
+        # --- Path Settings ---
+        # All paths are relative to the base directory (current working directory by default)
+        'BASE_DIR': base_dir,
+
+        # Image folders
+        'INPUT_FOLDER': os.path.join(base_dir, "input_images"),
+        'BATCH_NAME': None,                              # Batch identity in the export database and search index
+                                                         # (None = absolute path of INPUT_FOLDER)
+        'PROCESSED_FOLDER': os.path.join(base_dir, "processed_images"),
+
+        # Output directory
+        'OUTPUT_DIR': output_dir,
+
+        # Main recognition output file
+        'OUTPUT_TEXT_FILE': os.path.join(output_dir, "recognized_text.txt"),
+
+        # Stored Tesseract word tables (.npz per page) for re-thresholding without re-OCR
+        'WORD_DATA_FOLDER': os.path.join(output_dir, "word_data"),
+
+        # Batch manifest (page statuses, duplicate groups)
+        'MANIFEST_FILE': os.path.join(output_dir, "manifest.json"),
+
+        # Page hashes with OCR results, shared across batches for duplicate detection
+        'PAGE_HASH_INDEX_FILE': os.path.join(output_dir, "page_hashes.db"),
+
+        # Post-processing files
+        'CLEANED_TEXT_FILE': os.path.join(output_dir, "cleaned_text.txt"),
+        'SPELLCHECKED_TEXT_FILE': os.path.join(output_dir, "spell_checked_text.txt"),
+        'TSV_OUTPUT_FILE': os.path.join(output_dir, "recognized_text.tsv"),
+
+        # Structured export database
+        'EXPORT_DB_FILE': os.path.join(output_dir, "inventory.db"),
+
+        # Full-text search index
+        'SEARCH_INDEX_FILE': os.path.join(output_dir, "search_index.db"),
+
+        # Dictionaries
+        'CUSTOM_DICTIONARIES_DIR': os.path.join(base_dir, "resources", "dictionaries", "custom_ru"),
+        'HUNSPELL_DICT_PATH': os.path.join(base_dir, "resources", "dictionaries", "ru_RU"),
+
+        # Preprocessing settings profile written by the parameter tuner (usable with --config)
+        'TUNING_PROFILE_FILE': os.path.join(output_dir, "tuned_profile.json"),
+
+        # Estimated vs measured peak memory per page (calibration of the memory scheduler)
+        'MEMORY_PROFILE_FILE': os.path.join(base_dir, "logs", "memory_profile.tsv"),
+
+        # Stage statistics of the staged pipeline (worker utilization, queue depths)
+        'PIPELINE_STATS_FILE': os.path.join(output_dir, "pipeline_stats.json"),
+
+        # Job store for multi-node processing (must be on storage shared by all nodes)
+        'QUEUE_DB_FILE': os.path.join(output_dir, "queue.db"),
+
+        # Kraken models for handwritten documents (segmentation: None = Kraken default baseline model)
+        'KRAKEN_SEGMENTATION_MODEL': None,
+        'KRAKEN_RECOGNITION_MODEL': os.path.join(base_dir, "resources", "models", "kraken_ru.mlmodel"),
+
+        # Logs
+        'SPELLCHECK_LOG_PATH': os.path.join(base_dir, "logs", "spell_log.txt"),
+
+        # --- Operation Modes ---
+        'ENABLE_OCR': True,                              # Enable OCR text recognition (False = image processing only)
+        'SKIP_PREPROCESSING': True,                      # Skip preprocessing (True = OCR only without image enhancement)
+        'DEDUPLICATE_PAGES': False,                      # Reuse OCR results of near-duplicate pages (rescans, re-exports)
+        'DUPLICATE_MAX_DISTANCE': 4,                     # Max perceptual hash difference (bits of 64) for a duplicate
+        'DUPLICATE_MAX_DIFFERENCE': 0.03,                # Max local share of unmatched ink of the aligned 1600 px pages
+                                                         # (rescans stay at ~0, one changed digit gives ~0.1)
+        'REUSE_WORD_DATA': False,                        # Rebuild text from stored word tables instead of running OCR
+        'ENABLE_POSTPROCESSING': True,                   # Enable postprocessing (cleanup, spellcheck, formatting)
+        'ENABLE_EXPORT': True,                           # Export parsed inventory entries to SQLite and TSV
+        'EXPORT_BATCH_SIZE': 5000,                       # Rows per batched insert transaction
+        'ENABLE_SEARCH_INDEX': True,                     # Add spell-checked entries to the full-text search index
+        'SEARCH_USE_LEMMAS': True,                       # Index and search lemma-normalized words (pymorphy2)
+
+        # --- Blank Page Detection ---
+        'DETECT_BLANK_PAGES': True,                       # Skip processing and OCR of blank pages (versos, separator sheets)
+        'BLANK_THUMBNAIL_SIZE': 256,                      # Longest side (px) of the thumbnail used for the metrics
+        'BLANK_CENTER_MARGIN': 0.1,                       # Share of each side ignored (scanner background around the sheet)
+        'BLANK_MIN_INK_DELTA': 12,                        # Ink is below the Otsu split of the page, at least this much darker
+                                                          # than the paper (0-255)
+        'BLANK_MAX_INK_RATIO': 0.002,                     # Blank if the share of ink pixels is below this,
+        'BLANK_MAX_EDGE_DENSITY': 0.01,                   # the share of edge pixels is below this,
+        'BLANK_MIN_SPREAD': 40,                           # and the 1-99 percentile brightness spread is below this
+
+        # --- Color Settings ---
+        'FORCE_GRAYSCALE': True,                          # Convert images to grayscale before processing
+
+        # --- Brightness/Contrast Settings ---
+        'APPLY_BRIGHTNESS': True,                         # Enable brightness correction
+        'BRIGHTNESS_GRADIENT_TYPE': 'vertical',           # Gradient type: 'radial', 'horizontal', 'vertical', 'edges'
+        'BRIGHTNESS_GRADIENT_DIRECTION': 'top_to_bottom', # Gradient direction 
+                                                          # ('left_to_right', 'right_to_left', 'top_to_bottom', 'bottom_to_top')
+        'BRIGHTNESS_STRENGTH': 0.1,                       # Brightness effect strength (0-1)
+        'ENHANCE_CONTRAST': True,                         # Enable contrast enhancement
+        'CONTRAST_CLIP_LIMIT': (1, 99),                   # Histogram clip percentiles for contrast stretching
+        'CORRECT_BRIGHTNESS_CONTRAST_GAMMA': True,        # Enable brightness, contrast, gamma correction
+        'BRIGHTNESS': -73,                                # Brightness adjustment (-255 to +255),
+                                                          # working value: -73 (optimized for specific use case)
+        'CONTRAST': 30,                                   # Contrast adjustment (-127 to +127), 
+                                                          # working value: 30 (optimized for specific use case)
+        'GAMMA': 4.80,                                    # Gamma correction (1.0=no change), 
+                                                          # working value: 4.80 (optimized for specific use case)
+
+        # --- Decoding Settings ---
+        'REDUCED_DECODE': True,                           # Decode a reduced greyscale copy (IMREAD_REDUCED_*) for blank
+                                                          # detection, duplicate hashing and geometry estimation;
+                                                          # full resolution is decoded only for the final render
+                                                          # (greyscale when FORCE_GRAYSCALE is set)
+
+        # --- Geometry Settings ---
+        'GEOMETRY_ANALYSIS_MAX_SIDE': 2000,               # Longest side (px) of the greyscale copy used to estimate
+                                                          # rotation, deskew and crop (None = full resolution);
+                                                          # the page itself is resampled once at full resolution
+
+        # --- Binarization Settings ---
+        'BINARIZE': False,                                # Local thresholding to black and white before OCR
+        'BINARIZATION_METHOD': 'sauvola',                 # 'sauvola', 'niblack' or 'otsu' (global)
+        'BINARIZATION_WINDOW': 31,                        # Window side (px), about 1-2 character heights (31 px at 300 dpi)
+        'BINARIZATION_K': None,                           # Sensitivity (None = 0.2 for Sauvola, -0.2 for Niblack)
+        'BINARIZATION_R': 128,                            # Sauvola dynamic range of the standard deviation
+        'SAVE_BILEVEL_TIFF': True,                        # Save binarized pages as 1-bit CCITT G4 TIFF
+
+        # --- Cropping Settings ---
+        'CROP': True,                                     # Enable automatic image cropping
+        'CROP_PADDING': 0,                                # Additional padding (in pixels) for cropped edges
+
+        'STABILITY_RANGE': 10,                            # Pixel range for edge detection stability zone
+                                                          # the area after brightness transition where luminosity should stabilize
+
+        'CENTER_BOX_MARGIN': {                            # Margins from image edges defining the central area 
+                                                          # where edge detection begins (avoids false border detection)
+            'left': 0.15,                                 # Left margin as percentage of image width
+            'right': 0.15,                                # Right margin as percentage of image width
+            'top': 0.15,                                  # Top margin as percentage of image height
+            'bottom': 0.15                                # Bottom margin as percentage of image height
+        },
+
+        'BRIGHTNESS_DIFF_THRESHOLD': {                    # Brightness difference threshold for edge detection
+            'left': 30,                                   # Left edge threshold (0-255)
+            'right': 30,                                  # Right edge threshold (0-255)
+            'top': 30,                                    # Top edge threshold (0-255)
+            'bottom': 30                                  # Bottom edge threshold (0-255)
+        },
+
+        # --- Rotation Settings ---
+        'ROTATE': True,                                   # Enable automatic image rotation
+        'ROTATION_ANGLE': 90,                             # Rotation angle (degrees or 'auto')
+        'ROTATION_METHOD': 'auto',                        # Rotation detection method ('auto','horizontal','vertical')
+        'FINE_ROTATION': True,                            # Enable fine rotation adjustment after initial rotation
+
+        # --- Parallel Processing Settings ---
+        'PROCESS_WORKERS': 1,                             # Worker processes for preprocessing and OCR
+                                                          # (1 = sequential, None = number of CPU cores)
+        'MEMORY_BUDGET_MB': None,                         # Memory for pages in flight (None = 70% of physical memory)
+        'MEMORY_WORKER_BASE_MB': 200,                     # Resident size of an idle worker process
+        'MEMORY_BYTES_PER_PIXEL': 40,                     # Peak working set per page pixel (see MEMORY_PROFILE_FILE)
+        'MEMORY_PAGE_BASE_MB': 30,                        # Peak working set per page independent of its size
+
+        # --- Staged Pipeline Settings (decode -> preprocess -> OCR -> postprocess) ---
+        'STAGED_PIPELINE': False,                         # Run the stages in separate worker groups with shared-memory
+                                                          # page buffers (full pipeline only; needs SKIP_PREPROCESSING
+                                                          # and REUSE_WORD_DATA set to False)
+        'PIPELINE_WORKERS': {                             # Worker processes per stage (None = half of the CPU cores
+            'decode': 1,                                  # for preprocess and OCR); rebalance with the utilization
+            'preprocess': None,                           # and queue depths in PIPELINE_STATS_FILE
+            'ocr': None,
+            'postprocess': 1
+        },
+        'PIPELINE_QUEUE_SIZE': 4,                         # Pages waiting per worker of the next stage
+        'PIPELINE_SAMPLE_SECONDS': 0.5,                   # Queue depth sampling interval
+
+        # --- Distributed Processing Settings (python -m utils.work_queue) ---
+        'QUEUE_LEASE_SECONDS': 600,                       # Page lease duration; expired pages are re-queued
+        'QUEUE_MAX_ATTEMPTS': 3,                          # Attempts before a page is marked as failed
+
+        # --- Parameter Tuning Settings (python main.py tune) ---
+        'TUNING_SAMPLE_SIZE': 12,                         # Number of sample pages taken from the input folder
+        'TUNING_METHOD': 'halving',                       # Search method: 'grid' or 'halving' (successive halving)
+        'TUNING_HALVING_ETA': 3,                          # Successive halving: keep 1/eta of combinations per round
+        'TUNING_WORKERS': None,                           # Number of worker processes (None = number of CPU cores)
+        'TUNING_GRID': {                                  # Values tried for each setting (all combinations)
+            'BRIGHTNESS': [-90, -73, -50, -25, 0],
+            'CONTRAST': [0, 15, 30, 45],
+            'GAMMA': [1.0, 2.0, 3.5, 4.8],
+            'BRIGHTNESS_DIFF_THRESHOLD': [20, 30, 40]
+        },
+
+        # --- Resolution Normalization (before OCR) ---
+        'NORMALIZE_RESOLUTION': False,                    # Resample pages to the target resolution by their text size
+        'RESOLUTION_TARGET_DPI': 300,                     # Resolution given to Tesseract
+        'RESOLUTION_REFERENCE_TEXT_HEIGHT': 24,           # Median character height (px) of the typeface at the target DPI
+        'RESOLUTION_REFERENCE_LINE_SPACING': 50,          # Line pitch (px) at the target DPI (6 lines per inch),
+                                                          # used when there are too few characters to measure
+        'RESOLUTION_MIN_SCALE': 0.25,                     # Limits of the scale factor
+        'RESOLUTION_MAX_SCALE': 1.0,                      # (1.0 = pages are never enlarged)
+        'RESOLUTION_TOLERANCE': 0.1,                      # Pages within 10% of the target are not resampled
+        'RESOLUTION_ANALYSIS_SIDE': 3000,                 # Larger pages are measured on an integer-factor reduced copy
+
+        # --- OCR Settings ---
+        'DOCUMENT_TYPE': 'typewritten',                   # Document content type ('typewritten' or 'handwritten')    
+        'OCR_LANGUAGE': 'rus',                            # Language code for OCR engine ('rus', 'deu', 'lav', or 'auto')
+        'OCR_PROFILE': None,                              # 'fast', 'balanced', 'accurate' (see OCR_PROFILES) or None;
+                                                          # explicit settings override the profile values
+        'OCR_ENGINE_MODE': 3,                             # Tesseract --oem (1 = LSTM only, 3 = default)
+        'OCR_PAGE_SEGMENTATION_MODE': 6,                  # Tesseract --psm (6 = single uniform block of text)
+        'KRAKEN_BATCH_SIZE': 32,                          # Handwritten: text lines per recognition batch
+        'KRAKEN_PAGE_BATCH': 8,                           # Handwritten: pages whose lines are recognized together
+                                                          # (sequential pipeline only; PROCESS_WORKERS > 1, the staged
+                                                          # pipeline and the work queue batch the lines of one page)
+        'KRAKEN_THREADS': None,                           # Handwritten: torch intra-op threads (None = number of CPU cores)
+        'OCR_MIN_CONFIDENCE': 50,                         # Words with Tesseract confidence not above this value are dropped
+        'OCR_LINE_GROUPING': 'line',                      # Output line unit: 'line', 'paragraph' or 'block'
+        'SAVE_WORD_DATA': True,                           # Store full word tables (text, conf, ids, boxes) per page
+        'SPELLCHECK_LANGUAGE': 'ru',                      # Language code for spell checker (ISO format: 'ru', 'de', 'lv')
+        'SPELLCHECK_LEMMA_CACHE_SIZE': 50000,             # Max number of word forms kept in the token -> lemmas cache
+
+        # --- OCR Profile Evaluation (python main.py evaluate) ---
+        'EVALUATION_FOLDER': os.path.join(base_dir, "ground_truth"),  # Page images with <name>.gt.txt transcriptions
+        'EVALUATION_REPORT_FILE': os.path.join(output_dir, "ocr_profiles_report.tsv"),
+        'EVALUATION_PROFILES': ('fast', 'balanced', 'accurate'),  # Profiles compared
+        'EVALUATION_MAX_CER': 0.05,                       # Accuracy target: the fastest profile within it is recommended
+        'EVALUATION_PREPROCESS': True,                    # Preprocess ground truth pages (False = already processed)
+
+    }
+
+def _parse_env_value(value: str):
+    # JSON values (numbers, booleans, lists, dicts) are decoded, anything else stays a string
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+def load_settings(config_file=None, base_dir=None, environ=None) -> dict:
+    """
+    Builds settings from defaults, a JSON configuration file and environment overrides.
+    Only names that exist in the defaults are applied; unknown ones are reported and ignored.
+    Nothing is created on disk (see ensure_directories).
+
+    Args:
+        config_file (str): JSON file with setting overrides
+            (default: path from the DOCUMENTARIUM_CONFIG environment variable)
+        base_dir (str): Base directory for default paths
+            (default: BASE_DIR from the file or environment, else current working directory)
+        environ (dict): Environment variables (default: os.environ)
+
+    Returns:
+        dict: Settings
+    """
+    environ = os.environ if environ is None else environ
+    config_file = config_file or environ.get(CONFIG_ENV_VAR)
+
+    overrides = {}
+    if config_file:
+        with open(config_file, encoding='utf-8') as f:
+            overrides.update(json.load(f))
+
+    for key, value in environ.items():
+        if key.startswith(ENV_PREFIX) and key != CONFIG_ENV_VAR:
+            overrides[key[len(ENV_PREFIX):]] = _parse_env_value(value)
+
+    # Default paths follow an overridden base directory, result files an overridden output directory
+    base_dir = base_dir or overrides.get('BASE_DIR')
+    result = default_settings(base_dir, overrides.get('OUTPUT_DIR'))
+
+    known = {}
+    for key, value in overrides.items():
+        # Misspelled names would otherwise be accepted silently and never read
+        if key not in result:
+            print(f"[!] Unknown setting {key} ignored")
+            continue
+        # JSON has no tuples; keep tuple-valued defaults as tuples
+        if isinstance(result.get(key), tuple) and isinstance(value, list):
+            value = tuple(value)
+        known[key] = value
+    result.update(known)
+
+    # Profile values replace the defaults; explicit overrides still win
+    if result['OCR_PROFILE']:
+        result = {**apply_ocr_profile(result, result['OCR_PROFILE']), **known}
+    return result
+
+def apply_ocr_profile(settings: dict, profile: str) -> dict:
+    """
+    Returns a copy of the settings with the values of an OCR profile.
+    With SKIP_PREPROCESSING only the OCR and resolution values apply; a warning names the others.
+
+    Args:
+        settings (dict): Settings
+        profile (str): Profile name (see OCR_PROFILES)
+
+    Returns:
+        dict: Settings with the profile applied
+    """
+    if profile not in OCR_PROFILES:
+        raise ValueError(f"Unknown OCR profile: {profile} (available: {', '.join(OCR_PROFILES)})")
+    skipped = [key for key in PREPROCESSING_KEYS if key in OCR_PROFILES[profile]]
+    if settings.get('SKIP_PREPROCESSING') and skipped:
+        print(f"[!] SKIP_PREPROCESSING is on: {', '.join(skipped)} of the {profile} profile have no effect")
+    return {**settings, **OCR_PROFILES[profile], 'OCR_PROFILE': profile}
+
+def batch_name(settings: dict) -> str:
+    """Returns the identity of the processed batch: BATCH_NAME, or the absolute input folder path."""
+    return settings.get('BATCH_NAME') or os.path.abspath(settings['INPUT_FOLDER'])
+
+def ensure_directories(settings: dict):
+    """Creates the input, processed, output and log directories if they don't exist."""
+    os.makedirs(settings['INPUT_FOLDER'], exist_ok=True)
+    os.makedirs(settings['PROCESSED_FOLDER'], exist_ok=True)
+    os.makedirs(settings['OUTPUT_DIR'], exist_ok=True)
+
+    # Create directory for spellcheck log if it doesn't exist
+    spell_log_dir = os.path.dirname(settings['SPELLCHECK_LOG_PATH'])
+    os.makedirs(spell_log_dir, exist_ok=True)
+
+_settings = None
+
+def get_settings() -> dict:
+    """Returns the process-wide settings, building them on first use."""
+    global _settings
+    if _settings is None:
+        _settings = load_settings()
+    return _settings
 
-# Create directory for spellcheck log if it doesn't exist
-spell_log_dir = os.path.dirname(settings['SPELLCHECK_LOG_PATH'])
-os.makedirs(spell_log_dir, exist_ok=True)
+def __getattr__(name):
+    # `from config.settings import settings` builds the settings lazily on first access
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Module exports
-__all__ = ['settings']
\ No newline at end of file
+__all__ = ['settings', 'default_settings', 'load_settings', 'apply_ocr_profile', 'OCR_PROFILES',
+           'PREPROCESSING_KEYS', 'batch_name', 'ensure_directories', 'get_settings']
@@ -0,0 +1,90 @@
+import cv2
+import numpy as np
+
+def local_mean_std(gray: np.ndarray, window: int):
+    """
+    Mean and standard deviation of every pixel's window x window neighbourhood.
+    Computed with box filters (running sums), so the cost does not depend on the window size.
+
+    Args:
+        gray (numpy.ndarray): Greyscale image
+        window (int): Window side in pixels
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: float32 mean and standard deviation
+    """
+    img = gray.astype(np.float32)
+    mean = cv2.boxFilter(img, cv2.CV_32F, (window, window), borderType=cv2.BORDER_REFLECT)
+    sq_mean = cv2.boxFilter(img * img, cv2.CV_32F, (window, window), borderType=cv2.BORDER_REFLECT)
+
+    # Var = E[x^2] - E[x]^2, clipped against rounding below zero
+    variance = sq_mean
+    variance -= mean * mean
+    np.maximum(variance, 0, out=variance)
+    return mean, np.sqrt(variance, out=variance)
+
+def sauvola_threshold(gray: np.ndarray, window: int = 31, k: float = 0.2, r: float = 128) -> np.ndarray:
+    """
+    Sauvola local threshold: T = mean * (1 + k * (std / r - 1)).
+    Follows slow changes of the paper tone (yellowing, uneven lighting) and stays low on flat background.
+
+    Args:
+        gray (numpy.ndarray): Greyscale image
+        window (int): Window side in pixels (about 1-2 character heights)
+        k (float): Sensitivity (higher - thinner strokes, less background noise)
+        r (float): Dynamic range of the standard deviation
+
+    Returns:
+        numpy.ndarray: float32 threshold of every pixel
+    """
+    mean, std = local_mean_std(gray, window)
+    std *= k / r
+    std += 1 - k
+    return mean * std
+
+def niblack_threshold(gray: np.ndarray, window: int = 31, k: float = -0.2) -> np.ndarray:
+    """
+    Niblack local threshold: T = mean + k * std.
+    Keeps faint strokes better than Sauvola, but turns background noise into specks.
+
+    Args:
+        gray (numpy.ndarray): Greyscale image
+        window (int): Window side in pixels
+        k (float): Sensitivity (usually negative for dark text on light paper)
+
+    Returns:
+        numpy.ndarray: float32 threshold of every pixel
+    """
+    mean, std = local_mean_std(gray, window)
+    std *= k
+    return mean + std
+
+def binarize(image, settings) -> np.ndarray:
+    """
+    Converts a page to black text on white (0/255) with a local threshold.
+
+    Args:
+        image (numpy.ndarray): Input image (color or grayscale)
+        settings (dict): Processing settings (BINARIZATION_METHOD, BINARIZATION_WINDOW,
+            BINARIZATION_K - None for the method default, BINARIZATION_R)
+
+    Returns:
+        numpy.ndarray: uint8 image with values 0 and 255
+    """
+    if len(image.shape) == 3 and image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    method = settings.get('BINARIZATION_METHOD', 'sauvola')
+    window = settings.get('BINARIZATION_WINDOW', 31) | 1  # Odd window, centred on the pixel
+    k = settings.get('BINARIZATION_K')
+    if method == 'otsu':
+        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binary
+    if method == 'niblack':
+        threshold = niblack_threshold(image, window, -0.2 if k is None else k)
+    elif method == 'sauvola':
+        threshold = sauvola_threshold(image, window, 0.2 if k is None else k, settings.get('BINARIZATION_R', 128))
+    else:
+        raise ValueError(f"Unknown binarization method: {method}")
+
+    return np.where(image > threshold, np.uint8(255), np.uint8(0))
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+def page_content_metrics(image, settings) -> dict:
+    """
+    Computes cheap content metrics of a page on a small greyscale thumbnail.
+    
+    Args:
+        image (numpy.ndarray): Input image (color or grayscale)
+        settings (dict): Processing settings
+        
+    Returns:
+        dict: 'ink_ratio' - share of ink pixels (darker than the paper by the ink delta),
+              'ink_delta' - ink threshold below the local paper level, from the page's own contrast,
+              'spread' - spread of the darkness below the local paper level (1st to 99th percentile),
+              'edge_density' - share of edge pixels
+    """
+    if len(image.shape) == 3 and image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Thumbnail: the cost does not depend on the scan resolution
+    h, w = image.shape
+    scale = settings.get('BLANK_THUMBNAIL_SIZE', 256) / max(h, w)
+    if scale < 1:
+        image = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+    # Central area only, so the scanner background around the sheet is not counted as content
+    margin = settings.get('BLANK_CENTER_MARGIN', 0.1)
+    h, w = image.shape
+    center = image[int(h * margin):h - int(h * margin), int(w * margin):w - int(w * margin)]
+    if center.size == 0:
+        center = image
+
+    # Paper level at each pixel: closing removes the text strokes and keeps shading, stains and yellowing
+    size = max(3, settings.get('BLANK_THUMBNAIL_SIZE', 256) // 16) | 1
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+    paper = cv2.morphologyEx(center, cv2.MORPH_CLOSE, kernel)
+    darkness = cv2.subtract(paper, center)
+
+    # Ink threshold from the page itself: the Otsu split of the darkness below the paper, so faint
+    # carbon copies and pencil count as ink; on a blank page Otsu only splits the noise, hence the minimum
+    otsu, _ = cv2.threshold(darkness, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    ink_delta = max(float(otsu), float(settings.get('BLANK_MIN_INK_DELTA', 12)))
+    ink_ratio = np.count_nonzero(darkness > ink_delta) / center.size
+    low, high = np.percentile(darkness, (1, 99))
+    edges = cv2.Canny(center, 50, 150)
+    edge_density = np.count_nonzero(edges) / center.size
+
+    return {
+        'ink_ratio': round(float(ink_ratio), 5),
+        'ink_delta': round(ink_delta, 1),
+        'spread': round(float(high - low), 1),
+        'edge_density': round(float(edge_density), 5)
+    }
+
+def is_blank_page(metrics: dict, settings) -> bool:
+    """
+    Classifies a page as blank (verso, separator sheet, empty card) by its content metrics.
+    All three signals must be low: a faint page can have a narrow brightness spread
+    and still contain text.
+    
+    Args:
+        metrics (dict): Result of page_content_metrics
+        settings (dict): Processing settings with the BLANK_* thresholds
+        
+    Returns:
+        bool: True if the page has no text worth recognizing
+    """
+    return (metrics['spread'] < settings.get('BLANK_MIN_SPREAD', 40)
+            and metrics['ink_ratio'] < settings.get('BLANK_MAX_INK_RATIO', 0.002)
+            and metrics['edge_density'] < settings.get('BLANK_MAX_EDGE_DENSITY', 0.01))
@@ -15,11 +15,25 @@ def smart_crop(image, settings):
     Returns:
         numpy.ndarray: Cropped image
     """
+    top, bottom, left, right = find_crop_box(image, settings)
+    return image[top:bottom, left:right]
+
+def find_crop_box(image, settings):
+    """
+    Finds the crop rectangle of an image (see smart_crop)
+    
+    Args:
+        image (numpy.ndarray): Input image (color or grayscale)
+        settings (dict): Processing settings
+        
+    Returns:
+        Tuple[int, int, int, int]: (top, bottom, left, right) borders in pixels
+    """
     # Grayscale Conversion
     if len(image.shape) == 3 and image.shape[2] == 3:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
+        gray = image
 
     # Settings
     padding = settings.get('CROP_PADDING', 20)
@@ -27,6 +41,10 @@ def smart_crop(image, settings):
 
     height, width = gray.shape
 
+    # Mean brightness of every column and row, computed once
+    column_means = gray.mean(axis=0)
+    row_means = gray.mean(axis=1)
+
     # Margins from the edges that define the starting rectangle
     margin_settings = settings.get('CENTER_BOX_MARGIN', {})
     margin_left = int(margin_settings.get('left', 0.15) * width)
@@ -61,6 +79,7 @@ def smart_crop(image, settings):
         if it is followed by a new stable zone of length STABILITY_RANGE.
         """
         max_range = width if axis == 'horizontal' else height
+        means = column_means if axis == 'horizontal' else row_means
 
         for i in range(start, 0 if direction < 0 else max_range, direction):
             # Indexes for the "before" zone and the "after" zone
@@ -73,26 +92,16 @@ def smart_crop(image, settings):
                 continue
 
             # Base brightness before the drop
-            base = (
-                np.mean(gray[:, prev_idx]) if axis == 'horizontal'
-                else np.mean(gray[prev_idx, :])
-            )
+            base = means[prev_idx]
 
             # Brightness of the current strip
-            current = (
-                np.mean(gray[:, i]) if axis == 'horizontal'
-                else np.mean(gray[i, :])
-            )
+            current = means[i]
 
             # Check for sudden changes
             diff = abs(current - base)
             if diff > threshold:
                 # Check: is the brightness stable after the change?
-                new_zone = [
-                    np.mean(gray[:, idx]) if axis == 'horizontal'
-                    else np.mean(gray[idx, :])
-                    for idx in next_idxs
-                ]
+                new_zone = [means[idx] for idx in next_idxs]
                 new_mean = np.mean(new_zone)
                 deviations = [abs(val - new_mean) for val in new_zone]
 
@@ -113,4 +122,4 @@ def smart_crop(image, settings):
     top = max(0, top - padding)
     bottom = min(height, bottom + padding)
 
-    return image[top:bottom, left:right]
\ No newline at end of file
+    return top, bottom, left, right
\ No newline at end of file
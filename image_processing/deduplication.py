@@ -0,0 +1,233 @@
+import os
+import sqlite3
+from typing import NamedTuple, Optional, Tuple
+import cv2
+import numpy as np
+from image_processing.binarization import sauvola_threshold
+from utils.image_io import fit_to_side
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_hashes (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    image_path TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    word_data_path TEXT,
+    ink_mask BLOB
+);
+"""
+
+# Longest side of the ink mask stored with each hash to confirm matches (text stays readable)
+COMPARE_SIDE = 1600
+
+# Sauvola window of the ink mask and the comparison window (about one character), in mask pixels
+INK_WINDOW = 31
+CHARACTER_WINDOW = 9
+
+# Number of set bits for every byte value, used to count differing hash bits
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def compute_phash(image) -> int:
+    """
+    Computes a 64-bit perceptual hash (DCT hash) of an image.
+    The image is reduced to a 32x32 greyscale thumbnail, so the cost does not depend on page size.
+
+    Args:
+        image (numpy.ndarray): Input image (color or grayscale)
+
+    Returns:
+        int: 64-bit hash
+    """
+    if len(image.shape) == 3 and image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    # Low-frequency 8x8 block of the DCT, compared against its median
+    low_freq = cv2.dct(thumbnail)[:8, :8].flatten()
+    bits = low_freq > np.median(low_freq[1:])
+    return int(np.packbits(bits.astype(np.uint8)).view('>u8')[0])
+
+class PageHash(NamedTuple):
+    """Perceptual hash of a page with the ink mask (PNG) used to confirm hash matches."""
+    value: int
+    ink_mask: bytes
+
+def page_ink_mask(image) -> np.ndarray:
+    """
+    Ink of a page (0/255, ink is 255) with the longest side of COMPARE_SIDE pixels,
+    from a Sauvola threshold so uneven lighting and paper tone don't count as ink.
+    """
+    if len(image.shape) == 3 and image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    gray = fit_to_side(image, COMPARE_SIDE)
+    return np.where(gray < sauvola_threshold(gray, INK_WINDOW), np.uint8(255), np.uint8(0))
+
+def compute_page_hash(image) -> PageHash:
+    """
+    Computes the perceptual hash and the confirmation ink mask of a page.
+
+    Args:
+        image (numpy.ndarray): Input image (color or grayscale), e.g. the reduced analysis copy
+
+    Returns:
+        PageHash: 64-bit hash and PNG-encoded ink mask (a few tens of KB)
+    """
+    _, png = cv2.imencode('.png', page_ink_mask(image))
+    return PageHash(compute_phash(image), png.tobytes())
+
+def align_ink(reference: np.ndarray, moving: np.ndarray) -> np.ndarray:
+    """
+    Aligns an ink mask to a reference mask (ECC, affine: shift, rotation, scale).
+    The transform is estimated on smoothed masks, first at 1/4 size and then refined at full size.
+    """
+    if moving.shape != reference.shape:
+        moving = cv2.resize(moving, (reference.shape[1], reference.shape[0]), interpolation=cv2.INTER_NEAREST)
+    a = cv2.GaussianBlur(reference.astype(np.float32), (0, 0), 2)
+    b = cv2.GaussianBlur(moving.astype(np.float32), (0, 0), 2)
+
+    def refine(first, second, warp, iterations):
+        try:
+            criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, iterations, 1e-5)
+            return cv2.findTransformECC(first, second, warp, cv2.MOTION_AFFINE, criteria, None, 1)[1]
+        except cv2.error:
+            return warp  # No convergence: the previous estimate is kept
+
+    small_a = cv2.resize(a, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    small_b = cv2.resize(b, (small_a.shape[1], small_a.shape[0]), interpolation=cv2.INTER_AREA)
+    warp = refine(small_a, small_b, np.eye(2, 3, dtype=np.float32), 50)
+    warp[:, 2] *= 4  # Shift in full-size pixels
+    warp = refine(a, b, warp, 20)
+    return cv2.warpAffine(moving, warp, (reference.shape[1], reference.shape[0]),
+                          flags=cv2.INTER_NEAREST + cv2.WARP_INVERSE_MAP, borderValue=0)
+
+def page_difference(first: bytes, second: bytes) -> float:
+    """
+    Largest local share of unmatched ink between two pages after alignment.
+    The 64-bit hash only describes the overall layout, so two pages of the same printed form
+    can have nearly equal hashes. Here the ink masks (COMPARE_SIDE px, where a digit is still
+    10-20 px high) are aligned, ink with no ink of the other page within one pixel is marked
+    in both directions, single-pixel fringes are removed, and the marked share is taken in
+    windows of about one character. A shifted or rotated rescan of the same page stays at 0;
+    one changed digit gives about 0.1. Dust or a new mark also counts as a change, so such
+    a rescan is recognized again.
+
+    Args:
+        first (bytes): PNG ink mask (see compute_page_hash)
+        second (bytes): PNG ink mask
+
+    Returns:
+        float: Maximum share of unmatched ink pixels in a CHARACTER_WINDOW window (0-1)
+    """
+    a = cv2.imdecode(np.frombuffer(first, np.uint8), cv2.IMREAD_GRAYSCALE)
+    b = align_ink(a, cv2.imdecode(np.frombuffer(second, np.uint8), cv2.IMREAD_GRAYSCALE))
+
+    kernel = np.ones((3, 3), np.uint8)
+    unmatched = cv2.bitwise_or(cv2.bitwise_and(a, cv2.bitwise_not(cv2.dilate(b, kernel))),
+                               cv2.bitwise_and(b, cv2.bitwise_not(cv2.dilate(a, kernel))))
+    unmatched = cv2.morphologyEx(unmatched, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+    local = cv2.boxFilter(unmatched.astype(np.float32) / 255, -1, (CHARACTER_WINDOW, CHARACTER_WINDOW))
+    return float(local.max())
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    """Returns the number of differing bits between each hash in the array and the value."""
+    diff = np.bitwise_xor(hashes, np.uint64(value))
+    return _POPCOUNT[diff.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+class PageHashIndex:
+    """
+    Persistent index of page hashes with their OCR results, shared across batches.
+    Hashes are kept in memory as a NumPy array for vectorized Hamming distance search;
+    ink masks stay in the database and are read only to confirm hash matches.
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(page_hashes)')]
+        if 'ink_mask' not in columns:
+            # Index written before ink masks were stored: its pages are never confirmed as duplicates
+            with self.conn:
+                self.conn.execute('ALTER TABLE page_hashes ADD COLUMN ink_mask BLOB')
+
+        rows = self.conn.execute('SELECT id, hash, image_path FROM page_hashes ORDER BY id').fetchall()
+        self.ids = [row[0] for row in rows]
+        self.positions = {row[2]: i for i, row in enumerate(rows)}  # image path -> position in the buffer
+
+        # Preallocated buffer, grown by doubling; only the first len(self.ids) values are used
+        self._buffer = np.zeros(max(1024, 2 * len(rows)), dtype=np.uint64)
+        self._buffer[:len(rows)] = [int(row[1], 16) for row in rows]
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._buffer[:len(self.ids)]
+
+    def find(self, page_hash: PageHash, max_distance: int, max_difference: float,
+             exclude_path: str = None) -> Optional[Tuple[str, str, Optional[str], int, float]]:
+        """
+        Finds the closest indexed page within max_distance bits whose ink mask confirms the match.
+        Candidates are checked in order of increasing distance.
+
+        Args:
+            page_hash (PageHash): Page hash and ink mask
+            max_distance (int): Max number of differing bits
+            max_difference (float): Max page difference (see page_difference)
+            exclude_path (str): Image path to ignore (the page itself when a batch is processed again)
+
+        Returns:
+            Tuple: (image path, OCR text, word data path, distance, page difference) or None
+        """
+        if len(self.hashes) == 0:
+            return None
+        distances = hamming_distances(self.hashes, page_hash.value)
+        if exclude_path in self.positions:
+            distances[self.positions[exclude_path]] = 255
+
+        candidates = np.flatnonzero(distances <= max_distance)
+        for position in candidates[np.argsort(distances[candidates], kind='stable')]:
+            image_path, text, word_data_path, ink_mask = self.conn.execute(
+                'SELECT image_path, text, word_data_path, ink_mask FROM page_hashes WHERE id = ?',
+                (self.ids[position],)
+            ).fetchone()
+            if ink_mask is None:
+                continue
+            difference = page_difference(ink_mask, page_hash.ink_mask)
+            if difference <= max_difference:
+                return image_path, text, word_data_path, int(distances[position]), difference
+            print(f"[!] Hash match with {image_path} rejected (distance {int(distances[position])}, "
+                  f"page difference {difference:.3f})")
+        return None
+
+    def add(self, page_hash: PageHash, image_path: str, text: str, word_data_path: Optional[str] = None):
+        """Adds a recognized page to the index (replacing an earlier result for the same image path)."""
+        value, ink_mask = page_hash
+        if image_path in self.positions:
+            position = self.positions[image_path]
+            with self.conn:
+                self.conn.execute(
+                    'UPDATE page_hashes SET hash = ?, text = ?, word_data_path = ?, ink_mask = ? WHERE id = ?',
+                    (f'{value:016x}', text, word_data_path, ink_mask, self.ids[position])
+                )
+            self._buffer[position] = value
+            return
+
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO page_hashes (hash, image_path, text, word_data_path, ink_mask) VALUES (?, ?, ?, ?, ?)',
+                (f'{value:016x}', image_path, text, word_data_path, ink_mask)
+            )
+        if len(self.ids) == len(self._buffer):
+            self._buffer = np.concatenate([self._buffer, np.zeros_like(self._buffer)])
+        self._buffer[len(self.ids)] = value
+        self.positions[image_path] = len(self.ids)
+        self.ids.append(cursor.lastrowid)
+
+    def get(self, image_path: str) -> Optional[PageHash]:
+        """Returns the stored hash and ink mask of an indexed page, or None if it isn't indexed."""
+        row = self.conn.execute('SELECT hash, ink_mask FROM page_hashes WHERE image_path = ?',
+                                (image_path,)).fetchone()
+        return None if row is None else PageHash(int(row[0], 16), row[1])
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,141 @@
+import cv2
+import numpy as np
+from image_processing.rotation import (detect_rotation, rotate_image, get_text_angle_by_hough,
+                                       estimate_projection_angle)
+from image_processing.cropping import find_crop_box
+from utils.image_io import fit_to_side
+
+# cv2.rotate codes for exact clockwise rotations
+RIGHT_ANGLE_ROTATIONS = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+def _to_affine3(M: np.ndarray) -> np.ndarray:
+    return np.vstack([M, [0.0, 0.0, 1.0]])
+
+def _rotation_matrix(w: int, h: int, angle: float):
+    # Same transform as rotate_image: clockwise rotation on an enlarged canvas
+    center = (w / 2, h / 2)
+    M = cv2.getRotationMatrix2D(center, -angle, 1.0)
+    cos = np.abs(M[0, 0])
+    sin = np.abs(M[0, 1])
+    new_w = int((h * sin) + (w * cos))
+    new_h = int((h * cos) + (w * sin))
+    M[0, 2] += (new_w / 2) - center[0]
+    M[1, 2] += (new_h / 2) - center[1]
+    return _to_affine3(M), new_w, new_h
+
+def _base_rotation_matrix(w: int, h: int, angle: int):
+    # Right angles map pixel centres exactly onto pixel centres (as cv2.rotate does)
+    if angle == 90:
+        return np.array([[0, -1, h - 1], [1, 0, 0], [0, 0, 1]], dtype=np.float64), h, w
+    if angle == 180:
+        return np.array([[-1, 0, w - 1], [0, -1, h - 1], [0, 0, 1]], dtype=np.float64), w, h
+    if angle == 270:
+        return np.array([[0, 1, 0], [-1, 0, w - 1], [0, 0, 1]], dtype=np.float64), h, w
+    if angle == 0:
+        return np.eye(3), w, h
+    return _rotation_matrix(w, h, angle)
+
+def _rotate_base(image, angle: int):
+    if angle in RIGHT_ANGLE_ROTATIONS:
+        return cv2.rotate(image, RIGHT_ANGLE_ROTATIONS[angle])
+    return image if angle == 0 else rotate_image(image, angle)
+
+def plan_geometry(image, settings, analysis=None) -> dict:
+    """
+    Estimates rotation, deskew and crop of a page on a reduced greyscale copy
+    and composes them into one affine transform of the full-resolution image.
+
+    Args:
+        image (numpy.ndarray): Input image
+        settings (dict): Processing settings
+        analysis (numpy.ndarray): Reduced greyscale copy of the page, if already decoded
+            (otherwise it is made from the input image)
+
+    Returns:
+        dict: 'matrix' (3x3 transform of full-resolution coordinates), 'size' (output width, height),
+              'base_angle', 'fine_angle' (None if not applied), 'crop' ((x, y) offset in the rotated page or None)
+    """
+    h, w = image.shape[:2]
+
+    # Reduced copy for analysis; the full image is only resampled once, in render_geometry
+    max_side = settings.get('GEOMETRY_ANALYSIS_MAX_SIDE')
+    if analysis is None:
+        analysis = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    small = fit_to_side(analysis, max_side) if max_side else analysis
+
+    matrix, out_w, out_h = np.eye(3), w, h
+    base_angle, fine_angle, crop = 0, None, None
+
+    if settings['ROTATE']:
+        # Determining the basic rotation angle
+        if isinstance(settings['ROTATION_ANGLE'], int):  # Specific angle
+            base_angle = settings['ROTATION_ANGLE'] % 360
+        elif settings['ROTATION_ANGLE'] == 'auto':
+            base_angle = detect_rotation(small)
+
+        matrix, out_w, out_h = _base_rotation_matrix(w, h, base_angle)
+        small = _rotate_base(small, base_angle)
+
+        # Adjust the angle of the text if required
+        doc_type = settings.get('DOCUMENT_TYPE', 'unknown')
+        if settings.get('FINE_ROTATION', True):
+            if doc_type in ['typewritten']:
+                angle = get_text_angle_by_hough(small, method=settings.get('ROTATION_METHOD', 'auto'))
+                if abs(angle) > 0.5:
+                    fine_angle = float(angle)
+                    fine_matrix, out_w, out_h = _rotation_matrix(out_w, out_h, -fine_angle)
+                    matrix = fine_matrix @ matrix
+                    small = rotate_image(small, -fine_angle)
+            elif doc_type == 'handwritten':
+                fine_angle = estimate_projection_angle(small)
+                fine_matrix = _to_affine3(cv2.getRotationMatrix2D((out_w // 2, out_h // 2), fine_angle, 1.0))
+                matrix = fine_matrix @ matrix
+                small_M = cv2.getRotationMatrix2D((small.shape[1] // 2, small.shape[0] // 2), fine_angle, 1.0)
+                small = cv2.warpAffine(small, small_M, (small.shape[1], small.shape[0]),
+                                       flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+    # Background cropping: borders found on the reduced copy, scaled to full resolution
+    if settings.get('CROP', True):
+        small_h, small_w = small.shape[:2]
+        sx, sy = out_w / small_w, out_h / small_h
+        # Padding is added at full resolution; the stability zone is scaled to the reduced copy
+        crop_settings = {**settings, 'CROP_PADDING': 0,
+                         'STABILITY_RANGE': max(1, round(settings.get('STABILITY_RANGE', 10) / sx))}
+        top, bottom, left, right = find_crop_box(small, crop_settings)
+        padding = settings.get('CROP_PADDING', 20)
+        left, right = max(0, round(left * sx) - padding), min(out_w, round(right * sx) + padding)
+        top, bottom = max(0, round(top * sy) - padding), min(out_h, round(bottom * sy) + padding)
+
+        crop = (left, top)
+        matrix = np.array([[1, 0, -left], [0, 1, -top], [0, 0, 1]], dtype=np.float64) @ matrix
+        out_w, out_h = right - left, bottom - top
+
+    return {'matrix': matrix, 'size': (out_w, out_h), 'base_angle': base_angle,
+            'fine_angle': fine_angle, 'crop': crop}
+
+def render_geometry(image, plan) -> np.ndarray:
+    """
+    Renders the final page region with the transform from plan_geometry.
+    Right-angle rotations without deskew are done with lossless transposes/flips and slicing;
+    otherwise a single cubic warp renders only the cropped region.
+
+    Args:
+        image (numpy.ndarray): Full-resolution input image
+        plan (dict): Result of plan_geometry
+
+    Returns:
+        numpy.ndarray: Rotated and cropped image
+    """
+    out_w, out_h = plan['size']
+
+    if plan['fine_angle'] is None and (plan['base_angle'] == 0 or plan['base_angle'] in RIGHT_ANGLE_ROTATIONS):
+        rotated = _rotate_base(image, plan['base_angle'])
+        left, top = plan['crop'] or (0, 0)
+        return rotated[top:top + out_h, left:left + out_w]
+
+    return cv2.warpAffine(image, plan['matrix'][:2], (out_w, out_h),
+                          flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
@@ -1,41 +1,72 @@
 from typing import Tuple, Optional
 import cv2
 import numpy as np
-from image_processing.rotation import apply_rotation
-from image_processing.cropping import smart_crop
+from image_processing.geometry import plan_geometry, render_geometry
+from image_processing.binarization import binarize
 from image_processing.brightness_contrast import enhance_contrast, apply_brightness_gradient, apply_brightness_contrast_gamma
 
-def process_image(image, settings) -> np.ndarray:
+def apply_geometry(image, settings, analysis=None) -> np.ndarray:
     """
-    The main function of image processing
+    Rotation and background cropping of an image.
+    Angles and borders are estimated on a reduced copy; the full-resolution image
+    is resampled only once (or not at all for right-angle rotations).
     
     Args:
         image (numpy.ndarray): Input image
         settings (dict): Processing settings
+        analysis (numpy.ndarray): Reduced greyscale copy of the page (optional)
         
     Returns:
-        numpy.ndarray: Processed image
+        numpy.ndarray: Rotated and cropped image
     """
-    # 1. Rotate image
-    rotated, fine_angle = apply_rotation(image, settings)
-
-    # 2. Background cropping
-    if settings.get('CROP', True):
-        rotated = smart_crop(rotated, settings)  
+    # 1-2. Rotate image and crop the background in one pass
+    plan = plan_geometry(image, settings, analysis)
+    return render_geometry(image, plan)
 
+def apply_tone(image, settings) -> np.ndarray:
+    """
+    Brightness, contrast and gamma correction of an image
+    
+    Args:
+        image (numpy.ndarray): Input image (after rotation and cropping)
+        settings (dict): Processing settings
+        
+    Returns:
+        numpy.ndarray: Corrected image
+    """
     # 4. Apply brightness (if needed)
     if settings.get('APPLY_BRIGHTNESS'):
-        rotated = apply_brightness_gradient(rotated, **{
+        image = apply_brightness_gradient(image, **{
         'gradient_type': settings.get('BRIGHTNESS_GRADIENT_TYPE', 'radial'),
         'strength': settings.get('BRIGHTNESS_STRENGTH', 0.5),
         'gradient_direction': settings.get('BRIGHTNESS_GRADIENT_DIRECTION', None)
     })
 
     # 5. Apply contrast
-    enhanced = enhance_contrast(rotated, force_grayscale=settings['FORCE_GRAYSCALE'])
+    enhanced = enhance_contrast(image, force_grayscale=settings['FORCE_GRAYSCALE'])
 
     # 6. Correction of brightness, contrast, gamma (if needed)
     if settings.get('CORRECT_BRIGHTNESS_CONTRAST_GAMMA', True):
         enhanced = apply_brightness_contrast_gamma(enhanced, settings)
 
-    return enhanced
\ No newline at end of file
+    return enhanced
+
+def process_image(image, settings, analysis=None) -> np.ndarray:
+    """
+    The main function of image processing
+    
+    Args:
+        image (numpy.ndarray): Input image
+        settings (dict): Processing settings
+        analysis (numpy.ndarray): Reduced greyscale copy of the page for the geometry estimation (optional)
+        
+    Returns:
+        numpy.ndarray: Processed image
+    """
+    processed = apply_tone(apply_geometry(image, settings, analysis), settings)
+
+    # 7. Local thresholding to black and white (if needed)
+    if settings.get('BINARIZE'):
+        processed = binarize(processed, settings)
+
+    return processed
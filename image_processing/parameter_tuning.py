@@ -0,0 +1,211 @@
+import os
+import json
+import math
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from image_processing.geometry import plan_geometry, render_geometry
+from image_processing.image_processing import apply_tone
+from image_processing.binarization import binarize
+from utils.image_io import PageImage
+from ocr.tesseract_ocr import get_ocr_data, ocr_data_to_array
+
+# Settings that change the crop; everything else in the grid is a tone setting
+CROP_KEYS = ('CROP', 'CROP_PADDING', 'STABILITY_RANGE', 'CENTER_BOX_MARGIN', 'BRIGHTNESS_DIFF_THRESHOLD')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+def expand_grid(grid: Dict[str, list]) -> List[dict]:
+    """Returns every combination of the grid values as a list of settings dicts."""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def sample_pages(folder: str, sample_size: int) -> List[str]:
+    """Picks up to sample_size images evenly spread over the sorted folder listing."""
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+    if len(files) > sample_size:
+        step = len(files) / sample_size
+        files = [files[int(i * step)] for i in range(sample_size)]
+    return [os.path.join(folder, f) for f in files]
+
+def score_words(words: np.ndarray, min_conf: float) -> Tuple[float, int]:
+    """
+    Scores an OCR result.
+
+    Returns:
+        Tuple[float, int]: (mean Tesseract confidence of all words, number of words above min_conf)
+    """
+    is_word = (np.char.str_len(words['text']) > 0) & (words['conf'] >= 0)
+    conf = words['conf'][is_word]
+    if len(conf) == 0:
+        return 0.0, 0
+    return float(conf.mean()), int(np.count_nonzero(np.trunc(conf) > min_conf))
+
+def combined_score(mean_conf: float, words: float) -> float:
+    """Expected number of correctly recognized words per page."""
+    return mean_conf / 100.0 * words
+
+def _init_worker():
+    # One Tesseract thread per worker process: the pool provides the parallelism
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+def _prepare_page(args) -> Optional[str]:
+    # Rotation is estimated (on the reduced copy, as in production) and applied once per page;
+    # the result is reused by all combinations
+    image_path, cache_path, settings = args
+    page = PageImage(image_path, settings)
+    if page.full is None:
+        print(f"Loading error: {image_path}")
+        return None
+    plan = plan_geometry(page.full, {**settings, 'CROP': False}, page.analysis)
+    np.save(cache_path, render_geometry(page.full, plan))
+    return cache_path
+
+def _score_page(args) -> List[Tuple[int, float, int]]:
+    # One crop per task (estimated on a reduced copy like in production), then every tone combination
+    cache_path, crop_params, tone_jobs, settings = args
+    page_settings = {**settings, **crop_params}
+    rotated = np.load(cache_path)
+    crop_plan = plan_geometry(rotated, {**page_settings, 'ROTATE': False})
+    cropped = render_geometry(rotated, crop_plan)
+
+    results = []
+    for combo_index, tone_params in tone_jobs:
+        combo_settings = {**page_settings, **tone_params}
+        processed = apply_tone(cropped, combo_settings)
+        if combo_settings.get('BINARIZE'):
+            processed = binarize(processed, combo_settings)
+        words = ocr_data_to_array(get_ocr_data(processed, combo_settings))
+        mean_conf, count = score_words(words, combo_settings.get('OCR_MIN_CONFIDENCE', 50))
+        results.append((combo_index, mean_conf, count))
+    return results
+
+class ParameterTuner:
+    """
+    Searches brightness/contrast/gamma and crop settings that maximize Tesseract
+    confidence and recognized word count on a sample of pages.
+    """
+
+    def __init__(self, settings: dict, grid: Dict[str, list] = None, workers: int = None):
+        self.settings = settings
+        self.combos = expand_grid(grid or settings['TUNING_GRID'])
+        self.workers = workers or settings.get('TUNING_WORKERS') or os.cpu_count()
+        self.results = {}  # (combo index, page index) -> (mean confidence, recognized words)
+        self.candidates = []
+        self.page_count = 0
+
+    def _evaluate(self, pool, pages: List[str], combo_indexes: List[int], page_count: int):
+        # Group missing (combo, page) pairs into one task per page and crop setting
+        tasks = {}
+        for page_index in range(page_count):
+            for combo_index in combo_indexes:
+                if (combo_index, page_index) in self.results:
+                    continue
+                combo = self.combos[combo_index]
+                crop_params = {k: v for k, v in combo.items() if k in CROP_KEYS}
+                tone_params = {k: v for k, v in combo.items() if k not in CROP_KEYS}
+                key = (page_index, json.dumps(crop_params, sort_keys=True))
+                tasks.setdefault(key, (crop_params, []))[1].append((combo_index, tone_params))
+
+        jobs = [(pages[page_index], crop_params, tone_jobs, self.settings)
+                for (page_index, _), (crop_params, tone_jobs) in tasks.items()]
+        for (page_index, _), page_results in zip(tasks, pool.map(_score_page, jobs)):
+            for combo_index, mean_conf, count in page_results:
+                self.results[(combo_index, page_index)] = (mean_conf, count)
+
+    def summary(self, combo_index: int, page_count: int) -> Tuple[float, float, float]:
+        """Returns (score, mean confidence, words per page) of a combination over the first pages."""
+        page_results = [self.results[(combo_index, p)] for p in range(page_count)
+                        if (combo_index, p) in self.results]
+        if not page_results:
+            return 0.0, 0.0, 0.0
+        mean_conf = float(np.mean([r[0] for r in page_results]))
+        words = float(np.mean([r[1] for r in page_results]))
+        return combined_score(mean_conf, words), mean_conf, words
+
+    def tune(self, image_paths: List[str], method: str = 'halving', eta: int = 3) -> dict:
+        """
+        Runs the search over the sample pages.
+
+        Args:
+            image_paths (List[str]): Sample pages
+            method (str): 'grid' (every combination on every page) or
+                'halving' (successive halving: all combinations on a few pages,
+                the best 1/eta of them on eta times more pages, and so on)
+            eta (int): Reduction factor for successive halving
+
+        Returns:
+            dict: Best combination of settings
+        """
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            prepare_jobs = [(path, os.path.join(cache_dir, f'{i}.npy'), self.settings)
+                            for i, path in enumerate(image_paths)]
+            pages = [p for p in pool.map(_prepare_page, prepare_jobs) if p is not None]
+            if not pages:
+                raise ValueError("No readable sample pages for tuning.")
+
+            candidates = list(range(len(self.combos)))
+            if method == 'grid':
+                page_count = len(pages)
+            else:
+                rounds = int(math.log(len(candidates), eta)) if len(candidates) > 1 else 0
+                page_count = max(1, math.ceil(len(pages) / eta ** rounds))
+
+            while True:
+                self._evaluate(pool, pages, candidates, page_count)
+                print(f"[Tuning] {len(candidates)} combinations evaluated on {page_count} page(s)")
+                if method == 'grid' or len(candidates) == 1 or page_count >= len(pages):
+                    break
+                candidates.sort(key=lambda c: self.summary(c, page_count)[0], reverse=True)
+                candidates = candidates[:max(1, math.ceil(len(candidates) / eta))]
+                page_count = min(len(pages), page_count * eta)
+
+        self.page_count = page_count
+        self.candidates = candidates
+        best = max(candidates, key=lambda c: self.summary(c, page_count)[0])
+        return self.combos[best]
+
+    def write_report(self, report_path: str):
+        """Saves scores of the final candidates as TSV, best first."""
+        ranked = sorted(self.candidates, key=lambda c: self.summary(c, self.page_count)[0], reverse=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write('score\tmean_conf\twords_per_page\tsettings\n')
+            for combo_index in ranked:
+                score, mean_conf, words = self.summary(combo_index, self.page_count)
+                params = json.dumps(self.combos[combo_index], ensure_ascii=False, sort_keys=True)
+                f.write(f'{score:.2f}\t{mean_conf:.2f}\t{words:.1f}\t{params}\n')
+
+def tune_collection(settings: dict) -> dict:
+    """
+    Tunes preprocessing settings on a sample of INPUT_FOLDER and saves a settings profile
+    (a JSON file usable with `main.py --config`) plus a TSV report of the scores.
+
+    Args:
+        settings (dict): Processing settings, including the TUNING_* options
+
+    Returns:
+        dict: Best settings found
+    """
+    image_paths = sample_pages(settings['INPUT_FOLDER'], settings.get('TUNING_SAMPLE_SIZE', 12))
+    if not image_paths:
+        print("No images to tune on. Place sample pages in the input folder.")
+        return {}
+
+    tuner = ParameterTuner(settings)
+    best = tuner.tune(
+        image_paths,
+        method=settings.get('TUNING_METHOD', 'halving'),
+        eta=settings.get('TUNING_HALVING_ETA', 3)
+    )
+
+    profile_path = settings['TUNING_PROFILE_FILE']
+    with open(profile_path, 'w', encoding='utf-8') as f:
+        json.dump(best, f, ensure_ascii=False, indent=4)
+    tuner.write_report(os.path.splitext(profile_path)[0] + '_report.tsv')
+
+    print(f"[Tuning] Best settings: {best}")
+    print(f"[Tuning] Profile saved to: {profile_path}")
+    return best
@@ -0,0 +1,125 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+def _ink_mask(image) -> np.ndarray:
+    # Dark text on light paper -> 1 for ink pixels (Otsu threshold)
+    if len(image.shape) == 3 and image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, mask = cv2.threshold(image, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return mask
+
+def estimate_text_height(image, min_components: int = 50) -> Optional[float]:
+    """
+    Estimates the typical character height from connected components of the ink.
+    Specks, underlines, rules and merged blocks are excluded by size and shape.
+
+    Args:
+        image (numpy.ndarray): Page image (color or grayscale, dark text on light paper)
+        min_components (int): Minimum number of character-like components for an estimate
+
+    Returns:
+        float: Median character height in pixels, or None if there are too few characters
+    """
+    mask = _ink_mask(image)
+    page_h = mask.shape[0]
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+
+    max_side = max(8, page_h // 20)
+    is_char = ((heights >= 4) & (heights <= max_side) & (widths <= max_side)
+               & (widths <= heights * 3) & (areas >= 0.1 * widths * heights))
+    if np.count_nonzero(is_char) < min_components:
+        return None
+    return float(np.median(heights[is_char]))
+
+def estimate_line_spacing(image, min_lag: int = 8) -> Optional[float]:
+    """
+    Estimates the text line pitch from the autocorrelation of the horizontal ink projection.
+
+    Args:
+        image (numpy.ndarray): Page image (color or grayscale, dark text on light paper)
+        min_lag (int): Smallest line pitch considered, in pixels
+
+    Returns:
+        float: Line pitch in pixels, or None if the profile has no clear period
+    """
+    profile = _ink_mask(image).sum(axis=1).astype(np.float64)
+    profile -= profile.mean()
+    if not profile.any():
+        return None
+
+    # Autocorrelation via FFT, lags up to a quarter of the page
+    n = len(profile)
+    spectrum = np.fft.rfft(profile, 2 * n)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum))[:n // 4]
+    if len(autocorr) <= min_lag + 1 or autocorr[0] <= 0:
+        return None
+    autocorr /= autocorr[0]
+
+    # First local maximum after the zero-lag peak
+    lags = np.arange(min_lag, len(autocorr) - 1)
+    peaks = lags[(autocorr[lags] > autocorr[lags - 1]) & (autocorr[lags] >= autocorr[lags + 1])
+                 & (autocorr[lags] > 0.2)]
+    return float(peaks[0]) if len(peaks) else None
+
+def resolution_scale(image, settings) -> Tuple[float, Optional[float]]:
+    """
+    Computes the scale factor that brings the page to RESOLUTION_TARGET_DPI, from the measured
+    text size compared with the reference size of the collection's typeface at that resolution.
+
+    Args:
+        image (numpy.ndarray): Page image
+        settings (dict): Processing settings (RESOLUTION_* options)
+
+    Returns:
+        Tuple: (scale factor, estimated effective DPI or None if the text size could not be measured)
+    """
+    target_dpi = settings.get('RESOLUTION_TARGET_DPI', 300)
+
+    # Large pages are measured on a copy reduced by an integer factor (text stays well above 4 px)
+    h, w = image.shape[:2]
+    factor = max(1, max(h, w) // settings.get('RESOLUTION_ANALYSIS_SIDE', 3000))
+    if factor > 1:
+        image = cv2.resize(image, (w // factor, h // factor), interpolation=cv2.INTER_AREA)
+
+    height = estimate_text_height(image)
+    if height is not None:
+        effective_dpi = target_dpi * height * factor / settings.get('RESOLUTION_REFERENCE_TEXT_HEIGHT', 24)
+    else:
+        spacing = estimate_line_spacing(image)
+        if spacing is None:
+            return 1.0, None
+        effective_dpi = target_dpi * spacing * factor / settings.get('RESOLUTION_REFERENCE_LINE_SPACING', 50)
+
+    scale = target_dpi / effective_dpi
+    scale = min(max(scale, settings.get('RESOLUTION_MIN_SCALE', 0.25)), settings.get('RESOLUTION_MAX_SCALE', 1.0))
+    if abs(scale - 1.0) < settings.get('RESOLUTION_TOLERANCE', 0.1):
+        scale = 1.0
+    return scale, effective_dpi
+
+def normalize_resolution(image, settings) -> Tuple[np.ndarray, float]:
+    """
+    Resamples a page to the target OCR resolution.
+
+    Args:
+        image (numpy.ndarray): Page image
+        settings (dict): Processing settings
+
+    Returns:
+        Tuple: (resampled image, scale factor; OCR coordinates / scale = coordinates in the input image)
+    """
+    scale, _ = resolution_scale(image, settings)
+    if scale == 1.0:
+        return image, 1.0
+
+    h, w = image.shape[:2]
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    resized = cv2.resize(image, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC)
+
+    # Binarized pages stay black and white
+    if len(image.shape) == 2 and np.isin(image[::16, ::16], (0, 255)).all():
+        _, resized = cv2.threshold(resized, 127, 255, cv2.THRESH_BINARY)
+    return resized, scale
@@ -49,13 +49,19 @@ def rotate_image(image, angle: int):
     M[1, 2] += (new_h / 2) - center[1]
     return cv2.warpAffine(image, M, (new_w, new_h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
 
-def get_text_angle_by_horizontal_lines(image) -> float:
+def detect_hough_lines(image) -> Optional[np.ndarray]:
 
-    # Determining the angle by horizontal lines of text (line spacing)
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Straight lines on the edge map (shared by all Hough-based angle estimates)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
     blurred = cv2.GaussianBlur(gray, (5, 5), 0)
     edges = cv2.Canny(blurred, 50, 150, apertureSize=3)
-    lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=150)
+    return cv2.HoughLines(edges, 1, np.pi / 180, threshold=150)
+
+def get_text_angle_by_horizontal_lines(image, lines=None) -> float:
+
+    # Determining the angle by horizontal lines of text (line spacing)
+    if lines is None:
+        lines = detect_hough_lines(image)
 
     if lines is None:
         return 0.0
@@ -68,13 +74,11 @@ def get_text_angle_by_horizontal_lines(image) -> float:
 
     return np.mean(angles) if angles else 0.0
 
-def get_text_angle_by_vertical_edges(image) -> float:
+def get_text_angle_by_vertical_edges(image, lines=None) -> float:
 
     # Determining the angle by vertical character boundaries
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(blurred, 50, 150, apertureSize=3)
-    lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=150)
+    if lines is None:
+        lines = detect_hough_lines(image)
 
     if lines is None:
         return 0.0
@@ -90,13 +94,14 @@ def get_text_angle_by_vertical_edges(image) -> float:
 
 def get_text_angle_auto(image) -> float:
 
-    # Automatic method selection based on image analysis
-    angle_horizontal = get_text_angle_by_horizontal_lines(image)
-    angle_vertical = get_text_angle_by_vertical_edges(image)
+    # Automatic method selection based on image analysis (lines are detected once)
+    lines = detect_hough_lines(image)
+    angle_horizontal = get_text_angle_by_horizontal_lines(image, lines)
+    angle_vertical = get_text_angle_by_vertical_edges(image, lines)
     
     # We evaluate the "confidence" of each method
-    confidence_horizontal = count_relevant_lines(image, mode='horizontal')
-    confidence_vertical = count_relevant_lines(image, mode='vertical')
+    confidence_horizontal = count_relevant_lines(image, mode='horizontal', lines=lines)
+    confidence_vertical = count_relevant_lines(image, mode='vertical', lines=lines)
     
     # Selection logic (thresholds can be adjusted)
     if confidence_horizontal >= confidence_vertical and abs(angle_horizontal) > 0.1:
@@ -105,13 +110,11 @@ def get_text_angle_auto(image) -> float:
         return angle_vertical
     return 0.0
 
-def count_relevant_lines(image, mode='horizontal') -> int:
+def count_relevant_lines(image, mode='horizontal', lines=None) -> int:
 
     # Calculation of relevant lines for assessing the confidence of the method
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(blurred, 50, 150, apertureSize=3)
-    lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=150)
+    if lines is None:
+        lines = detect_hough_lines(image)
     
     if lines is None:
         return 0
@@ -147,26 +150,25 @@ def get_text_angle_by_hough(image, method='auto') -> float:
     else:
         return get_text_angle_auto(image)
 
-def fine_rotate_projection(image: np.ndarray, angle_range=(-2, 2), step=0.1, verbose=False) -> np.ndarray:
+def estimate_projection_angle(image: np.ndarray, angle_range=(-2, 2), step=0.1) -> float:
     """
-    Rotates the image by a small angle (±2°) to precisely align text lines.
+    Finds the small angle (±2°) that best aligns text lines horizontally.
     The method is based on the analysis of horizontal projections of the image.
 
     Args:
         image (np.ndarray): Input image (color or grayscale)
         angle_range (tuple): Range of angles to iterate over, for example (-2, 2)
         step (float): Angle enumeration step in degrees
-        verbose (bool): If True - prints the best angle found
 
     Returns:
-        np.ndarray: Rotated image
+        float: Best angle in degrees (cv2.getRotationMatrix2D convention)
     """
 
     # Convert to grayscale
     if len(image.shape) == 3:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
+        gray = image
 
     # Let's define a list of angles to iterate over, for example: -2.0, -1.9, ..., 1.9
     angles = np.arange(angle_range[0], angle_range[1] + step, step)
@@ -188,7 +190,23 @@ def fine_rotate_projection(image: np.ndarray, angle_range=(-2, 2), step=0.1, ver
         scores.append(score)
 
     # Selecting the angle with the greatest dispersion (the most "horizontal" lines)
-    best_angle = angles[np.argmax(scores)]
+    return float(angles[np.argmax(scores)])
+
+def fine_rotate_projection(image: np.ndarray, angle_range=(-2, 2), step=0.1, verbose=False) -> np.ndarray:
+    """
+    Rotates the image by a small angle (±2°) to precisely align text lines
+    (see estimate_projection_angle).
+
+    Args:
+        image (np.ndarray): Input image (color or grayscale)
+        angle_range (tuple): Range of angles to iterate over, for example (-2, 2)
+        step (float): Angle enumeration step in degrees
+        verbose (bool): If True - prints the best angle found
+
+    Returns:
+        np.ndarray: Rotated image
+    """
+    best_angle = estimate_projection_angle(image, angle_range, step)
 
     if verbose:
         print(f"[Fine rotate] Optimal rotation angle: {best_angle:.2f}°")
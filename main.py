@@ -1,92 +1,234 @@
 import os
-import difflib
-import html
-from utils.file_utils import recognize_ready_images, process_images_from_folder
-from config.settings import settings
-from postprocessing.text_cleanup import clean_text
-from postprocessing.spell_check import correct_spelling
-from postprocessing.structure_parser import format_text_to_table, format_as_tsv
+import argparse
 
-# Ensure output directory exists
-os.makedirs(settings['OUTPUT_DIR'], exist_ok=True)
+# Subsystems (OpenCV, Tesseract, spell checking) are imported inside the commands
+# that need them, so short runs don't pay for loading the whole pipeline.
 
-if __name__ == "__main__":
-    if settings.get('SKIP_PREPROCESSING'):
+def run_preprocess(settings):
+    """Image preprocessing only (rotation, cropping, tone correction); recognized text is left as is."""
+    from utils.file_utils import process_images_from_folder
+
+    process_images_from_folder(
+        input_folder=settings['INPUT_FOLDER'],
+        processed_folder=settings['PROCESSED_FOLDER'],
+        output_text_file=settings['OUTPUT_TEXT_FILE'],
+        settings={**settings, 'ENABLE_OCR': False}
+    )
+
+def run_ocr(settings):
+    """OCR of already processed images, or text rebuild from stored word tables."""
+    from utils.file_utils import recognize_ready_images, rebuild_text_from_word_data
+
+    if settings.get('REUSE_WORD_DATA'):
+        rebuild_text_from_word_data(settings)
+    else:
         recognize_ready_images(settings)
+
+def run_recognition(settings):
+    """Preprocessing and OCR according to the operation mode settings."""
+    if settings.get('REUSE_WORD_DATA') or settings.get('SKIP_PREPROCESSING'):
+        run_ocr(settings)
     else:
+        from utils.file_utils import process_images_from_folder
+
         process_images_from_folder(
             input_folder=settings['INPUT_FOLDER'],
             processed_folder=settings['PROCESSED_FOLDER'],
-            output_text_file=os.path.join(settings['OUTPUT_DIR'], 'recognized_text.txt'),
+            output_text_file=settings['OUTPUT_TEXT_FILE'],
             settings=settings
         )
 
+def write_spell_diff_html(cleaned, corrected, html_path):
+    """
+    Saves an HTML comparison of cleaned and spell-checked text.
+
+    Returns:
+        bool: True if any differences were found (and the file was written)
+    """
+    import difflib
+    import html
+
+    cleaned_lines = cleaned.splitlines()
+    corrected_lines = corrected.splitlines()
+
+    diff_html = ['<html><head><meta charset="utf-8"><style>',
+                 'body { font-family: monospace; background: #fdfdfd; }',
+                 '.diff { white-space: pre-wrap; }',
+                 '.add { background-color: #c8facc; }',
+                 '.del { background-color: #fdd; text-decoration: line-through; }',
+                 '</style></head><body>']
+    diff_html.append('<h2>Spell check comparison</h2>')
+
+    has_diff = False
+
+    for i, (cl, cr) in enumerate(zip(cleaned_lines, corrected_lines), 1):
+        if cl != cr:
+            has_diff = True
+            sm = difflib.SequenceMatcher(None, cl, cr)
+            chunks = []
+            for opcode, i1, i2, j1, j2 in sm.get_opcodes():
+                if opcode == 'equal':
+                    chunks.append(html.escape(cl[i1:i2]))
+                elif opcode == 'replace':
+                    chunks.append(f'<span class="del">{html.escape(cl[i1:i2])}</span><span class="add">{html.escape(cr[j1:j2])}</span>')
+                elif opcode == 'delete':
+                    chunks.append(f'<span class="del">{html.escape(cl[i1:i2])}</span>')
+                elif opcode == 'insert':
+                    chunks.append(f'<span class="add">{html.escape(cr[j1:j2])}</span>')
+
+            diff_html.append(f'<div class="diff"><strong>Line {i}:</strong><br>{"".join(chunks)}</div><hr>')
+
+    diff_html.append('</body></html>')
+
+    if has_diff:
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(diff_html))
+    return has_diff
+
+def run_postprocess(settings):
+    """Text cleanup, spell checking and the HTML comparison of corrections."""
+    from postprocessing.text_cleanup import clean_text
+    from postprocessing.spell_check import correct_spelling
+    from postprocessing.structure_parser import split_pages, join_pages
+
     # Load OCR text
-    recognized_text_path = os.path.join(settings['OUTPUT_DIR'], 'recognized_text.txt')
-    with open(recognized_text_path, encoding='utf-8') as f:
+    with open(settings['OUTPUT_TEXT_FILE'], encoding='utf-8') as f:
         raw_text = f.read()
 
+    # Pages are cleaned and checked separately to keep page markers intact
+    pages = split_pages(raw_text)
+
+    # === Stage 1: Text cleaning ===
+    cleaned_pages = [(page, clean_text(page_text)) for page, page_text in pages]
+    cleaned = join_pages(cleaned_pages)
+    with open(settings['CLEANED_TEXT_FILE'], 'w', encoding='utf-8') as f:
+        f.write(cleaned)
+
+    # === Stage 2: Spell checking ===
+    corrected = join_pages(
+        (page, correct_spelling(page_text, settings)[0]) for page, page_text in cleaned_pages
+    )
+    with open(settings['SPELLCHECKED_TEXT_FILE'], 'w', encoding='utf-8') as f:
+        f.write(corrected)
+
+    # === Stage 3: Change comparison (HTML) ===
+    report_spell_diff(cleaned, corrected, settings)
+
+def report_spell_diff(cleaned, corrected, settings):
+    """Writes the HTML comparison of cleaned and spell-checked text to the output folder."""
+    html_path = os.path.join(settings['OUTPUT_DIR'], 'spell_diff.html')
+    if write_spell_diff_html(cleaned, corrected, html_path):
+        print(f"\nHTML comparison saved to: {html_path}")
+    else:
+        print("\nNo differences found between cleaned and corrected text.")
+
+def run_export(settings):
+    """Structured export (SQLite and TSV) and the full-text search index update."""
+    corrected_path = settings['SPELLCHECKED_TEXT_FILE']
+
+    # === Stage 4: Structured export (SQLite and TSV), streamed page by page ===
+    if settings.get('ENABLE_EXPORT'):
+        from postprocessing.structure_parser import iter_pages_from_file
+        from postprocessing.export import export_to_sqlite, export_to_tsv
+        from config.settings import batch_name
+
+        # Rows are keyed by batch, so each batch replaces only its own earlier export
+        exported = export_to_sqlite(
+            iter_pages_from_file(corrected_path),
+            settings['EXPORT_DB_FILE'],
+            source_file=batch_name(settings),
+            batch_size=settings.get('EXPORT_BATCH_SIZE', 5000)
+        )
+        export_to_tsv(iter_pages_from_file(corrected_path), settings['TSV_OUTPUT_FILE'])
+        print(f"\nExported {exported} entries to: {settings['EXPORT_DB_FILE']}")
+
+    # === Stage 5: Full-text search index (incremental) ===
+    if settings.get('ENABLE_SEARCH_INDEX'):
+        from postprocessing.search_index import update_index
+        from config.settings import batch_name
+
+        # Every batch writes the same output file; entries are keyed by batch to keep earlier batches
+        indexed = update_index(
+            settings['SEARCH_INDEX_FILE'],
+            [corrected_path],
+            use_lemmas=settings.get('SEARCH_USE_LEMMAS', True),
+            batch=batch_name(settings)
+        )
+        print(f"\nIndexed {indexed} entries in: {settings['SEARCH_INDEX_FILE']}")
+
+def run_tune(settings):
+    """Search of brightness/contrast/gamma and crop settings on sample pages."""
+    from image_processing.parameter_tuning import tune_collection
+
+    tune_collection(settings)
+
+def run_evaluate(settings):
+    """Comparison of the OCR profiles (CER, WER, throughput) on transcribed ground truth pages."""
+    from ocr.evaluation import evaluate_profiles
+
+    evaluate_profiles(settings)
+
+def run_staged(settings):
+    """
+    Full pipeline with overlapping stages: decode, preprocessing, OCR and text postprocessing
+    run in separate worker groups, then the HTML comparison and export.
+    """
+    from utils.staged_pipeline import run_staged_pipeline
+
+    run_staged_pipeline(settings)
+
+    if settings.get('ENABLE_POSTPROCESSING'):
+        with open(settings['CLEANED_TEXT_FILE'], encoding='utf-8') as f:
+            cleaned = f.read()
+        with open(settings['SPELLCHECKED_TEXT_FILE'], encoding='utf-8') as f:
+            corrected = f.read()
+        report_spell_diff(cleaned, corrected, settings)
+        run_export(settings)
+        print(f"\nPost-processing completed.")
+
+def run_pipeline(settings):
+    """Full pipeline: recognition, then postprocessing and export if enabled."""
+    # The staged pipeline needs the source images (no OCR-only or word-table modes)
+    if settings.get('STAGED_PIPELINE'):
+        if not (settings.get('REUSE_WORD_DATA') or settings.get('SKIP_PREPROCESSING')):
+            run_staged(settings)
+            return
+        print("[!] STAGED_PIPELINE needs SKIP_PREPROCESSING=False and REUSE_WORD_DATA=False; "
+              "running the sequential pipeline")
+
+    run_recognition(settings)
+
     if settings.get('ENABLE_POSTPROCESSING'):
-        # === Stage 1: Text cleaning ===
-        cleaned = clean_text(raw_text)
-        cleaned_path = os.path.join(settings['OUTPUT_DIR'], 'cleaned_text.txt')
-        with open(cleaned_path, 'w', encoding='utf-8') as f:
-            f.write(cleaned)
-
-        # === Stage 2: Spell checking ===
-        corrected, _ = correct_spelling(cleaned, settings)
-        corrected_path = os.path.join(settings['OUTPUT_DIR'], 'spell_checked_text.txt')
-        with open(corrected_path, 'w', encoding='utf-8') as f:
-            f.write(corrected)
-
-        # === Stage 3: Change comparison (HTML) ===
-        cleaned_lines = cleaned.splitlines()
-        corrected_lines = corrected.splitlines()
-        
-        diff_html = ['<html><head><meta charset="utf-8"><style>',
-                     'body { font-family: monospace; background: #fdfdfd; }',
-                     '.diff { white-space: pre-wrap; }',
-                     '.add { background-color: #c8facc; }',
-                     '.del { background-color: #fdd; text-decoration: line-through; }',
-                     '</style></head><body>']
-        diff_html.append('<h2>Spell check comparison</h2>')
-        
-        has_diff = False
-        
-        for i, (cl, cr) in enumerate(zip(cleaned_lines, corrected_lines), 1):
-            if cl != cr:
-                has_diff = True
-                sm = difflib.SequenceMatcher(None, cl, cr)
-                chunks = []
-                for opcode, i1, i2, j1, j2 in sm.get_opcodes():
-                    if opcode == 'equal':
-                        chunks.append(html.escape(cl[i1:i2]))
-                    elif opcode == 'replace':
-                        chunks.append(f'<span class="del">{html.escape(cl[i1:i2])}</span><span class="add">{html.escape(cr[j1:j2])}</span>')
-                    elif opcode == 'delete':
-                        chunks.append(f'<span class="del">{html.escape(cl[i1:i2])}</span>')
-                    elif opcode == 'insert':
-                        chunks.append(f'<span class="add">{html.escape(cr[j1:j2])}</span>')
-        
-                diff_html.append(f'<div class="diff"><strong>Line {i}:</strong><br>{"".join(chunks)}</div><hr>')
-        
-        diff_html.append('</body></html>')
-        
-        if has_diff:
-            html_path = os.path.join(settings['OUTPUT_DIR'], 'spell_diff.html')
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(diff_html))
-            print(f"\nHTML comparison saved to: {html_path}")
-        else:
-            print("\nNo differences found between cleaned and corrected text.")
-
-        # === Stage 4 temporarily disabled: saving only spell_checked_text.txt ===
-        # rows = format_text_to_table(corrected)
-        # tsv = format_as_tsv(rows)
-        # tsv_path = os.path.join(settings['OUTPUT_DIR'], 'recognized_text.tsv')
-        # with open(tsv_path, 'w', encoding='utf-8') as f:
-        #     f.write(tsv)
-
-        print(f"\nPost-processing completed.") 
+        run_postprocess(settings)
+        run_export(settings)
+        print(f"\nPost-processing completed.")
     else:
-        print("\nPost-processing disabled (ENABLE_POSTPROCESSING=False)")
\ No newline at end of file
+        print("\nPost-processing disabled (ENABLE_POSTPROCESSING=False)")
+
+COMMANDS = {
+    'run': run_pipeline,
+    'preprocess': run_preprocess,
+    'ocr': run_ocr,
+    'postprocess': run_postprocess,
+    'export': run_export,
+    'tune': run_tune,
+    'evaluate': run_evaluate,
+}
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Archival inventories and documents processing")
+    parser.add_argument('command', nargs='?', default='run', choices=list(COMMANDS),
+                        help="Pipeline stage to run (default: full pipeline)")
+    parser.add_argument('--config', help="JSON file with settings overrides")
+    return parser
+
+def main(argv=None):
+    from config.settings import load_settings, ensure_directories
+
+    args = build_parser().parse_args(argv)
+    settings = load_settings(config_file=args.config)
+    ensure_directories(settings)
+    COMMANDS[args.command](settings)
+
+if __name__ == "__main__":
+    main()
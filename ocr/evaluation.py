@@ -0,0 +1,190 @@
+import os
+import time
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from config.settings import apply_ocr_profile
+from image_processing.image_processing import process_image
+from utils.image_io import PageImage
+from ocr.tesseract_ocr import get_ocr_text
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+# Transcription of page.jpg is page.gt.txt in the same folder
+GROUND_TRUTH_SUFFIX = '.gt.txt'
+
+def edit_distance(reference: Sequence, hypothesis: Sequence) -> int:
+    """
+    Levenshtein distance (insertions, deletions and substitutions) between two sequences.
+    Each row of the dynamic programming table is computed with NumPy operations: substitutions
+    and deletions elementwise, insertions as a running minimum along the row.
+
+    Args:
+        reference (Sequence): Reference characters or word ids
+        hypothesis (Sequence): Recognized characters or word ids
+
+    Returns:
+        int: Number of edits
+    """
+    if len(reference) == 0 or len(hypothesis) == 0:
+        return max(len(reference), len(hypothesis))
+
+    ref = np.asarray(list(reference))  # A str would become a single 0-d element
+    positions = np.arange(len(ref) + 1)
+    row = positions.copy()
+    for i, symbol in enumerate(hypothesis, start=1):
+        current = np.empty_like(row)
+        current[0] = i
+        current[1:] = np.minimum(row[:-1] + (ref != symbol), row[1:] + 1)
+        # Insertions: current[j] = min over k <= j of current[k] + (j - k)
+        row = np.minimum.accumulate(current - positions) + positions
+    return int(row[-1])
+
+def normalize_text(text: str) -> str:
+    """Collapses runs of whitespace (line breaks, indentation) into single spaces."""
+    return ' '.join(text.split())
+
+def error_counts(reference: str, hypothesis: str) -> Tuple[int, int, int, int]:
+    """
+    Character and word edit counts of a page, on whitespace-normalized text.
+
+    Args:
+        reference (str): Ground truth text
+        hypothesis (str): Recognized text
+
+    Returns:
+        Tuple: (character edits, reference characters, word edits, reference words)
+    """
+    reference, hypothesis = normalize_text(reference), normalize_text(hypothesis)
+    char_edits = edit_distance([ord(c) for c in reference], [ord(c) for c in hypothesis])
+
+    # Words are compared as integer ids
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    vocabulary = {word: i for i, word in enumerate(set(ref_words) | set(hyp_words))}
+    word_edits = edit_distance([vocabulary[w] for w in ref_words], [vocabulary[w] for w in hyp_words])
+    return char_edits, len(reference), word_edits, len(ref_words)
+
+def load_ground_truth(folder: str) -> List[Tuple[str, str]]:
+    """
+    Finds page images with a transcription (<image name>.gt.txt) in the folder.
+
+    Args:
+        folder (str): Ground truth folder
+
+    Returns:
+        List[Tuple[str, str]]: (image path, ground truth text), sorted by file name
+    """
+    if not os.path.isdir(folder):
+        return []
+
+    pages = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        gt_path = os.path.join(folder, os.path.splitext(filename)[0] + GROUND_TRUTH_SUFFIX)
+        if not os.path.exists(gt_path):
+            print(f"[!] No transcription for {filename}, skipped")
+            continue
+        with open(gt_path, encoding='utf-8') as f:
+            pages.append((os.path.join(folder, filename), f.read()))
+    return pages
+
+def evaluate_profile(pages: List[Tuple[str, str]], settings: dict) -> Dict[str, float]:
+    """
+    Recognizes the ground truth pages with the given settings and measures accuracy and speed.
+    Latency covers decoding, preprocessing and OCR of a page.
+
+    Args:
+        pages (List[Tuple[str, str]]): (image path, ground truth text) pairs
+        settings (dict): Processing settings with the profile applied
+
+    Returns:
+        dict: cer, wer, pages_per_second, mean_latency, p95_latency (seconds)
+    """
+    char_edits = char_total = word_edits = word_total = 0
+    latencies = []
+    for image_path, reference in pages:
+        start = time.perf_counter()
+        page = PageImage(image_path, settings)
+        image = page.full
+        if image is None:
+            print(f"Loading error: {image_path}")
+            continue
+        if settings.get('EVALUATION_PREPROCESS', True):
+            image = process_image(image, settings, page.analysis)
+        text = get_ocr_text(image, settings)
+        latencies.append(time.perf_counter() - start)
+
+        counts = error_counts(reference, text)
+        char_edits += counts[0]
+        char_total += counts[1]
+        word_edits += counts[2]
+        word_total += counts[3]
+
+    if not latencies:
+        return {}
+    return {
+        'cer': char_edits / max(char_total, 1),
+        'wer': word_edits / max(word_total, 1),
+        'pages_per_second': len(latencies) / sum(latencies),
+        'mean_latency': float(np.mean(latencies)),
+        'p95_latency': float(np.percentile(latencies, 95)),
+    }
+
+def recommend_profile(results: Dict[str, dict], max_cer: float):
+    """Returns the fastest profile within the CER target, or the most accurate one if none meets it."""
+    within = [name for name, r in results.items() if r['cer'] <= max_cer]
+    if within:
+        return max(within, key=lambda name: results[name]['pages_per_second'])
+    return min(results, key=lambda name: results[name]['cer'])
+
+def write_report(results: Dict[str, dict], report_path: str):
+    """Saves the profile measurements as TSV, fastest first."""
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    ranked = sorted(results, key=lambda name: results[name]['pages_per_second'], reverse=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write('profile\tcer\twer\tpages_per_second\tmean_latency\tp95_latency\n')
+        for name in ranked:
+            r = results[name]
+            f.write(f"{name}\t{r['cer']:.4f}\t{r['wer']:.4f}\t{r['pages_per_second']:.3f}"
+                    f"\t{r['mean_latency']:.3f}\t{r['p95_latency']:.3f}\n")
+
+def evaluate_profiles(settings: dict) -> Dict[str, dict]:
+    """
+    Compares the OCR profiles on the transcribed pages of EVALUATION_FOLDER, saves a TSV report
+    and recommends the fastest profile whose character error rate is within EVALUATION_MAX_CER.
+
+    Args:
+        settings (dict): Processing settings, including the EVALUATION_* options
+
+    Returns:
+        dict: Measurements per profile name
+    """
+    pages = load_ground_truth(settings['EVALUATION_FOLDER'])
+    if not pages:
+        print(f"No transcribed pages in {settings['EVALUATION_FOLDER']}. "
+              f"Place page images with <name>{GROUND_TRUTH_SUFFIX} transcriptions there.")
+        return {}
+
+    results = {}
+    for name in settings.get('EVALUATION_PROFILES', ('fast', 'balanced', 'accurate')):
+        # Ground truth pages are preprocessed according to EVALUATION_PREPROCESS, not SKIP_PREPROCESSING
+        profile_settings = {**settings, 'SKIP_PREPROCESSING': not settings.get('EVALUATION_PREPROCESS', True)}
+        result = evaluate_profile(pages, apply_ocr_profile(profile_settings, name))
+        if not result:
+            continue
+        results[name] = result
+        print(f"[Evaluation] {name}: CER {result['cer']:.2%}, WER {result['wer']:.2%}, "
+              f"{result['pages_per_second']:.2f} pages/s, p95 latency {result['p95_latency']:.2f} s")
+
+    if not results:
+        return {}
+    write_report(results, settings['EVALUATION_REPORT_FILE'])
+
+    max_cer = settings.get('EVALUATION_MAX_CER', 0.05)
+    best = recommend_profile(results, max_cer)
+    if results[best]['cer'] <= max_cer:
+        print(f"[Evaluation] Recommended profile: {best} (fastest with CER <= {max_cer:.2%})")
+    else:
+        print(f"[!] No profile reaches CER <= {max_cer:.2%}; most accurate: {best}")
+    print(f"[Evaluation] Report saved to: {settings['EVALUATION_REPORT_FILE']}")
+    return results
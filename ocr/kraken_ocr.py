@@ -0,0 +1,204 @@
+import os
+import time
+import logging
+from typing import List, Optional
+
+# Kraken and torch are imported only when the recognizer is created (handwritten documents)
+
+logger = logging.getLogger('KrakenOCR')
+
+# Line extraction (dict bounds), ImageInputTransforms and batched predict_string follow the 4.x API;
+# 3.x lacks these signatures and 5.x expects Segmentation objects
+SUPPORTED_KRAKEN_MAJOR = 4
+
+def check_kraken_version():
+    """Raises RuntimeError if the installed Kraken is not a supported (4.x) version."""
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        installed = version('kraken')
+    except PackageNotFoundError:
+        raise RuntimeError("Kraken is not installed: pip install 'kraken>=4,<5'") from None
+    if installed.split('.')[0] != str(SUPPORTED_KRAKEN_MAJOR):
+        raise RuntimeError(f"Kraken {installed} is not supported, handwritten recognition needs "
+                           f"kraken {SUPPORTED_KRAKEN_MAJOR}.x: pip install 'kraken>=4,<5'")
+
+class KrakenRecognizer:
+    """
+    Handwritten text recognition with Kraken (baseline segmentation + line recognition) on CPU.
+    Models are loaded once per process; lines are recognized in padded batches to use all
+    torch intra-op threads. Lines of several pages are batched together only when the caller
+    passes several pages (the sequential pipeline); the other paths pass one page at a time.
+    """
+
+    def __init__(self, settings: dict):
+        check_kraken_version()
+
+        import torch
+        from kraken import blla
+        from kraken.lib import models, vgsl
+        from kraken.lib.dataset import ImageInputTransforms
+
+        threads = settings.get('KRAKEN_THREADS') or os.cpu_count()
+        torch.set_num_threads(threads)
+
+        seg_model_path = settings.get('KRAKEN_SEGMENTATION_MODEL') or \
+            os.path.join(os.path.dirname(blla.__file__), 'blla.mlmodel')
+        self.seg_model = vgsl.TorchVGSLModel.load_model(seg_model_path)
+
+        rec_model_path = settings.get('KRAKEN_RECOGNITION_MODEL')
+        if not rec_model_path or not os.path.exists(rec_model_path):
+            raise FileNotFoundError(f"Kraken recognition model not found: {rec_model_path}")
+        self.rec_model = models.load_any(rec_model_path)
+
+        # Line image -> normalized tensor, as in kraken.rpred
+        batch, channels, height, width = self.rec_model.nn.input
+        self.transforms = ImageInputTransforms(batch, height, width, channels, (16, 0), valid_norm=False)
+
+        self.batch_size = settings.get('KRAKEN_BATCH_SIZE', 32)
+        self.stats = {'pages': 0, 'lines': 0, 'segmentation_seconds': 0.0, 'recognition_seconds': 0.0}
+
+    def segment(self, image) -> List:
+        """
+        Splits a page into text line images in reading order.
+
+        Args:
+            image (numpy.ndarray): Page image (color or grayscale)
+
+        Returns:
+            List[torch.Tensor]: Normalized line tensors (C, H, W)
+        """
+        import cv2
+        from PIL import Image
+        from kraken import blla
+        from kraken.lib.segmentation import extract_polygons
+
+        if len(image.shape) == 3 and image.shape[2] == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        page = Image.fromarray(image)
+
+        start = time.perf_counter()
+        bounds = blla.segment(page, model=self.seg_model)
+
+        lines = []
+        for line in bounds['lines']:
+            try:
+                box, _ = next(extract_polygons(page, {**bounds, 'lines': [line]}))
+                if 0 in box.size:
+                    continue
+                tensor = self.transforms(box)
+            except Exception as e:
+                logger.warning(f'Line extraction failed: {e}')
+                continue
+            if tensor.max() > tensor.min():  # Skip empty lines
+                lines.append(tensor)
+        self.stats['segmentation_seconds'] += time.perf_counter() - start
+        return lines
+
+    def recognize_lines(self, lines: List) -> List[str]:
+        """
+        Recognizes line tensors in batches; lines of similar width are batched together to limit padding.
+
+        Args:
+            lines (List[torch.Tensor]): Line tensors (C, H, W)
+
+        Returns:
+            List[str]: Recognized text of each line, in input order
+        """
+        import torch
+        import torch.nn.functional as F
+
+        start = time.perf_counter()
+        order = sorted(range(len(lines)), key=lambda i: lines[i].shape[2])
+        results = [''] * len(lines)
+
+        with torch.no_grad():
+            for batch_start in range(0, len(order), self.batch_size):
+                indexes = order[batch_start:batch_start + self.batch_size]
+                widths = [lines[i].shape[2] for i in indexes]
+                max_width = max(widths)
+                batch = torch.stack([F.pad(lines[i], (0, max_width - lines[i].shape[2])) for i in indexes])
+                predictions = self.rec_model.predict_string(batch, torch.tensor(widths))
+                for i, text in zip(indexes, predictions):
+                    results[i] = text.strip()
+
+        self.stats['recognition_seconds'] += time.perf_counter() - start
+        self.stats['lines'] += len(lines)
+        return results
+
+    def recognize_pages(self, images: List) -> List[str]:
+        """
+        Recognizes several pages with one batched recognition pass over all their lines.
+
+        Args:
+            images (List[numpy.ndarray]): Page images
+
+        Returns:
+            List[str]: Text of each page, one recognized line per line
+        """
+        page_lines = [self.segment(image) for image in images]
+        texts = self.recognize_lines([line for lines in page_lines for line in lines])
+
+        pages, position = [], 0
+        for lines in page_lines:
+            page_texts = texts[position:position + len(lines)]
+            pages.append('\n'.join(t for t in page_texts if t))
+            position += len(lines)
+
+        self.stats['pages'] += len(images)
+        return pages
+
+    def throughput(self) -> dict:
+        """Returns processed pages/lines and lines per second (recognition only and end-to-end)."""
+        total = self.stats['segmentation_seconds'] + self.stats['recognition_seconds']
+        return {
+            **self.stats,
+            'recognition_lines_per_second': self.stats['lines'] / self.stats['recognition_seconds']
+            if self.stats['recognition_seconds'] else 0.0,
+            'lines_per_second': self.stats['lines'] / total if total else 0.0,
+        }
+
+_recognizer: Optional[KrakenRecognizer] = None
+
+def get_recognizer(settings) -> KrakenRecognizer:
+    """Returns the recognizer of this process, loading the models on first use."""
+    global _recognizer
+    if _recognizer is None:
+        _recognizer = KrakenRecognizer(settings)
+    return _recognizer
+
+def get_kraken_pages_text(images, settings) -> List[str]:
+    """
+    Recognizes handwritten text on several pages (lines of all pages are batched together).
+
+    Args:
+        images (List[numpy.ndarray]): Page images
+        settings (dict): Processing settings
+
+    Returns:
+        List[str]: Recognized text of each page
+    """
+    return get_recognizer(settings).recognize_pages(images)
+
+def get_kraken_text(image, settings, word_data_path: Optional[str] = None) -> str:
+    """
+    Recognizes handwritten text on an image (same interface as get_ocr_text).
+
+    Args:
+        image (numpy.ndarray): Input image
+        settings (dict): Processing settings
+        word_data_path (str): Not used (word tables are Tesseract-specific)
+
+    Returns:
+        str: Recognized text
+    """
+    return get_kraken_pages_text([image], settings)[0]
+
+def print_throughput():
+    """Prints Kraken throughput of this process, to size hardware for handwritten batches."""
+    if _recognizer is None:
+        return
+    stats = _recognizer.throughput()
+    print(f"[Kraken] {stats['pages']} page(s), {stats['lines']} line(s): "
+          f"{stats['lines_per_second']:.1f} lines/s "
+          f"(recognition only {stats['recognition_lines_per_second']:.1f} lines/s)")
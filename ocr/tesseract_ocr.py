@@ -1,16 +1,32 @@
+import os
+import numpy as np
 import pytesseract
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-def get_ocr_text(image, settings):
+# Integer columns of the Tesseract image_to_data table
+WORD_INT_FIELDS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                   'left', 'top', 'width', 'height')
+
+# Box columns, in pixels of the image passed to Tesseract
+BOX_FIELDS = ('left', 'top', 'width', 'height')
+
+# Keys used to group words into lines of output text
+GROUPING_KEYS = {
+    'line': ('block_num', 'par_num', 'line_num'),
+    'paragraph': ('block_num', 'par_num'),
+    'block': ('block_num',),
+}
+
+def get_ocr_data(image, settings) -> dict:
     """
-    Распознаёт текст на изображении с помощью Tesseract OCR.
+    Runs Tesseract on the image and returns the raw word table.
 
     Args:
-        image (numpy.ndarray): Входное изображение
-        settings (dict): Настройки обработки, включая язык
-        
+        image (numpy.ndarray): Input image
+        settings (dict): Processing settings, including the language
+
     Returns:
-        str: Распознанный текст
+        dict: pytesseract.image_to_data output (Output.DICT)
     """
     lang_option = settings.get('OCR_LANGUAGE', 'auto').lower()
 
@@ -23,19 +39,124 @@ def get_ocr_text(image, settings):
 
     lang = lang_map.get(lang_option, 'rus+deu+lav')
 
-    custom_config = r'--oem 3 --psm 6'
-    ocr_data = pytesseract.image_to_data(
+    custom_config = (f"--oem {settings.get('OCR_ENGINE_MODE', 3)} "
+                     f"--psm {settings.get('OCR_PAGE_SEGMENTATION_MODE', 6)}")
+    return pytesseract.image_to_data(
         image, lang=lang, config=custom_config, output_type=pytesseract.Output.DICT
     )
 
-    lines = {}
-    n = len(ocr_data['text'])
+def ocr_data_to_array(ocr_data: dict) -> np.ndarray:
+    """
+    Converts the Tesseract word table into a NumPy structured array.
+
+    Args:
+        ocr_data (dict): pytesseract.image_to_data output (Output.DICT)
+
+    Returns:
+        numpy.ndarray: One record per table row with 'text', 'conf' and the integer
+        ids / bounding box fields from WORD_INT_FIELDS
+    """
+    texts = [str(t).strip() for t in ocr_data['text']]
+    text_width = max([len(t) for t in texts] + [1])
+    dtype = [('text', f'<U{text_width}'), ('conf', np.float32)] + [(f, np.int32) for f in WORD_INT_FIELDS]
+
+    words = np.empty(len(texts), dtype=dtype)
+    words['text'] = texts
+    words['conf'] = np.asarray(ocr_data['conf'], dtype=np.float32)
+    for field in WORD_INT_FIELDS:
+        words[field] = np.asarray(ocr_data[field], dtype=np.int32)
+    return words
+
+def save_word_table(words: np.ndarray, path: str, scale: float = 1.0):
+    """
+    Saves a word table (see ocr_data_to_array) as a compressed .npz file, one array per column.
+
+    Args:
+        words (numpy.ndarray): Word table
+        path (str): .npz path
+        scale (float): Resolution scale applied before OCR (boxes / scale = processed image coordinates)
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(path, __scale__=np.float64(scale), **{name: words[name] for name in words.dtype.names})
+
+def load_word_table(path: str, processed_coordinates: bool = False) -> np.ndarray:
+    """
+    Loads a word table saved by save_word_table.
+
+    Args:
+        path (str): .npz path
+        processed_coordinates (bool): Map boxes back to the processed (rotated and cropped) image
+            if the page was resampled for OCR. The geometry transform is not stored, so boxes
+            are never in the coordinates of the original scan.
+    """
+    with np.load(path) as data:
+        names = [name for name in data.files if name != '__scale__']
+        columns = {name: data[name] for name in names}
+        scale = float(data['__scale__']) if '__scale__' in data.files else 1.0
+    words = np.empty(len(columns['text']), dtype=[(name, columns[name].dtype) for name in names])
+    for name in names:
+        words[name] = columns[name]
+
+    if processed_coordinates and scale != 1.0:
+        for field in BOX_FIELDS:
+            words[field] = np.round(words[field] / scale)
+    return words
 
-    for i in range(n):
-        text = ocr_data['text'][i].strip()
-        if text and int(ocr_data['conf'][i]) > 50:
-            key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
-            lines.setdefault(key, []).append(text)
+def words_to_text(words: np.ndarray, min_conf: float = 50, grouping: str = 'line') -> str:
+    """
+    Builds text from a word table, keeping only confident words.
 
-    sorted_lines = [' '.join(lines[k]) for k in sorted(lines.keys()) if lines[k]]
-    return '\n'.join(sorted_lines)
+    Args:
+        words (numpy.ndarray): Word table (see ocr_data_to_array)
+        min_conf (float): Words with confidence not above this value are dropped
+        grouping (str): Output line unit: 'line', 'paragraph' or 'block'
+
+    Returns:
+        str: Recognized text, one group per line, in reading order
+    """
+    keys = GROUPING_KEYS.get(grouping, GROUPING_KEYS['line'])
+
+    # Tesseract confidences are compared as integers
+    mask = (np.char.str_len(words['text']) > 0) & (np.trunc(words['conf']) > min_conf)
+    selected = words[mask]
+    if len(selected) == 0:
+        return ''
+
+    # Sort by group key, keeping the original word order inside each group
+    order = np.lexsort([np.arange(len(selected))] + [selected[k] for k in reversed(keys)])
+    selected = selected[order]
+    group_ids = np.stack([selected[k] for k in keys], axis=1)
+    breaks = np.flatnonzero(np.any(group_ids[1:] != group_ids[:-1], axis=1)) + 1
+
+    lines = [' '.join(group) for group in np.split(selected['text'], breaks)]
+    return '\n'.join(lines)
+
+def get_ocr_text(image, settings, word_data_path: Optional[str] = None):
+    """
+    Распознаёт текст на изображении с помощью Tesseract OCR.
+
+    Args:
+        image (numpy.ndarray): Входное изображение
+        settings (dict): Настройки обработки, включая язык
+        word_data_path (str): Путь для сохранения полной таблицы слов (.npz),
+            чтобы позже пересобрать текст без повторного OCR
+        
+    Returns:
+        str: Распознанный текст
+    """
+    # Resampling to the target OCR resolution; the scale is kept with the word boxes
+    scale = 1.0
+    if settings.get('NORMALIZE_RESOLUTION'):
+        from image_processing.resolution import normalize_resolution
+        image, scale = normalize_resolution(image, settings)
+
+    words = ocr_data_to_array(get_ocr_data(image, settings))
+
+    if word_data_path:
+        save_word_table(words, word_data_path, scale=scale)
+
+    return words_to_text(
+        words,
+        min_conf=settings.get('OCR_MIN_CONFIDENCE', 50),
+        grouping=settings.get('OCR_LINE_GROUPING', 'line')
+    )
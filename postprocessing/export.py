@@ -0,0 +1,98 @@
+import os
+import sqlite3
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+from postprocessing.structure_parser import iter_table_rows, parse_year_range
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    case_number TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date_range TEXT NOT NULL,
+    year_from INTEGER,
+    year_to INTEGER,
+    source_file TEXT NOT NULL,
+    page TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_case_number ON cases (case_number);
+CREATE INDEX IF NOT EXISTS idx_cases_year ON cases (year_from, year_to);
+CREATE INDEX IF NOT EXISTS idx_cases_source ON cases (source_file, page);
+"""
+
+def iter_export_rows(pages: Iterable[Tuple[str, str]], source_file: str) -> Iterator[tuple]:
+    """
+    Parses inventory entries page by page and adds provenance to each row.
+
+    Args:
+        pages (Iterable[Tuple[str, str]]): (page name, page text) pairs
+        source_file (str): Source (batch) identifier stored with every row
+
+    Yields:
+        tuple: (case number, title, date range, first year, last year, source file, page)
+    """
+    for page, page_text in pages:
+        for number, title, date_range in iter_table_rows(page_text):
+            year_from, year_to = parse_year_range(date_range)
+            yield number, title, date_range, year_from, year_to, source_file, page
+
+def export_to_sqlite(pages: Iterable[Tuple[str, str]], db_path: str, source_file: str,
+                     batch_size: int = 5000) -> int:
+    """
+    Streams parsed inventory rows into a SQLite database.
+    Rows are inserted with executemany in batches of batch_size. Rows previously exported
+    from the same source are replaced in the same transaction, so a failed export
+    leaves the earlier rows of the source in place.
+
+    Args:
+        pages (Iterable[Tuple[str, str]]): (page name, page text) pairs
+        db_path (str): Path to the SQLite database (created if missing)
+        source_file (str): Source (batch) identifier stored with every row
+        batch_size (int): Number of rows per insert batch
+
+    Returns:
+        int: Number of exported rows
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        rows = iter_export_rows(pages, source_file)
+        total = 0
+        with conn:
+            conn.execute('DELETE FROM cases WHERE source_file = ?', (source_file,))
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(
+                    'INSERT INTO cases (case_number, title, date_range, year_from, year_to, source_file, page) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    batch
+                )
+                total += len(batch)
+        return total
+    finally:
+        conn.close()
+
+def export_to_tsv(pages: Iterable[Tuple[str, str]], tsv_path: str) -> int:
+    """
+    Writes parsed inventory rows to a TSV file incrementally, page by page.
+    Columns: case number, title, date range, page.
+
+    Args:
+        pages (Iterable[Tuple[str, str]]): (page name, page text) pairs
+        tsv_path (str): Output TSV file
+
+    Returns:
+        int: Number of written rows
+    """
+    total = 0
+    with open(tsv_path, 'w', encoding='utf-8') as f:
+        for page, page_text in pages:
+            for row in iter_table_rows(page_text):
+                f.write('\t'.join(row + (page,)) + '\n')
+                total += 1
+    return total
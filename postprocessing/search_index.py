@@ -0,0 +1,208 @@
+import os
+import re
+import sqlite3
+import argparse
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from postprocessing.text_cleanup import split_entries
+from postprocessing.structure_parser import iter_pages_from_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_file TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    entries INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    page TEXT NOT NULL,
+    entry_no INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_source ON entries (source_file);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    terms, tokenize = 'unicode61 remove_diacritics 0'
+);
+"""
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+@lru_cache(maxsize=1)
+def _get_morph():
+    # pymorphy2 is loaded only when lemma normalization is actually used
+    try:
+        from pymorphy2 import MorphAnalyzer
+    except ImportError:
+        print("[!] pymorphy2 is not installed, indexing without lemmatization")
+        return None
+    return MorphAnalyzer()
+
+@lru_cache(maxsize=100000)
+def _normalize_token(token: str, use_lemmas: bool) -> str:
+    token = token.lower().replace('ё', 'е')
+    morph = _get_morph() if use_lemmas and token.isalpha() else None
+    if morph is None:
+        return token
+    return morph.parse(token)[0].normal_form.replace('ё', 'е')
+
+def normalize_terms(text: str, use_lemmas: bool = True) -> List[str]:
+    """
+    Converts text into index terms: lowercase tokens, lemmatized with pymorphy2 if enabled.
+
+    Args:
+        text (str): Entry or query text
+        use_lemmas (bool): Reduce words to their normal form
+
+    Returns:
+        List[str]: Normalized terms in text order
+    """
+    return [_normalize_token(token, use_lemmas) for token in TOKEN_PATTERN.findall(text)]
+
+def open_index(db_path: str) -> sqlite3.Connection:
+    """Opens (and creates if needed) the search index database."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+def index_pages(conn: sqlite3.Connection, pages: Iterable[Tuple[str, str]], source_file: str,
+                mtime: float = 0.0, use_lemmas: bool = True) -> int:
+    """
+    Replaces the indexed entries of one source (batch) with entries from the given pages.
+
+    Args:
+        conn (sqlite3.Connection): Open index (see open_index)
+        pages (Iterable[Tuple[str, str]]): (page name, page text) pairs
+        source_file (str): Source (batch) the pages belong to
+        mtime (float): Modification time of the source text file, used for incremental updates
+        use_lemmas (bool): Index lemma-normalized terms
+
+    Returns:
+        int: Number of indexed entries
+    """
+    total = 0
+    with conn:
+        conn.execute(
+            'DELETE FROM entries_fts WHERE rowid IN (SELECT id FROM entries WHERE source_file = ?)',
+            (source_file,)
+        )
+        conn.execute('DELETE FROM entries WHERE source_file = ?', (source_file,))
+
+        for page, page_text in pages:
+            for entry_no, entry in enumerate(split_entries(page_text), 1):
+                cursor = conn.execute(
+                    'INSERT INTO entries (source_file, page, entry_no, text) VALUES (?, ?, ?, ?)',
+                    (source_file, page, entry_no, entry)
+                )
+                conn.execute(
+                    'INSERT INTO entries_fts (rowid, terms) VALUES (?, ?)',
+                    (cursor.lastrowid, ' '.join(normalize_terms(entry, use_lemmas)))
+                )
+                total += 1
+
+        conn.execute(
+            'INSERT OR REPLACE INTO sources (source_file, mtime, entries) VALUES (?, ?, ?)',
+            (source_file, mtime, total)
+        )
+    return total
+
+def source_key(path: str, batch: Optional[str] = None) -> str:
+    """Index key of a text file: batch name plus file name, or the absolute path without a batch."""
+    if batch:
+        return f"{batch}/{os.path.basename(path)}"
+    return os.path.abspath(path)
+
+def update_index(db_path: str, text_files: Iterable[str], use_lemmas: bool = True, force: bool = False,
+                 batch: Optional[str] = None) -> int:
+    """
+    Adds new or changed text files to the index; unchanged files are skipped.
+    Entries are replaced per source key, so batches written to the same output file path
+    must be indexed with their batch name to keep the entries of earlier batches.
+
+    Args:
+        db_path (str): Path to the index database
+        text_files (Iterable[str]): Spell-checked text files with page markers
+        use_lemmas (bool): Index lemma-normalized terms
+        force (bool): Re-index files even if they did not change
+        batch (str): Batch the files belong to (see source_key)
+
+    Returns:
+        int: Number of indexed entries
+    """
+    conn = open_index(db_path)
+    total = 0
+    try:
+        for path in text_files:
+            source_file = source_key(path, batch)
+            mtime = os.path.getmtime(path)
+            row = conn.execute('SELECT mtime FROM sources WHERE source_file = ?', (source_file,)).fetchone()
+            if row and row[0] == mtime and not force:
+                continue
+            total += index_pages(conn, iter_pages_from_file(path), source_file, mtime, use_lemmas)
+    finally:
+        conn.close()
+    return total
+
+def search(db_path: str, query: str, limit: int = 20, use_lemmas: bool = True) -> List[dict]:
+    """
+    Finds entries containing all words of the query (in any word form if lemmas are used).
+
+    Args:
+        db_path (str): Path to the index database
+        query (str): Search words
+        limit (int): Maximum number of results
+        use_lemmas (bool): Must match the setting used for indexing
+
+    Returns:
+        List[dict]: Matches ordered by relevance, with keys
+        'source_file', 'page', 'entry_no', 'text'
+    """
+    terms = normalize_terms(query, use_lemmas)
+    if not terms:
+        return []
+    match = ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+    conn = open_index(db_path)
+    try:
+        rows = conn.execute(
+            'SELECT e.source_file, e.page, e.entry_no, e.text FROM entries_fts '
+            'JOIN entries e ON e.id = entries_fts.rowid '
+            'WHERE entries_fts MATCH ? ORDER BY bm25(entries_fts) LIMIT ?',
+            (match, limit)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(('source_file', 'page', 'entry_no', 'text'), row)) for row in rows]
+
+def main(argv=None):
+    from config.settings import settings
+
+    parser = argparse.ArgumentParser(description="Full-text search over recognized archive entries")
+    parser.add_argument('--db', default=settings['SEARCH_INDEX_FILE'], help="Index database path")
+    parser.add_argument('--no-lemmas', action='store_true', help="Disable lemma normalization")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index', help="Add spell-checked text files to the index")
+    index_parser.add_argument('files', nargs='+')
+    index_parser.add_argument('--force', action='store_true', help="Re-index unchanged files")
+    index_parser.add_argument('--batch', help="Batch name of the files (default: files are keyed by path)")
+
+    search_parser = subparsers.add_parser('search', help="Search the index")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=20)
+
+    args = parser.parse_args(argv)
+    use_lemmas = settings.get('SEARCH_USE_LEMMAS', True) and not args.no_lemmas
+
+    if args.command == 'index':
+        count = update_index(args.db, args.files, use_lemmas=use_lemmas, force=args.force, batch=args.batch)
+        print(f"Indexed entries: {count}")
+    else:
+        for result in search(args.db, args.query, limit=args.limit, use_lemmas=use_lemmas):
+            print(f"{result['source_file']} [{result['page']} #{result['entry_no']}]: {result['text']}")
+
+if __name__ == "__main__":
+    main()
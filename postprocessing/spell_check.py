@@ -1,16 +1,24 @@
 import re
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, List
+from typing import FrozenSet, Tuple, List
 from spylls.hunspell import Dictionary
 from pymorphy2 import MorphAnalyzer
 
+# Corrector instances reused between calls, keyed by dictionary and log paths
+_correctors = {}
+
 class SpellCorrector:
-    def __init__(self, dict_dir: str, custom_dict_path: str = None, log_path: str = 'spell_log.txt'):
+    def __init__(self, dict_dir: str, custom_dict_path: str = None, log_path: str = 'spell_log.txt',
+                 lemma_cache_size: int = 50000):
         self.dictionary = Dictionary.from_files(str(Path(dict_dir) / 'ru_RU'))
 
         self.morph = MorphAnalyzer()
 
+        # Bounded token -> normal forms cache, shared by all texts checked by this instance
+        self.get_lemmas = lru_cache(maxsize=lemma_cache_size)(self._parse_lemmas)
+
         self.custom_words = set()
         custom_dir = Path(custom_dict_path) if custom_dict_path else None
         
@@ -22,6 +30,14 @@ class SpellCorrector:
         else:
             print(f"[!] Custom dictionaries directory not found: {custom_dict_path}")
 
+        # Normal-form index: custom words plus the primary normal form of every custom word,
+        # so entries stored in an inflected form (e.g. "Манассейну") also match other cases
+        self.custom_lemmas = set(self.custom_words)
+        for word in self.custom_words:
+            parsed = self.morph.parse(word)
+            if parsed:
+                self.custom_lemmas.add(parsed[0].normal_form)
+
         self.logger = logging.getLogger('SpellChecker')
         if not self.logger.hasHandlers():
             self.logger.setLevel(logging.INFO)
@@ -29,6 +45,25 @@ class SpellCorrector:
             fh.setFormatter(logging.Formatter('%(message)s'))
             self.logger.addHandler(fh)
 
+    def _parse_lemmas(self, word: str) -> FrozenSet[str]:
+        # Normal forms of all pymorphy2 parses
+        return frozenset(p.normal_form for p in self.morph.parse(word))
+
+    def is_custom_word(self, word: str) -> bool:
+        """
+        Checks whether a lowercased word or the normal form of any of its parses is in the
+        custom dictionaries (inflected names and places often have a different first parse).
+
+        Args:
+            word (str): Lowercased word without punctuation
+
+        Returns:
+            bool: True if the word is known from the custom dictionaries
+        """
+        if word in self.custom_words:
+            return True
+        return not self.custom_lemmas.isdisjoint(self.get_lemmas(word))
+
     def check_and_correct_spelling(self, text: str) -> Tuple[str, List[str]]:
         def replace_word(match):
             word = match.group(0)
@@ -36,13 +71,8 @@ class SpellCorrector:
             if not stripped.isalpha():
                 return word  # Skip numbers, symbols, etc.
         
-            # Check against custom dictionaries
-            if stripped in self.custom_words:
-                return word
-        
-            # Check word forms using pymorphy2
-            parsed = self.morph.parse(stripped)
-            if parsed and any(p.normal_form in self.custom_words for p in parsed):
+            # Check against custom dictionaries (including word forms via pymorphy2)
+            if self.is_custom_word(stripped):
                 return word
         
             # Check in main Hunspell dictionary
@@ -73,13 +103,35 @@ def correct_spelling(text: str, settings: dict) -> Tuple[str, List[str]]:
             - 'HUNSPELL_DICT_PATH'
             - 'CUSTOM_DICTIONARIES_DIR'
             - 'SPELLCHECK_LOG_PATH'
+            - 'SPELLCHECK_LEMMA_CACHE_SIZE'
 
     Returns:
         Tuple[str, List[str]]: Corrected text and empty list (for compatibility).
     """
-    corrector = SpellCorrector(
-        dict_dir=settings.get('HUNSPELL_DICT_PATH', 'resources/dictionaries/ru_RU'),
-        custom_dict_path=settings.get('CUSTOM_DICTIONARIES_DIR'),
-        log_path=settings.get('SPELLCHECK_LOG_PATH', 'logs/spell_log.txt')
-    )
-    return corrector.check_and_correct_spelling(text)
\ No newline at end of file
+    return get_spell_corrector(settings).check_and_correct_spelling(text)
+
+def get_spell_corrector(settings: dict) -> SpellCorrector:
+    """
+    Returns a SpellCorrector for the given settings, creating it on first use.
+    The instance (with its dictionaries and lemma cache) is reused across calls,
+    so repeated word forms on later pages are not parsed again.
+
+    Args:
+        settings (dict): Configuration dictionary (see correct_spelling)
+
+    Returns:
+        SpellCorrector: Shared corrector instance
+    """
+    dict_dir = settings.get('HUNSPELL_DICT_PATH', 'resources/dictionaries/ru_RU')
+    custom_dict_path = settings.get('CUSTOM_DICTIONARIES_DIR')
+    log_path = settings.get('SPELLCHECK_LOG_PATH', 'logs/spell_log.txt')
+    key = (dict_dir, custom_dict_path, log_path)
+
+    if key not in _correctors:
+        _correctors[key] = SpellCorrector(
+            dict_dir=dict_dir,
+            custom_dict_path=custom_dict_path,
+            log_path=log_path,
+            lemma_cache_size=settings.get('SPELLCHECK_LEMMA_CACHE_SIZE', 50000)
+        )
+    return _correctors[key]
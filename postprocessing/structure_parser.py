@@ -1,9 +1,79 @@
 import re
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
+
+# Page header written by the recognition stage before each page's text
+PAGE_MARKER_PATTERN = re.compile(r'^===== (.+?) =====$')
+
+# Inventory entry: case number, title, year or year range
+ENTRY_PATTERN = re.compile(r'^(\d+)\.\s*(.+?)\s+(\d{4}(?:[-–]\d{4})?)$', re.MULTILINE)
+
+def format_page_marker(page: str) -> str:
+    """Returns the header line that separates pages in recognized text files."""
+    return f"===== {page} ====="
+
+def _iter_pages(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    # Groups lines into pages; a page starts at each page marker
+    name, page_lines = '', []
+    for line in lines:
+        line = line.rstrip('\n')
+        match = PAGE_MARKER_PATTERN.match(line.strip())
+        if match:
+            if name or any(l.strip() for l in page_lines):
+                yield name, '\n'.join(page_lines)
+            name, page_lines = match.group(1), []
+        else:
+            page_lines.append(line)
+    if name or any(l.strip() for l in page_lines):
+        yield name, '\n'.join(page_lines)
+
+def split_pages(text: str) -> List[Tuple[str, str]]:
+    """
+    Splits recognized text into pages using page markers.
+
+    Args:
+        text (str): Text with optional '===== <page> =====' header lines
+
+    Returns:
+        List[Tuple[str, str]]: (page name, page text) pairs; text without
+        markers is returned as a single page with an empty name
+    """
+    return list(_iter_pages(text.splitlines()))
+
+def join_pages(pages: Iterable[Tuple[str, str]]) -> str:
+    """Joins (page name, page text) pairs back into text with page markers."""
+    parts = []
+    for name, page_text in pages:
+        if name:
+            parts.append(format_page_marker(name))
+        if page_text:
+            parts.append(page_text)
+    return '\n'.join(parts)
+
+def iter_pages_from_file(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Reads a recognized text file page by page without loading it whole.
+
+    Args:
+        path (str): Text file with page markers
+
+    Yields:
+        Tuple[str, str]: (page name, page text)
+    """
+    with open(path, encoding='utf-8') as f:
+        yield from _iter_pages(f)
+
+def iter_table_rows(text: str) -> Iterator[Tuple[str, str, str]]:
+    """Yields (number, title, date range) for every inventory entry in the text."""
+    for m in ENTRY_PATTERN.finditer(text):
+        yield m.group(1), m.group(2).strip(), m.group(3)
+
+def parse_year_range(date_range: str) -> Tuple[int, int]:
+    """Converts '1850' or '1850-1855' into (first year, last year)."""
+    years = re.split(r'[-–]', date_range)
+    return int(years[0]), int(years[-1])
 
 def format_text_to_table(text: str) -> List[Tuple[str, str, str]]:
-    pattern = re.compile(r'^(\d+)\.\s*(.+?)\s+(\d{4}(?:[-–]\d{4})?)$', re.MULTILINE)
-    return [(m.group(1), m.group(2).strip(), m.group(3)) for m in pattern.finditer(text)]
+    return list(iter_table_rows(text))
 
 def format_as_tsv(rows: List[Tuple[str, str, str]]) -> str:
     return '\n'.join('\t'.join(row) for row in rows)
@@ -0,0 +1,66 @@
+import json
+import cv2
+import numpy as np
+import pytest
+from config.settings import load_settings
+from ocr import tesseract_ocr
+
+def _page(amount):
+    page = np.full((2200, 1700), 235, np.uint8)
+    for i in range(20):
+        text = f"Sum: {amount}   Delo {100 + i}" if i == 11 else f"{i + 1}. Delo {100 + i} Riga 18{50 + i}"
+        cv2.putText(page, text, (150, 150 + i * 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 40, 3, cv2.LINE_AA)
+    return page
+
+def _rescan(page):
+    matrix = cv2.getRotationMatrix2D((850, 1100), 0.5, 1.0)
+    matrix[:, 2] += (3, -2)
+    return cv2.warpAffine(page, matrix, (1700, 2200), borderValue=235)
+
+@pytest.fixture
+def duplicate_batch(tmp_path, monkeypatch):
+    """
+    Batch with a page, its rescan, the same form with one changed digit and a blank verso.
+    OCR is replaced by a fake that logs its calls (worker processes are forked, so they inherit it).
+    """
+    input_folder = tmp_path / 'input'
+    input_folder.mkdir()
+    cv2.imwrite(str(input_folder / 'delo_5.png'), _page('1234'))
+    cv2.imwrite(str(input_folder / 'delo_5_rescan.png'), _rescan(_page('1234')))
+    cv2.imwrite(str(input_folder / 'delo_8.png'), _page('1734'))
+    cv2.imwrite(str(input_folder / 'verso.png'), np.full((2200, 1700), 235, np.uint8))
+
+    log_path = str(tmp_path / 'ocr.log')
+
+    def get_ocr_text(image, settings, word_data_path=None):
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write('call\n')
+        return f"page with {int((image < 128).sum())} ink pixels"
+    monkeypatch.setattr(tesseract_ocr, 'get_ocr_text', get_ocr_text)
+
+    settings = load_settings(base_dir=str(tmp_path), environ={})
+    settings.update(INPUT_FOLDER=str(input_folder), DEDUPLICATE_PAGES=True, DETECT_BLANK_PAGES=True,
+                    ROTATE=False, CROP=False, DOCUMENT_TYPE='typewritten', ENABLE_POSTPROCESSING=False,
+                    OCR_LOG=log_path)
+    for folder in (settings['PROCESSED_FOLDER'], settings['OUTPUT_DIR']):
+        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+    return settings
+
+@pytest.fixture
+def check_duplicate_batch():
+    """Checks that only the page and the changed form were recognized and the rescan reused the text."""
+    def check(settings):
+        with open(settings['MANIFEST_FILE'], encoding='utf-8') as f:
+            pages = {page['file'].rsplit('/', 1)[-1]: page for page in json.load(f)['pages']}
+        assert pages['delo_5.png']['status'] == 'recognized'
+        assert pages['delo_5_rescan.png']['status'] == 'duplicate'
+        assert pages['delo_5_rescan.png']['duplicate_of'].endswith('delo_5.png')
+        assert pages['delo_8.png']['status'] == 'recognized'
+        assert pages['verso.png']['status'] == 'blank'
+        with open(settings['OCR_LOG'], encoding='utf-8') as f:
+            assert f.read().count('call') == 2
+
+        with open(settings['OUTPUT_TEXT_FILE'], encoding='utf-8') as f:
+            texts = [line for line in f.read().split('\n') if line.startswith('page with')]
+        assert len(texts) == 3 and texts[0] == texts[1] != texts[2]
+    return check
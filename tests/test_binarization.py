@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from PIL import Image
+from image_processing.binarization import binarize, local_mean_std, niblack_threshold, sauvola_threshold
+from utils.image_io import write_bilevel_tiff
+
+WINDOW = 5
+
+def _windowed_mean_std(gray, window):
+    # Direct computation over every window; BORDER_REFLECT repeats the edge pixel (numpy 'symmetric')
+    padded = np.pad(gray.astype(np.float64), window // 2, mode='symmetric')
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (window, window))
+    return windows.mean(axis=(2, 3)), windows.std(axis=(2, 3))
+
+def _gray():
+    return np.random.default_rng(7).integers(0, 256, (23, 17)).astype(np.uint8)
+
+def test_box_filter_statistics_match_direct_windows():
+    gray = _gray()
+    mean, std = local_mean_std(gray, WINDOW)
+    expected_mean, expected_std = _windowed_mean_std(gray, WINDOW)
+    assert mean == pytest.approx(expected_mean, abs=1e-3)
+    assert std == pytest.approx(expected_std, abs=1e-2)
+
+def test_thresholds_match_direct_windows():
+    gray = _gray()
+    mean, std = _windowed_mean_std(gray, WINDOW)
+    assert sauvola_threshold(gray, WINDOW, 0.3, 100) == pytest.approx(mean * (1 + 0.3 * (std / 100 - 1)), abs=1e-2)
+    assert niblack_threshold(gray, WINDOW, -0.2) == pytest.approx(mean - 0.2 * std, abs=1e-2)
+
+def test_bilevel_tiff_is_one_bit_group4(tmp_path):
+    page = np.full((300, 200), 230, np.uint8)
+    page[100:120, 40:160] = 30
+    binary = binarize(page, {'BINARIZATION_METHOD': 'sauvola', 'BINARIZATION_WINDOW': 31})
+
+    path = str(tmp_path / 'page.tif')
+    write_bilevel_tiff(binary, path)
+    with Image.open(path) as tiff:
+        assert tiff.mode == '1'
+        assert tiff.info['compression'] == 'group4'
+        assert np.array_equal(np.array(tiff.convert('L')), binary)
@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+from image_processing.blank_detection import page_content_metrics, is_blank_page
+
+SETTINGS = {'BLANK_THUMBNAIL_SIZE': 256, 'BLANK_CENTER_MARGIN': 0.1, 'BLANK_MIN_INK_DELTA': 12,
+            'BLANK_MAX_INK_RATIO': 0.002, 'BLANK_MAX_EDGE_DENSITY': 0.01, 'BLANK_MIN_SPREAD': 40}
+
+def _paper(level=215, gradient=0, seed=0):
+    rng = np.random.default_rng(seed)
+    page = np.full((3500, 2500), level, np.float32)
+    page += np.linspace(-gradient, gradient, 2500, dtype=np.float32)[None, :]
+    page += rng.normal(0, 4, page.shape).astype(np.float32)
+    return page
+
+def _with_text(page, ink, lines=49):
+    mask = np.zeros(page.shape, np.uint8)
+    for i in range(lines):
+        cv2.putText(mask, f"Delo No {i} po opisi gubernskoj kancelarii", (250, 300 + i * 62), 0, 1.2, 255, 3)
+    page[mask > 0] = ink
+    return page
+
+def _is_blank(page):
+    image = np.clip(page, 0, 255).astype(np.uint8)
+    return is_blank_page(page_content_metrics(image, SETTINGS), SETTINGS)
+
+def test_faint_text_is_not_blank():
+    # Carbon copy or pencil: low contrast, narrow brightness spread
+    assert not _is_blank(_with_text(_paper(), ink=170))
+    assert not _is_blank(_with_text(_paper(), ink=140))
+
+def test_dark_text_is_not_blank():
+    assert not _is_blank(_with_text(_paper(), ink=40))
+
+def test_empty_paper_is_blank():
+    assert _is_blank(_paper())
+    assert _is_blank(_paper(level=150))
+
+def test_paper_shading_is_blank():
+    # Uneven lighting or yellowing across the sheet is not ink
+    assert _is_blank(_paper(gradient=25))
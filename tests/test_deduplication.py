@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+from image_processing.deduplication import PageHashIndex, compute_page_hash, page_difference
+from utils.image_io import fit_to_side
+
+MAX_DIFFERENCE = 0.03
+
+def _page(amount='1234'):
+    # 3300 x 2500 inventory page with 30 lines; line 18 holds the amount
+    page = np.full((3300, 2500), 235, np.uint8)
+    for i in range(30):
+        text = f"{i + 1}. Delo {100 + i} Riga 18{50 + i} fonds 7 opis 2"
+        if i == 17:
+            text = f"Sum: {amount}   Delo {100 + i}"
+        cv2.putText(page, text, (200, 200 + i * 100), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 40, 3, cv2.LINE_AA)
+    return page
+
+def _rescan(page, angle, shift, seed):
+    # Rotated and shifted, with other exposure, sensor noise, blur and JPEG compression
+    h, w = page.shape
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    matrix[:, 2] += shift
+    image = cv2.warpAffine(page, matrix, (w, h), borderValue=235).astype(np.float32)
+    image = image * 0.92 + 12 + np.random.default_rng(seed).normal(0, 6, image.shape)
+    image = cv2.GaussianBlur(np.clip(image, 0, 255).astype(np.uint8), (3, 3), 0)
+    _, jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return cv2.imdecode(jpeg, cv2.IMREAD_GRAYSCALE)
+
+def _hash(page):
+    # Hashes are computed on the reduced analysis copy
+    return compute_page_hash(fit_to_side(page, 2000))
+
+def test_rotated_and_shifted_rescan_is_confirmed():
+    original = _hash(_page())
+    for angle, shift, seed in ((0.5, (15, -10), 0), (-1.0, (-30, 20), 1)):
+        rescan = _hash(_rescan(_page(), angle, shift, seed))
+        assert page_difference(original.ink_mask, rescan.ink_mask) <= MAX_DIFFERENCE
+
+def test_page_with_one_changed_digit_is_rejected():
+    original = _hash(_page('1234'))
+    changed = _hash(_page('1734'))
+    rescanned = _hash(_rescan(_page('1734'), 0.3, (5, 5), 3))
+
+    # The hash alone can't tell the pages apart
+    assert bin(original.value ^ changed.value).count('1') <= 4
+    assert page_difference(original.ink_mask, changed.ink_mask) > MAX_DIFFERENCE
+    assert page_difference(original.ink_mask, rescanned.ink_mask) > MAX_DIFFERENCE
+
+def test_index_reuses_only_confirmed_matches(tmp_path):
+    index = PageHashIndex(str(tmp_path / 'page_hashes.db'))
+    index.add(_hash(_page('1234')), 'delo_5.jpg', 'Sum: 1234')
+
+    assert index.find(_hash(_page('1734')), 4, MAX_DIFFERENCE, exclude_path='delo_8.jpg') is None
+    match = index.find(_hash(_rescan(_page('1234'), 0.5, (15, -10), 0)), 4, MAX_DIFFERENCE,
+                       exclude_path='delo_5_rescan.jpg')
+    assert match is not None and match[:2] == ('delo_5.jpg', 'Sum: 1234')
+    index.close()
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from ocr import evaluation
+from ocr.evaluation import edit_distance, error_counts, evaluate_profile
+
+def _levenshtein(a, b):
+    # Reference implementation: full dynamic programming table
+    table = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            table[i][j] = min(table[i - 1][j] + 1, table[i][j - 1] + 1, table[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+    return table[-1][-1]
+
+@pytest.mark.parametrize('reference, hypothesis, expected', [
+    ('', '', 0), ('abc', '', 3), ('', 'ab', 2), ('kitten', 'sitting', 3),
+    ('Riga 1852', 'Riga 1852', 0), ('Delo 105', 'Dela 1O5', 2), ('ab', 'ba', 2),
+])
+def test_edit_distance_of_known_pairs(reference, hypothesis, expected):
+    assert edit_distance(reference, hypothesis) == expected
+
+def test_edit_distance_matches_dynamic_programming():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        a = ''.join(rng.choice(list('abcd'), rng.integers(0, 12)))
+        b = ''.join(rng.choice(list('abcd'), rng.integers(0, 12)))
+        assert edit_distance(a, b) == _levenshtein(a, b)
+
+def test_error_counts_normalize_whitespace():
+    # One substituted character in one word; line breaks and indentation don't count
+    assert error_counts('Delo 105\n  Riga 1852', 'Delo 105 Riga  1862') == (1, 18, 1, 4)
+
+def test_profile_totals_are_summed_over_pages(monkeypatch):
+    texts = {'a.png': 'Delo 105 Riga', 'b.png': 'Dela 10'}
+
+    class FakePage:
+        def __init__(self, image_path, settings):
+            self.full = image_path
+            self.analysis = None
+    monkeypatch.setattr(evaluation, 'PageImage', FakePage)
+    monkeypatch.setattr(evaluation, 'get_ocr_text', lambda image, settings: texts[image])
+
+    pages = [('a.png', 'Delo 105 Riga'), ('b.png', 'Delo 106')]
+    result = evaluate_profile(pages, {'EVALUATION_PREPROCESS': False})
+
+    # Characters: 0 + 2 edits of 13 + 8; words: 0 + 2 edits of 3 + 2 (totals, not a mean of page rates)
+    assert result['cer'] == pytest.approx(2 / 21)
+    assert result['wer'] == pytest.approx(2 / 5)
+    assert result['pages_per_second'] > 0
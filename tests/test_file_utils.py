@@ -0,0 +1,24 @@
+import os
+import shutil
+from ocr import tesseract_ocr
+from utils import file_utils, image_io
+from utils.file_utils import recognize_ready_images
+
+def test_ready_images_decode_full_resolution_only_for_ocr(duplicate_batch, check_duplicate_batch, monkeypatch):
+    settings = {**duplicate_batch, 'SKIP_PREPROCESSING': True}
+    for filename in os.listdir(settings['INPUT_FOLDER']):
+        shutil.copy(os.path.join(settings['INPUT_FOLDER'], filename), settings['PROCESSED_FOLDER'])
+
+    decoded = []
+    read_full_image = image_io.read_full_image
+
+    def read_counted(image_path, settings):
+        decoded.append(os.path.basename(image_path))
+        return read_full_image(image_path, settings)
+    monkeypatch.setattr(image_io, 'read_full_image', read_counted)
+    monkeypatch.setattr(file_utils, 'get_ocr_text', tesseract_ocr.get_ocr_text)  # The fixture's fake OCR
+
+    recognize_ready_images(settings)
+    check_duplicate_batch(settings)
+    # Blank and duplicate pages are screened on the reduced copy
+    assert decoded == ['delo_5.png', 'delo_8.png']
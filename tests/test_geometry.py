@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+from image_processing.geometry import plan_geometry, render_geometry
+from image_processing.rotation import apply_rotation
+from image_processing.cropping import smart_crop
+
+SETTINGS = {'ROTATE': True, 'FINE_ROTATION': True, 'DOCUMENT_TYPE': 'handwritten', 'CROP': True,
+            'CROP_PADDING': 20, 'STABILITY_RANGE': 10, 'BRIGHTNESS_DIFF_THRESHOLD': 25,
+            'GEOMETRY_ANALYSIS_MAX_SIDE': 1000}
+
+# Allowed difference of the output size and of the content position, in full-resolution pixels
+TOLERANCE = 6
+
+# Input orientation that ROTATION_ANGLE turns upright (rotations are clockwise)
+UNDO_ROTATION = {90: cv2.ROTATE_90_COUNTERCLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_CLOCKWISE}
+
+def _skewed_page(skew=1.0):
+    # Light sheet with text lines on a dark scanner background, skewed by a whole projection step
+    sheet = np.full((1500, 1100), 225, np.uint8)
+    for i in range(22):
+        cv2.putText(sheet, f"{i + 1}. Delo {300 + i} o nadele zemli 18{40 + i}", (90, 130 + i * 58),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, 50, 2, cv2.LINE_AA)
+    scan = np.full((1700, 1300), 60, np.uint8)
+    scan[100:1600, 100:1200] = sheet
+    matrix = cv2.getRotationMatrix2D((650, 850), skew, 1.0)
+    return cv2.warpAffine(scan, matrix, (1300, 1700), flags=cv2.INTER_CUBIC, borderValue=60)
+
+@pytest.mark.parametrize('base_angle', [0, 90, 180, 270])
+def test_planned_geometry_matches_sequential_steps(base_angle):
+    page = _skewed_page()
+    if base_angle:
+        page = cv2.rotate(page, UNDO_ROTATION[base_angle])
+    settings = {**SETTINGS, 'ROTATION_ANGLE': base_angle}
+
+    # Reference: full-resolution rotation, projection deskew and crop, one after another
+    expected = smart_crop(apply_rotation(page, settings)[0], settings)
+    result = render_geometry(page, plan_geometry(page, settings))
+
+    assert abs(result.shape[0] - expected.shape[0]) <= TOLERANCE
+    assert abs(result.shape[1] - expected.shape[1]) <= TOLERANCE
+
+    # The inner part of the reference is found in the result at the same place
+    inner = expected[2 * TOLERANCE:-2 * TOLERANCE, 2 * TOLERANCE:-2 * TOLERANCE]
+    scores = cv2.matchTemplate(result, inner, cv2.TM_CCOEFF_NORMED)
+    _, best, _, (x, y) = cv2.minMaxLoc(scores)
+    assert best > 0.95
+    assert abs(x - 2 * TOLERANCE) <= TOLERANCE and abs(y - 2 * TOLERANCE) <= TOLERANCE
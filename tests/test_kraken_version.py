@@ -0,0 +1,30 @@
+import pytest
+from ocr.kraken_ocr import check_kraken_version
+
+def _install_fake_kraken(tmp_path, monkeypatch, version):
+    # Minimal installed distribution: the package and its metadata on sys.path
+    (tmp_path / 'kraken').mkdir()
+    (tmp_path / 'kraken' / '__init__.py').write_text(f"__version__ = '{version}'\n")
+    dist_info = tmp_path / f'kraken-{version}.dist-info'
+    dist_info.mkdir()
+    (dist_info / 'METADATA').write_text(f"Metadata-Version: 2.1\nName: kraken\nVersion: {version}\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+def test_kraken_4_is_accepted(tmp_path, monkeypatch):
+    _install_fake_kraken(tmp_path, monkeypatch, '4.3.13')
+    check_kraken_version()
+
+@pytest.mark.parametrize('version', ['3.0.13', '5.2.9'])
+def test_other_kraken_versions_are_rejected(tmp_path, monkeypatch, version):
+    _install_fake_kraken(tmp_path, monkeypatch, version)
+    with pytest.raises(RuntimeError, match=f"Kraken {version} is not supported"):
+        check_kraken_version()
+
+def test_missing_kraken_is_reported(monkeypatch):
+    from importlib import metadata
+
+    def version(name):
+        raise metadata.PackageNotFoundError(name)
+    monkeypatch.setattr(metadata, 'version', version)
+    with pytest.raises(RuntimeError, match="Kraken is not installed"):
+        check_kraken_version()
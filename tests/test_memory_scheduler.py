@@ -0,0 +1,79 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils.memory_scheduler import (MB, MemoryScheduler, calibrate_memory_model, interleave_by_size,
+                                    process_images_scheduled, write_memory_profile)
+
+def test_duplicates_within_a_batch_are_not_recognized_again(duplicate_batch, check_duplicate_batch):
+    settings = {**duplicate_batch, 'PROCESS_WORKERS': 2, 'MEMORY_BUDGET_MB': 4096}
+    process_images_scheduled(settings['INPUT_FOLDER'], settings['PROCESSED_FOLDER'],
+                             settings['OUTPUT_TEXT_FILE'], settings)
+    check_duplicate_batch(settings)
+
+def _jobs(*estimates):
+    return [{'file': f'page_{i}.jpg', 'estimate': estimate} for i, estimate in enumerate(estimates)]
+
+def test_interleave_alternates_largest_and_smallest():
+    ordered = interleave_by_size(_jobs(30, 10, 50, 20, 40))
+    assert [job['estimate'] for job in ordered] == [50, 10, 40, 20, 30]
+
+def test_small_pages_overtake_a_waiting_page_a_limited_number_of_times():
+    scheduler = MemoryScheduler(budget=100, workers=2)
+    scheduler.in_use = 60
+    pending = deque(_jobs(50, 10, 10, 10))
+
+    assert scheduler._next_job(pending)['file'] == 'page_1.jpg'
+    assert scheduler._next_job(pending)['file'] == 'page_2.jpg'
+    # Limit reached: nothing more is admitted until the first page fits
+    assert scheduler._next_job(pending) is None
+    assert [job['file'] for job in pending] == ['page_0.jpg', 'page_3.jpg']
+
+    scheduler.in_use = 0
+    assert scheduler._next_job(pending)['file'] == 'page_0.jpg'
+    assert scheduler.overtaken == 0
+
+def test_page_larger_than_the_budget_runs_alone():
+    scheduler = MemoryScheduler(budget=100, workers=3)
+    running, overlaps = set(), []
+    lock = threading.Lock()
+
+    def process(job):
+        with lock:
+            running.add(job['file'])
+            overlaps.append(set(running))
+        time.sleep(0.05)
+        with lock:
+            running.discard(job['file'])
+        return job['file']
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        finished = [job['file'] for job, _ in scheduler.run(pool, process, _jobs(10, 250, 10, 10))]
+
+    assert sorted(finished) == ['page_0.jpg', 'page_1.jpg', 'page_2.jpg', 'page_3.jpg']
+    assert all(files == {'page_1.jpg'} for files in overlaps if 'page_1.jpg' in files)
+    assert scheduler.in_use == 0
+
+def _profile(tmp_path, pages, name='memory_profile.tsv'):
+    path = str(tmp_path / name)
+    write_memory_profile(path, [{'file': f'page_{i}.jpg', 'width': w, 'height': h, 'estimate': 0, 'actual': actual}
+                                for i, (w, h, actual) in enumerate(pages)])
+    return path
+
+def test_calibration_fits_base_and_per_pixel_terms(tmp_path):
+    # Peaks of 50 MB + 25 bytes per pixel
+    sizes = [(1000, 1500), (2000, 3000), (2500, 3500), (4000, 6000)]
+    path = _profile(tmp_path, [(w, h, 50 * MB + 25 * w * h) for w, h in sizes])
+
+    bytes_per_pixel, base_mb = calibrate_memory_model(path, {'MEMORY_PAGE_BASE_MB': 30})
+    assert bytes_per_pixel == pytest.approx(25, abs=0.1)
+    assert base_mb == pytest.approx(50, abs=0.5)
+
+def test_calibration_ignores_peaks_within_the_base(tmp_path):
+    settings = {'MEMORY_PAGE_BASE_MB': 30}
+    # One page size, every peak below the base: nothing to suggest (not 0 bytes per pixel)
+    assert calibrate_memory_model(_profile(tmp_path, [(2000, 3000, 20 * MB)] * 3), settings) is None
+
+    path = _profile(tmp_path, [(2000, 3000, 20 * MB), (2000, 3000, 30 * MB + 40 * 6_000_000)], 'second.tsv')
+    assert calibrate_memory_model(path, settings) == pytest.approx((40, 30), abs=0.1)
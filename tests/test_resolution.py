@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pytest
+from image_processing.resolution import estimate_text_height, resolution_scale
+
+# Height of digits rendered with FONT_HERSHEY_SIMPLEX at font scale 1, in pixels
+DIGIT_HEIGHT = 21
+
+SETTINGS = {'RESOLUTION_TARGET_DPI': 300, 'RESOLUTION_REFERENCE_TEXT_HEIGHT': DIGIT_HEIGHT,
+            'RESOLUTION_MIN_SCALE': 0.25, 'RESOLUTION_MAX_SCALE': 2.0, 'RESOLUTION_TOLERANCE': 0}
+
+def _page(scale):
+    # Lines of digits, the whole page rendered `scale` times larger
+    page = np.full((1500 * scale, 1100 * scale), 230, np.uint8)
+    for i in range(20):
+        cv2.putText(page, f"{1000 + i * 37} 58 {200 + i * 13} 7{i:02d}", (80 * scale, (90 + i * 65) * scale),
+                    cv2.FONT_HERSHEY_SIMPLEX, scale, 30, 2 * scale, cv2.LINE_AA)
+    return page
+
+@pytest.mark.parametrize('scale', [1, 2])
+def test_text_height_follows_the_rendering_scale(scale):
+    assert estimate_text_height(_page(scale)) == pytest.approx(DIGIT_HEIGHT * scale, abs=1.5 * scale)
+
+def test_scale_brings_text_to_the_reference_height():
+    assert resolution_scale(_page(1), SETTINGS)[0] == pytest.approx(1.0, abs=0.08)
+
+    scale, effective_dpi = resolution_scale(_page(2), SETTINGS)
+    assert scale == pytest.approx(0.5, abs=0.04)
+    assert effective_dpi == pytest.approx(600, rel=0.08)
+
+def test_scale_is_clamped_to_its_limits():
+    # Text twice the reference height, but pages are not reduced below RESOLUTION_MIN_SCALE
+    scale, effective_dpi = resolution_scale(_page(2), {**SETTINGS, 'RESOLUTION_MIN_SCALE': 0.75})
+    assert scale == 0.75
+    assert effective_dpi == pytest.approx(600, rel=0.08)
+
+    # Text half the reference height: enlarged at most to RESOLUTION_MAX_SCALE
+    small_text = {**SETTINGS, 'RESOLUTION_REFERENCE_TEXT_HEIGHT': 2 * DIGIT_HEIGHT}
+    assert resolution_scale(_page(1), small_text)[0] == pytest.approx(2.0, abs=0.16)
+    assert resolution_scale(_page(1), {**small_text, 'RESOLUTION_MAX_SCALE': 1.0})[0] == 1.0
@@ -0,0 +1,38 @@
+from postprocessing.search_index import search, update_index
+from postprocessing.structure_parser import join_pages
+
+def _write_batch(path, pages):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(join_pages(pages))
+
+def test_batches_written_to_same_file_stay_searchable(tmp_path):
+    db_path = str(tmp_path / 'search_index.db')
+    text_path = str(tmp_path / 'spell_checked_text.txt')
+
+    _write_batch(text_path, [('page_001.jpg', '1. Дело о ландрате Вендена 1890')])
+    assert update_index(db_path, [text_path], use_lemmas=False, batch='fonds_1') == 1
+
+    # The next batch overwrites the same output file
+    _write_batch(text_path, [('page_001.jpg', '1. Ревизские сказки Риги 1795')])
+    assert update_index(db_path, [text_path], use_lemmas=False, batch='fonds_2') == 1
+
+    first = search(db_path, 'ландрате', use_lemmas=False)
+    second = search(db_path, 'сказки', use_lemmas=False)
+    assert [r['source_file'] for r in first] == ['fonds_1/spell_checked_text.txt']
+    assert [r['source_file'] for r in second] == ['fonds_2/spell_checked_text.txt']
+
+def test_reindexing_a_batch_replaces_only_its_entries(tmp_path):
+    db_path = str(tmp_path / 'search_index.db')
+    text_path = str(tmp_path / 'spell_checked_text.txt')
+
+    _write_batch(text_path, [('page_001.jpg', '1. Дело о ландрате Вендена 1890')])
+    update_index(db_path, [text_path], use_lemmas=False, batch='fonds_1')
+    _write_batch(text_path, [('page_001.jpg', '1. Ревизские сказки Риги 1795')])
+    update_index(db_path, [text_path], use_lemmas=False, batch='fonds_2')
+
+    _write_batch(text_path, [('page_001.jpg', '1. Дело о мельнице Вендена 1891')])
+    update_index(db_path, [text_path], use_lemmas=False, batch='fonds_1', force=True)
+
+    assert search(db_path, 'ландрате', use_lemmas=False) == []
+    assert len(search(db_path, 'мельнице', use_lemmas=False)) == 1
+    assert len(search(db_path, 'сказки', use_lemmas=False)) == 1
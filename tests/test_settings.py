@@ -0,0 +1,56 @@
+import json
+from config.settings import _parse_env_value, load_settings
+
+def test_env_values_are_parsed_as_json():
+    assert _parse_env_value('true') is True
+    assert _parse_env_value('false') is False
+    assert _parse_env_value('8') == 8
+    assert _parse_env_value('2.5') == 2.5
+    assert _parse_env_value('["fast", "accurate"]') == ['fast', 'accurate']
+    assert _parse_env_value('{"a": 1}') == {'a': 1}
+    assert _parse_env_value('/data/fonds_1') == '/data/fonds_1'
+
+def test_file_overrides_defaults_and_env_overrides_file(tmp_path):
+    config_file = tmp_path / 'collection.json'
+    config_file.write_text(json.dumps({'GAMMA': 1.8, 'PROCESS_WORKERS': 2, 'BINARIZE': True}),
+                           encoding='utf-8')
+    environ = {'DOCUMENTARIUM_PROCESS_WORKERS': '4', 'DOCUMENTARIUM_BINARIZE': 'false'}
+
+    defaults = load_settings(base_dir=str(tmp_path), environ={})
+    settings = load_settings(config_file=str(config_file), base_dir=str(tmp_path), environ=environ)
+
+    assert settings['GAMMA'] == 1.8
+    assert settings['PROCESS_WORKERS'] == 4
+    assert settings['BINARIZE'] is False
+    assert settings['CONTRAST'] == defaults['CONTRAST']
+
+def test_env_config_file_and_tuple_values(tmp_path):
+    config_file = tmp_path / 'collection.json'
+    config_file.write_text(json.dumps({'EVALUATION_PROFILES': ['fast']}), encoding='utf-8')
+
+    settings = load_settings(base_dir=str(tmp_path),
+                             environ={'DOCUMENTARIUM_CONFIG': str(config_file)})
+    assert settings['EVALUATION_PROFILES'] == ('fast',)
+
+def test_unknown_settings_are_ignored(tmp_path, capsys):
+    config_file = tmp_path / 'collection.json'
+    config_file.write_text(json.dumps({'GAMA': 2.0}), encoding='utf-8')
+
+    settings = load_settings(config_file=str(config_file), base_dir=str(tmp_path),
+                             environ={'DOCUMENTARIUM_PROCES_WORKERS': '4'})
+
+    assert 'GAMA' not in settings and 'PROCES_WORKERS' not in settings
+    output = capsys.readouterr().out
+    assert 'GAMA' in output and 'PROCES_WORKERS' in output
+
+def test_profile_warns_about_skipped_preprocessing(tmp_path, capsys):
+    settings = load_settings(base_dir=str(tmp_path), environ={'DOCUMENTARIUM_OCR_PROFILE': 'fast'})
+    assert settings['BINARIZE'] is True and settings['RESOLUTION_TARGET_DPI'] == 200
+    assert 'BINARIZE' in capsys.readouterr().out
+
+    # Explicit overrides still win over the profile
+    settings = load_settings(base_dir=str(tmp_path), environ={'DOCUMENTARIUM_OCR_PROFILE': 'fast',
+                                                              'DOCUMENTARIUM_SKIP_PREPROCESSING': 'false',
+                                                              'DOCUMENTARIUM_BINARIZE': 'false'})
+    assert settings['BINARIZE'] is False and settings['OCR_PROFILE'] == 'fast'
+    assert '[!]' not in capsys.readouterr().out
@@ -0,0 +1,42 @@
+import os
+from collections import namedtuple
+import pytest
+
+spell_check = pytest.importorskip('postprocessing.spell_check')
+
+CUSTOM_DIR = os.path.join(os.path.dirname(__file__), '..', 'resources', 'dictionaries', 'custom_ru')
+
+Parse = namedtuple('Parse', 'normal_form')
+
+# pymorphy2 parses (in probability order) of inflected forms of the names_ru.txt entries
+PARSES = {
+    'манассейна': ['манассейн', 'манассейна'],
+    'манассейну': ['манассейн'],
+    'манассейной': ['манассейный', 'манассейна'],  # First parse: unknown adjective
+    'манассейным': ['манассейный'],
+}
+
+class FakeMorph:
+    def parse(self, word):
+        return [Parse(lemma) for lemma in PARSES.get(word, [word])]
+
+class FakeDictionary:
+    @classmethod
+    def from_files(cls, path):
+        return cls()
+
+@pytest.fixture
+def corrector(monkeypatch, tmp_path):
+    monkeypatch.setattr(spell_check, 'MorphAnalyzer', FakeMorph)
+    monkeypatch.setattr(spell_check, 'Dictionary', FakeDictionary)
+    return spell_check.SpellCorrector('unused', CUSTOM_DIR, log_path=str(tmp_path / 'spell_log.txt'))
+
+def test_inflected_custom_names_are_known(corrector):
+    assert corrector.is_custom_word('манассейна')
+    assert corrector.is_custom_word('манассейну')
+    # Matched through a parse other than the first one
+    assert corrector.is_custom_word('манассейной')
+
+def test_words_without_custom_lemma_are_not_known(corrector):
+    assert not corrector.is_custom_word('манассейным')
+    assert not corrector.is_custom_word('рига1')
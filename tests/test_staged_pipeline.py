@@ -0,0 +1,7 @@
+from utils.staged_pipeline import run_staged_pipeline
+
+def test_duplicates_within_a_batch_are_not_recognized_again(duplicate_batch, check_duplicate_batch):
+    settings = {**duplicate_batch,
+                'PIPELINE_WORKERS': {'decode': 2, 'preprocess': 2, 'ocr': 2}}
+    run_staged_pipeline(settings)
+    check_duplicate_batch(settings)
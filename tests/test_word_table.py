@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+tesseract_ocr = pytest.importorskip('ocr.tesseract_ocr')
+from ocr.tesseract_ocr import (load_word_table, ocr_data_to_array, save_word_table,
+                               words_to_text, WORD_INT_FIELDS)
+
+# (block, paragraph, line, text, confidence); rows in Tesseract order
+ROWS = [
+    (1, 1, 1, '', -1), (1, 1, 1, '1.', 96), (1, 1, 1, 'Дело', 91), (1, 1, 1, 'о', 40),
+    (1, 1, 2, 'земле', 88), (1, 1, 2, '1890', 93),
+    (1, 2, 1, '2.', 95), (1, 2, 1, 'Ревизские', 77), (1, 2, 1, 'сказки', 50.5),  # Not above 50 as an integer
+    (2, 1, 1, 'Рига', 51), (2, 1, 1, '  ', 99),
+]
+
+def _ocr_data():
+    data = {field: [] for field in WORD_INT_FIELDS}
+    data.update(text=[], conf=[])
+    for i, (block, par, line, text, conf) in enumerate(ROWS):
+        values = {'level': 5, 'page_num': 1, 'block_num': block, 'par_num': par, 'line_num': line,
+                  'word_num': i, 'left': 10 * i, 'top': 40 * line, 'width': 30, 'height': 20}
+        for field in WORD_INT_FIELDS:
+            data[field].append(values[field])
+        data['text'].append(text)
+        data['conf'].append(conf)
+    return data
+
+def _legacy_text(ocr_data, min_conf=50):
+    # Text assembly of get_ocr_text before word tables were stored
+    lines = {}
+    for i in range(len(ocr_data['text'])):
+        text = ocr_data['text'][i].strip()
+        if text and int(ocr_data['conf'][i]) > min_conf:
+            key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
+            lines.setdefault(key, []).append(text)
+    return '\n'.join(' '.join(lines[k]) for k in sorted(lines) if lines[k])
+
+def test_round_trip_rebuilds_legacy_text(tmp_path):
+    path = str(tmp_path / 'page.npz')
+    save_word_table(ocr_data_to_array(_ocr_data()), path)
+    words = load_word_table(path)
+
+    assert words_to_text(words) == _legacy_text(_ocr_data())
+    assert words_to_text(words, min_conf=0) == _legacy_text(_ocr_data(), min_conf=0)
+    assert words_to_text(words, grouping='paragraph') == '1. Дело земле 1890\n2. Ревизские\nРига'
+    assert words_to_text(words, grouping='block') == '1. Дело земле 1890 2. Ревизские\nРига'
+
+def test_boxes_are_mapped_back_by_the_stored_scale(tmp_path):
+    path = str(tmp_path / 'page.npz')
+    words = ocr_data_to_array(_ocr_data())
+    save_word_table(words, path, scale=0.5)
+
+    resampled = load_word_table(path)
+    processed = load_word_table(path, processed_coordinates=True)
+    assert '__scale__' not in resampled.dtype.names
+    np.testing.assert_array_equal(resampled['left'], words['left'])
+    for field in ('left', 'top', 'width', 'height'):
+        np.testing.assert_array_equal(processed[field], words[field] * 2)
+    np.testing.assert_array_equal(processed['line_num'], words['line_num'])
@@ -0,0 +1,103 @@
+import os
+import time
+import multiprocessing
+import pytest
+from utils import work_queue
+from utils.work_queue import JobStore, collect_batch, page_result_path, run_worker
+
+SETTINGS = {'QUEUE_MAX_ATTEMPTS': 2}
+
+def _register(tmp_path, pages):
+    input_folder = tmp_path / 'fonds_1'
+    input_folder.mkdir()
+    for i in range(pages):
+        (input_folder / f'page_{i:03d}.jpg').write_bytes(b'')
+    db_path = str(tmp_path / 'queue.db')
+    store = JobStore(db_path)
+    store.register_batch('fonds_1', str(input_folder), str(tmp_path / 'results'))
+    store.close()
+    return db_path
+
+def _fake_process_page(log_path):
+    # Records every processing of a page; page_013 always raises
+    def process_page(image_path, output_folder, filename, settings):
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(f'{filename}\n')
+        time.sleep(0.01)
+        if filename == 'page_013.jpg':
+            raise ValueError('unreadable')
+        os.makedirs(os.path.join(output_folder, 'pages'), exist_ok=True)
+        with open(page_result_path(output_folder, filename), 'w', encoding='utf-8') as f:
+            f.write(f'text of {filename}')
+    return process_page
+
+def _statuses(db_path):
+    store = JobStore(db_path)
+    try:
+        return dict(store.batch_pages('fonds_1')[1])
+    finally:
+        store.close()
+
+def test_concurrent_workers_process_every_page_once(tmp_path, monkeypatch):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs the fork start method")
+    db_path = _register(tmp_path, 30)
+    log_path = tmp_path / 'processed.log'
+    monkeypatch.setattr(work_queue, 'process_page', _fake_process_page(str(log_path)))
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=run_worker, args=(db_path, SETTINGS, 60), kwargs={'worker': f'node:{i}'})
+               for i in range(3)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    statuses = _statuses(db_path)
+    assert set(statuses.values()) == {'done', 'failed'}
+    assert statuses.pop('page_013.jpg') == 'failed'
+
+    processed = log_path.read_text(encoding='utf-8').split()
+    assert sorted(processed) == sorted(list(statuses) + ['page_013.jpg'] * SETTINGS['QUEUE_MAX_ATTEMPTS'])
+
+def test_expired_lease_is_processed_by_another_worker(tmp_path, monkeypatch):
+    db_path = _register(tmp_path, 2)
+    log_path = tmp_path / 'processed.log'
+    monkeypatch.setattr(work_queue, 'process_page', _fake_process_page(str(log_path)))
+
+    # A worker claims a page and crashes: its lease expires
+    store = JobStore(db_path)
+    page_id = store.claim('crashed:1', lease_seconds=0.05)[0]
+    time.sleep(0.1)
+
+    assert run_worker(db_path, SETTINGS, lease_seconds=60, worker='node:2') == 2
+    assert not store.complete(page_id, 'crashed:1')  # The late worker can't mark it done again
+    store.close()
+
+    assert set(_statuses(db_path).values()) == {'done'}
+    assert sorted(log_path.read_text(encoding='utf-8').split()) == ['page_000.jpg', 'page_001.jpg']
+
+def test_page_that_keeps_crashing_its_worker_fails(tmp_path):
+    db_path = _register(tmp_path, 1)
+    store = JobStore(db_path)
+    for attempt in range(SETTINGS['QUEUE_MAX_ATTEMPTS']):
+        assert store.claim(f'crashed:{attempt}', lease_seconds=0.01, max_attempts=2) is not None
+        time.sleep(0.05)
+    assert store.claim('node:3', lease_seconds=60, max_attempts=2) is None
+    store.close()
+
+    assert _statuses(db_path) == {'page_000.jpg': 'failed'}
+
+def test_collect_skips_missing_results(tmp_path, monkeypatch, capsys):
+    db_path = _register(tmp_path, 2)
+    monkeypatch.setattr(work_queue, 'process_page', _fake_process_page(str(tmp_path / 'processed.log')))
+    run_worker(db_path, SETTINGS, lease_seconds=60)
+
+    output_file = str(tmp_path / 'recognized_text.txt')
+    assert collect_batch(db_path, 'fonds_1', output_file) == 2
+    assert 'text of page_001.jpg' in open(output_file, encoding='utf-8').read()
+
+    # Postprocessing was off on the workers: no spell-checked results
+    assert collect_batch(db_path, 'fonds_1', output_file, kind='spell_checked') == 0
+    assert 'No spell_checked result' in capsys.readouterr().out
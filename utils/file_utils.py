@@ -1,8 +1,323 @@
 import os
-import cv2
-from typing import Optional
-from ocr.tesseract_ocr import get_ocr_text
+import json
+import shutil
+import tempfile
+from itertools import repeat
+from typing import List, Optional, Tuple
+from ocr.tesseract_ocr import get_ocr_text, load_word_table, words_to_text
 from utils.image_utils import preprocess_image
+from utils.image_io import PageImage
+from postprocessing.structure_parser import format_page_marker
+from image_processing.deduplication import PageHashIndex, compute_page_hash
+from image_processing.blank_detection import page_content_metrics, is_blank_page
+
+def get_word_data_path(filename, settings) -> Optional[str]:
+    """
+    Returns the .npz path for the word table of an image, or None if saving is disabled.
+    
+    Args:
+        filename (str): Image file name
+        settings (dict): Processing settings
+    """
+    if not settings.get('SAVE_WORD_DATA'):
+        return None
+    return os.path.join(settings['WORD_DATA_FOLDER'], filename + '.npz')
+
+def open_text_output(output_text_file, settings):
+    """
+    Opens the recognized text file for writing. Without OCR there is no text to write,
+    so an existing file is left untouched and page records go to os.devnull.
+
+    Args:
+        output_text_file (str): File to save results
+        settings (dict): Processing settings
+    """
+    if settings.get('ENABLE_OCR', True):
+        return open(output_text_file, "w", encoding="utf-8")
+    return open(os.devnull, "w", encoding="utf-8")
+
+def open_page_hash_index(settings) -> Optional[PageHashIndex]:
+    """
+    Opens the page hash index if duplicate detection is enabled (it reuses OCR results, so OCR must be enabled too).
+    
+    Args:
+        settings (dict): Processing settings
+    """
+    if not settings.get('DEDUPLICATE_PAGES') or not settings.get('ENABLE_OCR', True):
+        return None
+    return PageHashIndex(settings['PAGE_HASH_INDEX_FILE'])
+
+def skip_blank_page(image, image_path, settings, manifest) -> bool:
+    """
+    Detects blank pages (versos, separator sheets) that need no processing or OCR.
+    
+    Args:
+        image (numpy.ndarray): Decoded page
+        image_path (str): Path to the page image
+        settings (dict): Processing settings
+        manifest (dict): Batch manifest, blank pages are recorded in it with their metrics
+        
+    Returns:
+        bool: True if the page is blank and should be skipped
+    """
+    if not settings.get('DETECT_BLANK_PAGES'):
+        return False
+
+    metrics = page_content_metrics(image, settings)
+    if not is_blank_page(metrics, settings):
+        return False
+
+    record_blank_page(image_path, metrics, manifest)
+    return True
+
+def record_blank_page(image_path, metrics, manifest):
+    """Adds a skipped blank page with its content metrics to the manifest."""
+    manifest['pages'].append({'file': image_path, 'status': 'blank', 'metrics': metrics})
+    print(f"Blank page skipped: {image_path}")
+
+def reuse_duplicate_ocr(image, image_path, hash_index, settings, manifest) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Looks the page up in the hash index and returns the OCR text of an earlier near-duplicate page.
+    
+    Args:
+        image (numpy.ndarray): Decoded page
+        image_path (str): Path to the page image
+        hash_index (PageHashIndex): Page hash index or None
+        settings (dict): Processing settings
+        manifest (dict): Batch manifest, the page record is added to it
+        
+    Returns:
+        Tuple: (reused text or None if the page has to be recognized, page hash or None)
+    """
+    if hash_index is None:
+        return None, None
+
+    page_hash = compute_page_hash(image)
+    match = find_duplicate(page_hash, image_path, hash_index, settings)
+    if match is None:
+        return None, page_hash
+    return record_duplicate(image_path, match, settings, manifest), page_hash
+
+def find_duplicate(page_hash, image_path, hash_index, settings):
+    """Looks a page up in a hash index (see PageHashIndex.find) with the DUPLICATE_* limits."""
+    return hash_index.find(page_hash, settings.get('DUPLICATE_MAX_DISTANCE', 4),
+                           settings.get('DUPLICATE_MAX_DIFFERENCE', 0.03), exclude_path=image_path)
+
+def record_duplicate(image_path, match, settings, manifest) -> str:
+    """
+    Reuses the result of the original page: copies its word table and adds the page to the manifest.
+
+    Args:
+        image_path (str): Path to the duplicate page image
+        match (Tuple): (original path, OCR text, word data path, distance, page difference)
+        settings (dict): Processing settings
+        manifest (dict): Batch manifest
+
+    Returns:
+        str: OCR text of the original page
+    """
+    original_path, text, original_word_data, distance, difference = match
+    word_data_path = get_word_data_path(os.path.basename(image_path), settings)
+    if word_data_path and original_word_data and os.path.exists(original_word_data):
+        os.makedirs(os.path.dirname(word_data_path), exist_ok=True)
+        shutil.copyfile(original_word_data, word_data_path)
+
+    manifest['pages'].append({
+        'file': image_path, 'status': 'duplicate',
+        'duplicate_of': original_path, 'hamming_distance': distance,
+        'page_difference': round(difference, 3)
+    })
+    print(f"Duplicate of {original_path} (distance {distance}, difference {difference:.3f}): {image_path}")
+    return text
+
+def fingerprint_page(image_path, settings) -> dict:
+    """
+    Blank page metrics and page hash from the reduced decode (screening pass, see BatchScreening).
+
+    Args:
+        image_path (str): Path to the page image
+        settings (dict): Processing settings
+
+    Returns:
+        dict: 'readable', 'metrics' (None without DETECT_BLANK_PAGES), 'blank', 'page_hash' (None for blank pages)
+    """
+    page = PageImage(image_path, settings)
+    if page.analysis is None:
+        return {'readable': False, 'metrics': None, 'blank': False, 'page_hash': None}
+    metrics = page_content_metrics(page.analysis, settings) if settings.get('DETECT_BLANK_PAGES') else None
+    blank = metrics is not None and is_blank_page(metrics, settings)
+    return {'readable': True, 'metrics': metrics, 'blank': blank,
+            'page_hash': None if blank else compute_page_hash(page.analysis)}
+
+class BatchScreening:
+    """
+    Blank page and duplicate decisions of a parallel run, made in the main process before pages
+    are submitted to the workers. A worker could only find duplicates of pages already in the
+    hash index, but pages are added to it after recognition, so a duplicate of a page of the same
+    batch would usually be in flight together with its original. Here each page is also compared
+    with the earlier pages of the batch (kept in a temporary index); such a duplicate is not
+    processed and reuses the original's result when the pages are written in order.
+    """
+
+    def __init__(self, hash_index, settings):
+        self.hash_index = hash_index
+        self.settings = settings
+        self._folder = tempfile.mkdtemp(prefix='page_hashes_')
+        self.batch_index = PageHashIndex(os.path.join(self._folder, 'batch.db'))
+
+    def screen(self, pool, paths) -> List[dict]:
+        """
+        Fingerprints the pages in the pool (reduced decode only) and classifies them in page order.
+
+        Args:
+            pool (concurrent.futures.Executor): Worker pool
+            paths (List[str]): Page images in page order
+
+        Returns:
+            List[dict]: Per page: 'status' ('blank', 'duplicate', 'batch_duplicate' or 'process'),
+                'manifest' (page records), 'text' (blank pages and duplicates of indexed pages),
+                'original' and 'match' (batch duplicates: original page index and match details)
+        """
+        decisions = []
+        positions = {}
+        for image_path, fingerprint in zip(paths, pool.map(fingerprint_page, paths, repeat(self.settings))):
+            decision = {'status': 'process', 'manifest': [], 'text': None}
+            manifest = {'pages': decision['manifest']}
+            page_hash = fingerprint['page_hash']
+            if fingerprint['blank']:
+                record_blank_page(image_path, fingerprint['metrics'], manifest)
+                decision.update(status='blank', text='')
+            elif page_hash is not None:
+                match = find_duplicate(page_hash, image_path, self.hash_index, self.settings)
+                batch_match = None if match else find_duplicate(page_hash, image_path, self.batch_index, self.settings)
+                if match:
+                    decision.update(status='duplicate', text=record_duplicate(image_path, match, self.settings, manifest))
+                elif batch_match:
+                    decision.update(status='batch_duplicate', original=positions[batch_match[0]], match=batch_match)
+                else:
+                    self.batch_index.add(page_hash, image_path, '')
+                    positions[image_path] = len(decisions)
+            decisions.append(decision)
+        return decisions
+
+    def page_hash(self, image_path):
+        """Hash of a screened page, for registration in the hash index after recognition."""
+        return self.batch_index.get(image_path)
+
+    def reuse(self, image_path, decision, original_text, recognized, manifest) -> Optional[str]:
+        """
+        Writes the manifest record of a batch duplicate once its original has been processed.
+
+        Args:
+            image_path (str): Path to the duplicate page image
+            decision (dict): Screening decision of the page ('batch_duplicate')
+            original_text (str): Text of the original page
+            recognized (bool): Whether the original page was recognized
+            manifest (dict): Batch manifest
+
+        Returns:
+            str: Reused text, or None if the original page failed (the page is reported as an error)
+        """
+        original_path, _, _, distance, difference = decision['match']
+        if not recognized or original_text is None:
+            manifest['pages'].append({'file': image_path, 'status': 'error',
+                                      'error': f"Duplicate of {original_path}, which was not recognized"})
+            print(f"[!] Duplicate of a page that was not recognized, skipped: {image_path}")
+            return None
+        word_data_path = get_word_data_path(os.path.basename(original_path), self.settings)
+        return record_duplicate(image_path, (original_path, original_text, word_data_path, distance, difference),
+                                self.settings, manifest)
+
+    def close(self):
+        self.batch_index.close()
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+def register_recognized_page(image_path, text, page_hash, hash_index, settings, manifest):
+    """Adds a recognized page to the manifest and to the hash index."""
+    manifest['pages'].append({'file': image_path, 'status': 'recognized'})
+    if hash_index is not None and page_hash is not None:
+        word_data_path = get_word_data_path(os.path.basename(image_path), settings)
+        hash_index.add(page_hash, image_path, text, word_data_path)
+
+def write_manifest(manifest, settings):
+    """
+    Saves the batch manifest (page statuses and duplicate groups) as JSON.
+    
+    Args:
+        manifest (dict): Batch manifest with the 'pages' list
+        settings (dict): Processing settings
+    """
+    groups = {}
+    for page in manifest['pages']:
+        if page['status'] == 'duplicate':
+            groups.setdefault(page['duplicate_of'], []).append(page['file'])
+    manifest['duplicate_groups'] = [
+        {'original': original, 'duplicates': duplicates} for original, duplicates in groups.items()
+    ]
+
+    with open(settings['MANIFEST_FILE'], 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+
+class PageTextWriter:
+    """
+    Writes page texts to the output file in page order.
+    Typewritten pages are recognized with Tesseract immediately; handwritten pages are
+    queued and recognized with Kraken in batches of KRAKEN_PAGE_BATCH pages.
+    """
+
+    def __init__(self, out_f, settings, hash_index, manifest):
+        self.out_f = out_f
+        self.settings = settings
+        self.hash_index = hash_index
+        self.manifest = manifest
+        self.handwritten = settings.get('DOCUMENT_TYPE') == 'handwritten'
+        self.entries = []  # [filename, text] in page order, text is None until recognized
+        self.pending = []  # (entry, image, image path, page hash) waiting for batched recognition
+
+    def write(self, filename, text=''):
+        """Adds a page with known text (blank, duplicate or not recognized pages)."""
+        self.entries.append([filename, text])
+        self._write_ready()
+
+    def recognize(self, filename, image_path, image, page_hash):
+        """Recognizes a page according to the document type and adds its text."""
+        if not self.handwritten:
+            text = get_ocr_text(image, self.settings, get_word_data_path(filename, self.settings))
+            register_recognized_page(image_path, text, page_hash, self.hash_index, self.settings, self.manifest)
+            self.write(filename, text)
+            return
+
+        entry = [filename, None]
+        self.entries.append(entry)
+        self.pending.append((entry, image, image_path, page_hash))
+        if len(self.pending) >= self.settings.get('KRAKEN_PAGE_BATCH', 8):
+            self.flush()
+
+    def flush(self):
+        """Recognizes queued handwritten pages and writes all pages that are ready."""
+        if self.pending:
+            from ocr.kraken_ocr import get_kraken_pages_text
+
+            texts = get_kraken_pages_text([p[1] for p in self.pending], self.settings)
+            for (entry, _, image_path, page_hash), text in zip(self.pending, texts):
+                entry[1] = text
+                register_recognized_page(image_path, text, page_hash, self.hash_index, self.settings, self.manifest)
+            self.pending = []
+        self._write_ready()
+
+    def close(self):
+        self.flush()
+        if self.handwritten:
+            from ocr.kraken_ocr import print_throughput
+            print_throughput()
+
+    def _write_ready(self):
+        # Pages are written only after all previous pages have their text
+        while self.entries and self.entries[0][1] is not None:
+            filename, text = self.entries.pop(0)
+            self.out_f.write(format_page_marker(filename) + "\n")
+            if text:
+                self.out_f.write(text + "\n")
 
 def recognize_ready_images(settings):
     """
@@ -15,7 +330,7 @@ def recognize_ready_images(settings):
     output_folder = settings['PROCESSED_FOLDER']
     
     # Getting a list of image files
-    image_files = [f for f in os.listdir(output_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.tif', '.tiff'))]
+    image_files = sorted(f for f in os.listdir(output_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.tif', '.tiff')))
 
     if not image_files:
         print("No images to recognize. Place finished files in output folder.")
@@ -24,19 +339,44 @@ def recognize_ready_images(settings):
     if settings.get('SKIP_PREPROCESSING'):
         print("Already processed images from the output folder are recognized.")
 
+    manifest = {'pages': []}
+    hash_index = open_page_hash_index(settings)
+
     with open(settings['OUTPUT_TEXT_FILE'], "w", encoding="utf-8") as out_f:
+        writer = PageTextWriter(out_f, settings, hash_index, manifest)
         for filename in image_files:
             image_path = os.path.join(output_folder, filename)
-            image = cv2.imread(image_path)
-            if image is None:
+
+            # Reduced greyscale decode first; the full resolution is decoded only for OCR
+            page = PageImage(image_path, settings)
+            if page.analysis is None:
                 print(f"Loading error: {filename}")
+                manifest['pages'].append({'file': image_path, 'status': 'error'})
+                continue
+
+            # Blank pages are recorded with an empty text
+            if skip_blank_page(page.analysis, image_path, settings, manifest):
+                writer.write(filename)
+                continue
+
+            # Near-duplicates of already recognized pages reuse their text
+            recognized_text, page_hash = reuse_duplicate_ocr(page.analysis, image_path, hash_index, settings, manifest)
+            if recognized_text is not None:
+                writer.write(filename, recognized_text)
+                continue
+
+            if page.full is None:
+                print(f"Loading error: {filename}")
+                manifest['pages'].append({'file': image_path, 'status': 'error'})
                 continue
 
             # Text recognition based on document type
-            recognized_text = get_ocr_text(image, settings)
-            
-            # Writing results to a file
-            out_f.write(recognized_text + "\n")
+            writer.recognize(filename, image_path, page.full, page_hash)
+        writer.close()
+
+    if hash_index is not None:
+        hash_index.close()
+    write_manifest(manifest, settings)
 
 
 def process_images_from_folder(input_folder, processed_folder, output_text_file, settings):
@@ -49,20 +389,82 @@ def process_images_from_folder(input_folder, processed_folder, output_text_file,
         output_text_file (str): File to save results
         settings (dict): Processing settings
     """
-    with open(output_text_file, "w", encoding="utf-8") as out_f:
+    # Several worker processes: pages are admitted according to their estimated memory
+    if (settings.get('PROCESS_WORKERS', 1) or os.cpu_count()) > 1:
+        from utils.memory_scheduler import process_images_scheduled
+        process_images_scheduled(input_folder, processed_folder, output_text_file, settings)
+        return
+
+    manifest = {'pages': []}
+    hash_index = open_page_hash_index(settings)
+
+    with open_text_output(output_text_file, settings) as out_f:
+        writer = PageTextWriter(out_f, settings, hash_index, manifest)
         for filename in sorted(os.listdir(input_folder)):
             if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
                 input_path = os.path.join(input_folder, filename)
                 output_path = os.path.join(processed_folder, filename)
 
+                # Reduced greyscale decode first; the full resolution is decoded only for processing
+                page = PageImage(input_path, settings)
+                if page.analysis is None:
+                    print(f"Loading error: {input_path}")
+                    manifest['pages'].append({'file': input_path, 'status': 'error'})
+                    continue
+
+                # Blank pages skip processing and OCR
+                if skip_blank_page(page.analysis, input_path, settings, manifest):
+                    writer.write(filename)
+                    continue
+
+                # Near-duplicates of already recognized pages skip processing and OCR
+                text, page_hash = reuse_duplicate_ocr(page.analysis, input_path, hash_index, settings, manifest)
+                if text is not None:
+                    writer.write(filename, text)
+                    continue
+
                 # Image processing
-                processed = preprocess_image(input_path, output_path, settings)
+                processed = preprocess_image(input_path, output_path, settings, image=page.full, analysis=page.analysis)
 
                 if processed is not None:
                     if settings.get('ENABLE_OCR', True):  # OCR is enabled by default
-                        lang = 'rus+deu+lav'  # Basic languages
-                        text = get_ocr_text(processed, lang=lang)
-                        out_f.write(text + "\n")
+                        writer.recognize(filename, input_path, processed, page_hash)
                     else:
-                        out_f.write(f"\n===== {filename} =====\n")
-                        out_f.write("[OCR is disabled]\n")
\ No newline at end of file
+                        manifest['pages'].append({'file': input_path, 'status': 'processed'})
+                        writer.write(filename, "[OCR is disabled]")
+        writer.close()
+
+    if hash_index is not None:
+        hash_index.close()
+    write_manifest(manifest, settings)
+
+
+def rebuild_text_from_word_data(settings):
+    """
+    Rebuilds recognized text from stored word tables without running OCR again.
+    Uses the current OCR_MIN_CONFIDENCE and OCR_LINE_GROUPING settings.
+    
+    Args:
+        settings (dict): Processing settings
+    """
+    word_data_folder = settings['WORD_DATA_FOLDER']
+    if not os.path.isdir(word_data_folder):
+        print(f"Word data folder not found: {word_data_folder}")
+        return
+
+    table_files = sorted(f for f in os.listdir(word_data_folder) if f.lower().endswith('.npz'))
+    if not table_files:
+        print("No stored word data. Run OCR with SAVE_WORD_DATA enabled first.")
+        return
+
+    with open(settings['OUTPUT_TEXT_FILE'], "w", encoding="utf-8") as out_f:
+        for filename in table_files:
+            words = load_word_table(os.path.join(word_data_folder, filename))
+            text = words_to_text(
+                words,
+                min_conf=settings.get('OCR_MIN_CONFIDENCE', 50),
+                grouping=settings.get('OCR_LINE_GROUPING', 'line')
+            )
+            # Word tables are named '<image file>.npz'
+            out_f.write(format_page_marker(filename[:-len('.npz')]) + "\n")
+            out_f.write(text + "\n")
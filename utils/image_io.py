@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+# Reduced decodes: JPEG is decoded directly at 1/2, 1/4 or 1/8 size (DCT scaling)
+REDUCED_GRAYSCALE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+def read_image_header(image_path: str) -> Optional[Tuple[int, int]]:
+    """
+    Reads image dimensions from the file header without decoding the pixels.
+
+    Args:
+        image_path (str): Path to the image
+
+    Returns:
+        Tuple[int, int]: (width, height) or None if the header can't be read
+    """
+    from PIL import Image  # Installed with pytesseract
+
+    try:
+        with Image.open(image_path) as img:
+            return img.size
+    except Exception as e:
+        print(f"[!] Unable to read image header: {image_path}: {e}")
+        return None
+
+def read_full_image(image_path: str, settings) -> Optional[np.ndarray]:
+    """
+    Decodes a page at full resolution; straight to greyscale when FORCE_GRAYSCALE is set,
+    so rotation, cropping and tone correction work on one channel instead of three.
+
+    Args:
+        image_path (str): Path to the image
+        settings (dict): Processing settings
+
+    Returns:
+        numpy.ndarray: Greyscale or BGR image, None if it can't be read
+    """
+    flag = cv2.IMREAD_GRAYSCALE if settings.get('FORCE_GRAYSCALE') else cv2.IMREAD_COLOR
+    return cv2.imread(image_path, flag)
+
+def read_reduced_image(image_path: str, max_side: int, size: Optional[Tuple[int, int]] = None) -> Optional[np.ndarray]:
+    """
+    Decodes a greyscale copy of a page with the longest side of at most max_side pixels.
+    The largest reduced decode that is still not smaller than max_side is used, then resized.
+
+    Args:
+        image_path (str): Path to the image
+        max_side (int): Longest side of the result
+        size (Tuple[int, int]): (width, height) from the header, if already known
+
+    Returns:
+        numpy.ndarray: Greyscale image, None if it can't be read
+    """
+    size = size or read_image_header(image_path)
+    flag = cv2.IMREAD_GRAYSCALE
+    if size is not None:
+        for factor in (8, 4, 2):
+            if max(size) / factor >= max_side:
+                flag = REDUCED_GRAYSCALE_FLAGS[factor]
+                break
+
+    image = cv2.imread(image_path, flag)
+    if image is None:
+        return None
+    return fit_to_side(image, max_side)
+
+def write_bilevel_tiff(image, output_path: str):
+    """
+    Saves a binarized (0/255) page as a 1-bit TIFF with CCITT Group 4 compression,
+    typically 10-20 times smaller than a greyscale PNG of the same page.
+
+    Args:
+        image (numpy.ndarray): Binarized greyscale image
+        output_path (str): Path of the .tif file
+    """
+    from PIL import Image  # Installed with pytesseract
+
+    # Values are already 0/255, so the conversion to 1 bit is exact
+    Image.fromarray(image).convert('1').save(output_path, compression='group4')
+
+def fit_to_side(image, max_side: int) -> np.ndarray:
+    """Downscales an image (INTER_AREA) so its longest side is at most max_side pixels."""
+    h, w = image.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+class PageImage:
+    """
+    Page decoded on demand: a reduced greyscale copy for the analysis stages (blank detection,
+    duplicate hashing, orientation, deskew and crop estimation) and the full-resolution image
+    only for the final render. Blank and duplicate pages are never decoded at full resolution.
+    """
+
+    def __init__(self, image_path: str, settings):
+        self.image_path = image_path
+        self.settings = settings
+        self._analysis = None
+        self._full = None
+
+    @property
+    def analysis(self):
+        """Greyscale copy with the longest side of at most GEOMETRY_ANALYSIS_MAX_SIDE (None if unreadable)."""
+        if self._analysis is None:
+            max_side = self.settings.get('GEOMETRY_ANALYSIS_MAX_SIDE')
+            if self.settings.get('REDUCED_DECODE', True) and max_side:
+                self._analysis = read_reduced_image(self.image_path, max_side)
+            elif self.full is not None:
+                gray = self.full if len(self.full.shape) == 2 else cv2.cvtColor(self.full, cv2.COLOR_BGR2GRAY)
+                self._analysis = fit_to_side(gray, max_side) if max_side else gray
+        return self._analysis
+
+    @property
+    def full(self):
+        """Full-resolution page, greyscale if FORCE_GRAYSCALE is set (None if unreadable)."""
+        if self._full is None:
+            self._full = read_full_image(self.image_path, self.settings)
+        return self._full
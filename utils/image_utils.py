@@ -2,8 +2,9 @@ import cv2
 import os
 from typing import Optional
 from image_processing.image_processing import process_image
+from utils.image_io import read_full_image, write_bilevel_tiff
 
-def preprocess_image(image_path, output_path, settings):
+def preprocess_image(image_path, output_path, settings, image=None, analysis=None):
     """
     Pre-processing of images before OCR.
     
@@ -11,23 +12,29 @@ def preprocess_image(image_path, output_path, settings):
         image_path (str): Path to original image
         output_path (str): Path to save the processed image
         settings (dict): Processing settings
+        image (numpy.ndarray): Already decoded image (optional, read from image_path if not given)
+        analysis (numpy.ndarray): Reduced greyscale copy for rotation and crop estimation (optional)
         
     Returns:
         numpy.ndarray: The processed image or None on error
     """
-    image = cv2.imread(image_path)
+    if image is None:
+        image = read_full_image(image_path, settings)
     if image is None:
         print(f"Loading error: {image_path}")
         return None
 
     # Image processing
-    processed = process_image(image, settings)
+    processed = process_image(image, settings, analysis)
 
     # Convert to grayscale if needed
     if settings['FORCE_GRAYSCALE']:
         if len(processed.shape) == 3 and processed.shape[2] == 3:
             processed = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
 
-    # Saving the processed image
-    cv2.imwrite(output_path, processed, [cv2.IMWRITE_JPEG_QUALITY, 75])
+    # Saving the processed image (binarized pages as compressed 1-bit TIFF if enabled)
+    if settings.get('BINARIZE') and settings.get('SAVE_BILEVEL_TIFF', True):
+        write_bilevel_tiff(processed, os.path.splitext(output_path)[0] + '.tif')
+    else:
+        cv2.imwrite(output_path, processed, [cv2.IMWRITE_JPEG_QUALITY, 75])
     return processed
@@ -0,0 +1,362 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional, Tuple
+import numpy as np
+from utils.image_io import read_image_header
+
+MB = 1024 * 1024
+
+def estimate_page_memory(width: int, height: int, settings: dict) -> int:
+    """
+    Estimates the peak working set of one page in preprocessing and OCR.
+    Memory grows with the pixel count: the decoded page (greyscale with FORCE_GRAYSCALE, else BGR),
+    the rotated and cropped render and the float32 copies made by the tone functions
+    all exist at once at the peak.
+
+    Args:
+        width (int): Page width in pixels
+        height (int): Page height in pixels
+        settings (dict): Processing settings (MEMORY_BYTES_PER_PIXEL, MEMORY_PAGE_BASE_MB)
+
+    Returns:
+        int: Estimated peak in bytes
+    """
+    return int(width * height * settings.get('MEMORY_BYTES_PER_PIXEL', 40)
+               + settings.get('MEMORY_PAGE_BASE_MB', 30) * MB)
+
+def memory_budget(settings: dict, workers: int) -> int:
+    """
+    Returns the memory (bytes) available for pages in flight:
+    MEMORY_BUDGET_MB (or 70% of physical memory) minus the resident size of the worker processes.
+    """
+    budget_mb = settings.get('MEMORY_BUDGET_MB')
+    if budget_mb:
+        budget = budget_mb * MB
+    else:
+        try:
+            budget = int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') * 0.7)
+        except (ValueError, OSError, AttributeError):
+            budget = 4096 * MB
+    return max(0, budget - workers * settings.get('MEMORY_WORKER_BASE_MB', 200) * MB)
+
+def interleave_by_size(jobs: List[dict]) -> List[dict]:
+    """Orders jobs largest, smallest, second largest, second smallest... so large pages are spread out."""
+    ordered = sorted(jobs, key=lambda job: job['estimate'], reverse=True)
+    result = []
+    while ordered:
+        result.append(ordered.pop(0))
+        if ordered:
+            result.append(ordered.pop())
+    return result
+
+def _read_proc_status(field: str) -> Optional[int]:
+    # Memory fields of /proc/self/status (Linux), in bytes
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss() -> bool:
+    # Linux: writing 5 to clear_refs resets the peak resident set size (VmHWM) of the process
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+class MemoryScheduler:
+    """
+    Admits pages into a process pool only while the sum of their estimated peak memory
+    fits in the budget. A page that doesn't fit blocks the queue: smaller pages from
+    the next few may overtake it, but only a limited number of times, so large pages
+    are not starved. A page larger than the whole budget runs alone.
+    """
+
+    def __init__(self, budget: int, workers: int):
+        self.budget = budget
+        self.workers = workers
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.overtaken = 0  # Pages admitted ahead of the first waiting page
+
+    def _next_job(self, pending: deque) -> Optional[dict]:
+        free = self.budget - self.in_use
+        if pending[0]['estimate'] <= free or self.in_use == 0:
+            self.overtaken = 0
+            return pending.popleft()
+        if self.overtaken >= self.workers:
+            return None  # Wait until the first page fits
+        for i in range(1, min(len(pending), self.workers * 2)):
+            if pending[i]['estimate'] <= free:
+                self.overtaken += 1
+                job = pending[i]
+                del pending[i]
+                return job
+        return None
+
+    def run(self, pool, func, jobs: List[dict]):
+        """
+        Runs func(job) in the pool for every job in memory-admission order.
+
+        Args:
+            pool (concurrent.futures.Executor): Worker pool
+            func (callable): Page function (picklable), receives the job dict
+            jobs (List[dict]): Jobs with 'file' and 'estimate' (bytes) keys
+
+        Yields:
+            Tuple: (job, finished future) in completion order
+        """
+        pending = deque(jobs)
+        running = {}
+
+        while pending or running:
+            while pending and len(running) < self.workers:
+                job = self._next_job(pending)
+                if job is None:
+                    break
+                if job['estimate'] > self.budget:
+                    print(f"[!] Estimated {job['estimate'] / MB:.0f} MB exceeds the memory budget, "
+                          f"processed alone: {job['file']}")
+                self.in_use += job['estimate']
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+                running[pool.submit(func, job)] = job
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                self.in_use -= job['estimate']
+                yield job, future
+
+_worker_settings = None
+_worker_baseline_rss = None
+
+def _init_worker(settings):
+    # Duplicates are looked up by the main process before pages are submitted (see BatchScreening)
+    global _worker_settings, _worker_baseline_rss
+    import utils.image_utils  # Loads OpenCV and the processing modules before the baseline is taken
+
+    _worker_settings = settings
+
+    # Page peaks are measured from the resident size of the idle worker: heap memory kept
+    # by the allocator after earlier pages is counted, as it is not available to other workers
+    _worker_baseline_rss = _read_proc_status('VmRSS')
+
+def process_scheduled_page(job: dict) -> dict:
+    """
+    Runs one page through blank detection, preprocessing and OCR in a worker process
+    and measures its peak memory. Pages screened by the main process skip blank detection.
+
+    Args:
+        job (dict): Page job ('file', 'filename', 'output_path', 'screened')
+
+    Returns:
+        dict: 'text' (None if nothing is written for the page), 'recognized',
+              'manifest' (page records) and 'actual' (peak bytes above the idle worker, or None if not measurable)
+    """
+    from utils.file_utils import skip_blank_page, get_word_data_path
+    from utils.image_utils import preprocess_image
+    from utils.image_io import PageImage
+
+    settings = _worker_settings
+    manifest = {'pages': []}
+    result = {'text': None, 'recognized': False, 'manifest': manifest['pages']}
+    measured = _reset_peak_rss() and _worker_baseline_rss is not None
+
+    page = PageImage(job['file'], settings)
+    if page.analysis is None:
+        print(f"Loading error: {job['file']}")
+        manifest['pages'].append({'file': job['file'], 'status': 'error'})
+    elif not job.get('screened') and skip_blank_page(page.analysis, job['file'], settings, manifest):
+        result['text'] = ''
+    else:
+        processed = preprocess_image(job['file'], job['output_path'], settings,
+                                     image=page.full, analysis=page.analysis)
+        del page
+        if processed is not None:
+            if not settings.get('ENABLE_OCR', True):
+                manifest['pages'].append({'file': job['file'], 'status': 'processed'})
+                result['text'] = "[OCR is disabled]"
+            elif settings.get('DOCUMENT_TYPE') == 'handwritten':
+                from ocr.kraken_ocr import get_kraken_text
+                result['text'] = get_kraken_text(processed, settings)
+                result['recognized'] = True
+            else:
+                from ocr.tesseract_ocr import get_ocr_text
+                result['text'] = get_ocr_text(processed, settings, get_word_data_path(job['filename'], settings))
+                result['recognized'] = True
+
+    result['actual'] = max(0, _read_proc_status('VmHWM') - _worker_baseline_rss) if measured else None
+    return result
+
+def write_memory_profile(profile_path: str, records: List[dict]):
+    """Appends estimated and measured peak memory of pages to a TSV file (for calibration)."""
+    os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+    is_new = not os.path.exists(profile_path)
+    with open(profile_path, 'a', encoding='utf-8') as f:
+        if is_new:
+            f.write('file\twidth\theight\testimated_mb\tactual_mb\n')
+        for record in records:
+            actual = '' if record['actual'] is None else f"{record['actual'] / MB:.1f}"
+            f.write(f"{record['file']}\t{record['width']}\t{record['height']}\t"
+                    f"{record['estimate'] / MB:.1f}\t{actual}\n")
+
+def calibrate_memory_model(profile_path: str, settings: dict) -> Optional[Tuple[float, float]]:
+    """
+    Fits the page memory model (MEMORY_PAGE_BASE_MB + MEMORY_BYTES_PER_PIXEL x pixels)
+    to the measured peaks recorded in the memory profile.
+
+    With pages of different sizes both terms are fitted: the per-pixel term by least squares,
+    the base so that 90% of the measured pages stay within their estimate. With a single page
+    size the terms can't be separated: the base is kept and only pages that exceeded it give
+    the per-pixel term (90th percentile).
+
+    Args:
+        profile_path (str): Memory profile TSV
+        settings (dict): Processing settings (MEMORY_PAGE_BASE_MB)
+
+    Returns:
+        Tuple[float, float]: Suggested (bytes per pixel, base MB), or None if the measurements
+            don't allow a fit (none recorded, or none above the current base with one page size)
+    """
+    if not os.path.exists(profile_path):
+        return None
+
+    pixels, peaks = [], []
+    with open(profile_path, encoding='utf-8') as f:
+        next(f, None)  # Header
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 5 or not fields[4] or not fields[1] or not fields[2]:
+                continue
+            count = int(fields[1]) * int(fields[2])
+            if count:
+                pixels.append(count)
+                peaks.append(float(fields[4]) * MB)
+    if not pixels:
+        return None
+
+    pixels, peaks = np.array(pixels, dtype=np.float64), np.array(peaks)
+    if np.ptp(pixels) > 0:
+        slope = max(0.0, float(np.polyfit(pixels, peaks, 1)[0]))
+        base = max(0.0, float(np.percentile(peaks - slope * pixels, 90)))
+        return slope, base / MB
+
+    base = settings.get('MEMORY_PAGE_BASE_MB', 30) * MB
+    above = peaks > base
+    if not above.any():
+        return None
+    return float(np.percentile((peaks[above] - base) / pixels[above], 90)), base / MB
+
+def process_images_scheduled(input_folder, processed_folder, output_text_file, settings):
+    """
+    Parallel version of process_images_from_folder: pages are processed by PROCESS_WORKERS
+    processes, admitted while their estimated peak memory fits in the memory budget.
+    Text is written in page order, as in the sequential loop.
+
+    Args:
+        input_folder (str): Folder with source images
+        processed_folder (str): Folder for processed images
+        output_text_file (str): File to save results
+        settings (dict): Processing settings
+    """
+    from utils.file_utils import (open_page_hash_index, open_text_output, register_recognized_page,
+                                  write_manifest, PageTextWriter, BatchScreening)
+
+    workers = settings.get('PROCESS_WORKERS') or os.cpu_count()
+    budget = memory_budget(settings, workers)
+
+    # Estimates from the image headers, before anything is decoded
+    jobs = []
+    for filename in sorted(os.listdir(input_folder)):
+        if not filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+            continue
+        input_path = os.path.join(input_folder, filename)
+        size = read_image_header(input_path)
+        width, height = size or (0, 0)
+        jobs.append({
+            'index': len(jobs), 'filename': filename, 'file': input_path,
+            'output_path': os.path.join(processed_folder, filename),
+            'width': width, 'height': height,
+            # Unknown size: the page runs alone
+            'estimate': estimate_page_memory(width, height, settings) if size else budget + 1,
+        })
+
+    scheduler = MemoryScheduler(budget, workers)
+    manifest = {'pages': []}
+    hash_index = open_page_hash_index(settings)
+    screening = BatchScreening(hash_index, settings) if hash_index is not None else None
+    results = {}
+    next_index = 0
+
+    def write_ready():
+        # Pages are written as soon as all previous pages are done
+        nonlocal next_index
+        while next_index in results:
+            done = results.pop(next_index)
+            result = done['result']
+            manifest['pages'].extend(result['manifest'])
+            if done.get('decision', {}).get('status') == 'batch_duplicate':
+                original = jobs[done['decision']['original']]['result']
+                result['text'] = screening.reuse(done['file'], done['decision'], original['text'],
+                                                 original['recognized'], manifest)
+            if result['recognized']:
+                page_hash = screening.page_hash(done['file']) if screening else None
+                register_recognized_page(done['file'], result['text'], page_hash, hash_index, settings, manifest)
+            if result['text'] is not None:
+                writer.write(done['filename'], result['text'])
+            next_index += 1
+
+    print(f"[Scheduler] {len(jobs)} page(s), {workers} worker(s), memory budget {budget / MB:.0f} MB")
+    with (
+        open_text_output(output_text_file, settings) as out_f,
+        ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings,)) as pool,
+    ):
+        writer = PageTextWriter(out_f, settings, hash_index, manifest)
+
+        # Blank pages and duplicates (also of other pages of this batch) are not submitted
+        submitted = jobs
+        if screening is not None:
+            submitted = []
+            for job, decision in zip(jobs, screening.screen(pool, [job['file'] for job in jobs])):
+                if decision['status'] == 'process':
+                    job['screened'] = True
+                    submitted.append(job)
+                else:
+                    job['decision'] = decision
+                    job['result'] = {'text': decision['text'], 'recognized': False,
+                                     'actual': None, 'manifest': decision['manifest']}
+                    results[job['index']] = job
+            write_ready()
+
+        for job, future in scheduler.run(pool, process_scheduled_page, interleave_by_size(submitted)):
+            try:
+                job['result'] = future.result()
+            except Exception as e:
+                print(f"[!] Processing failed: {job['file']}: {e}")
+                job['result'] = {'text': None, 'recognized': False, 'actual': None,
+                                 'manifest': [{'file': job['file'], 'status': 'error', 'error': str(e)}]}
+            results[job['index']] = job
+            write_ready()
+        writer.close()
+
+    if screening is not None:
+        screening.close()
+    if hash_index is not None:
+        hash_index.close()
+    write_manifest(manifest, settings)
+
+    # Estimated vs measured peak memory, for calibration of MEMORY_BYTES_PER_PIXEL
+    profile_path = settings['MEMORY_PROFILE_FILE']
+    write_memory_profile(profile_path, [{**job, 'actual': job['result']['actual']} for job in jobs])
+    print(f"[Scheduler] Peak estimated memory in flight: {scheduler.peak_in_use / MB:.0f} MB")
+    suggested = calibrate_memory_model(profile_path, settings)
+    if suggested is not None:
+        print(f"[Scheduler] Measured peaks suggest MEMORY_BYTES_PER_PIXEL = {suggested[0]:.1f}, "
+              f"MEMORY_PAGE_BASE_MB = {suggested[1]:.0f} (current: {settings.get('MEMORY_BYTES_PER_PIXEL', 40)}, "
+              f"{settings.get('MEMORY_PAGE_BASE_MB', 30)})")
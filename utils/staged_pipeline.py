@@ -0,0 +1,368 @@
+import os
+import json
+import time
+import threading
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+from typing import Optional, Tuple
+import numpy as np
+
+# Stages in pipeline order; a page message passes through every stage of the run
+STAGES = ('decode', 'preprocess', 'ocr', 'postprocess')
+
+def put_shared_image(image: np.ndarray) -> dict:
+    """
+    Copies an image into a new shared memory block.
+
+    Returns:
+        dict: Descriptor (block name, shape, dtype) passed between processes instead of the pixels
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+    np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[...] = image
+    descriptor = {'name': shm.name, 'shape': image.shape, 'dtype': image.dtype.str}
+    shm.close()
+    return descriptor
+
+def take_shared_image(descriptor: dict) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    """
+    Attaches to a shared image without copying it.
+
+    Returns:
+        Tuple: (image view, shared memory block); the view must be dropped before release_shared_image
+    """
+    shm = shared_memory.SharedMemory(name=descriptor['name'])
+    image = np.ndarray(descriptor['shape'], dtype=np.dtype(descriptor['dtype']), buffer=shm.buf)
+    return image, shm
+
+def release_shared_image(shm: shared_memory.SharedMemory):
+    """Frees a shared image block once its last stage is done with it."""
+    shm.close()
+    shm.unlink()
+
+def discard_shared_image(descriptor: Optional[dict]):
+    """Frees the shared image of a message that won't be processed further."""
+    if descriptor is not None:
+        try:
+            release_shared_image(shared_memory.SharedMemory(name=descriptor['name']))
+        except FileNotFoundError:
+            pass
+
+def _decode_stage(message, settings):
+    from utils.file_utils import skip_blank_page
+    from utils.image_io import PageImage
+
+    # Blank pages are detected on the reduced decode, before the full one
+    # (by the collector process instead when duplicates are looked up, see BatchScreening)
+    manifest = {'pages': message['manifest']}
+    page = PageImage(message['file'], settings)
+    if page.analysis is None:
+        print(f"Loading error: {message['file']}")
+        manifest['pages'].append({'file': message['file'], 'status': 'error'})
+        message['done'] = True
+    elif not message['screened'] and skip_blank_page(page.analysis, message['file'], settings, manifest):
+        message['text'], message['done'] = '', True
+    elif page.full is None:
+        print(f"Loading error: {message['file']}")
+        manifest['pages'].append({'file': message['file'], 'status': 'error'})
+        message['done'] = True
+    else:
+        message['image'] = put_shared_image(page.full)
+    return message
+
+def _preprocess_stage(message, settings):
+    from utils.image_utils import preprocess_image
+
+    image, shm = take_shared_image(message['image'])
+    processed = preprocess_image(message['file'], message['output_path'], settings, image=image)
+    # The result is copied to a new block before the input view is dropped (it may be a view of it)
+    message['image'] = put_shared_image(processed) if processed is not None else None
+    del image, processed
+    release_shared_image(shm)
+
+    if message['image'] is None:
+        message['done'] = True
+    elif not settings.get('ENABLE_OCR', True):
+        discard_shared_image(message['image'])
+        message['image'] = None
+        message['manifest'].append({'file': message['file'], 'status': 'processed'})
+        message['text'], message['done'] = "[OCR is disabled]", True
+    return message
+
+def _ocr_stage(message, settings):
+    from utils.file_utils import get_word_data_path
+
+    image, shm = take_shared_image(message['image'])
+    if settings.get('DOCUMENT_TYPE') == 'handwritten':
+        from ocr.kraken_ocr import get_kraken_text
+        message['text'] = get_kraken_text(image, settings)
+    else:
+        from ocr.tesseract_ocr import get_ocr_text
+        message['text'] = get_ocr_text(image, settings, get_word_data_path(message['filename'], settings))
+    del image
+    release_shared_image(shm)
+    message['image'] = None
+    message['recognized'] = True
+    return message
+
+def _postprocess_stage(message, settings):
+    from postprocessing.text_cleanup import clean_text
+    from postprocessing.spell_check import correct_spelling
+
+    # Text of every page is cleaned and checked, including pages that ended early
+    if message['text'] is not None:
+        message['cleaned'] = clean_text(message['text'])
+        message['corrected'], _ = correct_spelling(message['cleaned'], settings)
+    return message
+
+STAGE_FUNCTIONS = {
+    'decode': _decode_stage,
+    'preprocess': _preprocess_stage,
+    'ocr': _ocr_stage,
+    'postprocess': _postprocess_stage,
+}
+
+def _stage_worker(stage, settings, in_queue, out_queue, stats_queue):
+    # Pages that ended early (blank, duplicate, errors) pass through image stages untouched
+    if stage == 'ocr':
+        os.environ['OMP_THREAD_LIMIT'] = '1'  # One Tesseract thread per worker process
+
+    function = STAGE_FUNCTIONS[stage]
+    busy, idle, pages = 0.0, 0.0, 0
+    while True:
+        start = time.perf_counter()
+        message = in_queue.get()
+        idle += time.perf_counter() - start
+        if message is None:
+            break
+
+        start = time.perf_counter()
+        if not message['done'] or stage == 'postprocess':
+            try:
+                message = function(message, settings)
+            except Exception as e:
+                print(f"[!] {stage} failed: {message['file']}: {e}")
+                if stage != 'postprocess':  # The recognized text is kept if only postprocessing failed
+                    discard_shared_image(message['image'])
+                    message.update(image=None, text=None, done=True)
+                message['manifest'].append({'file': message['file'], 'status': 'error', 'error': str(e)})
+            pages += 1
+        busy += time.perf_counter() - start
+        out_queue.put(message)
+
+    stats_queue.put({'stage': stage, 'pid': os.getpid(), 'busy': busy, 'idle': idle, 'pages': pages})
+
+class StagedPipeline:
+    """
+    Runs pages through decode, preprocess, OCR and text postprocess stages, each with its
+    own group of worker processes, connected by bounded queues. Page images move between
+    stages in shared memory blocks; only small descriptors go through the queues.
+    """
+
+    def __init__(self, settings: dict, stages=STAGES):
+        self.settings = settings
+        self.stages = list(stages)
+        workers = settings.get('PIPELINE_WORKERS') or {}
+        cpu_count = os.cpu_count() or 1
+        # Default: the cores are shared by the image and OCR stages, decode and text stages get one worker
+        self.workers = {stage: workers.get(stage) or (max(1, cpu_count // 2) if stage in ('preprocess', 'ocr') else 1)
+                        for stage in self.stages}
+        queue_size = settings.get('PIPELINE_QUEUE_SIZE', 4)
+
+        # queues[i] feeds stage i; the last queue holds finished pages for the collector
+        self.queues = [multiprocessing.Queue(maxsize=queue_size * self.workers[s]) for s in self.stages]
+        self.queues.append(multiprocessing.Queue())
+        self.stats_queue = multiprocessing.Queue()
+        self.depth_samples = {stage: [] for stage in self.stages}
+        self.processes = {}
+
+    def _start(self):
+        # One resource tracker for all workers: blocks created in one stage are unlinked in the next
+        resource_tracker.ensure_running()
+        for i, stage in enumerate(self.stages):
+            self.processes[stage] = [
+                multiprocessing.Process(target=_stage_worker, daemon=True,
+                                        args=(stage, self.settings, self.queues[i], self.queues[i + 1],
+                                              self.stats_queue))
+                for _ in range(self.workers[stage])
+            ]
+            for process in self.processes[stage]:
+                process.start()
+
+    def _feed_and_shutdown(self, messages):
+        # Feeds pages, then stops the stages one after another once the previous stage has exited
+        for message in messages:
+            self.queues[0].put(message)
+        for i, stage in enumerate(self.stages):
+            for _ in self.processes[stage]:
+                self.queues[i].put(None)
+            for process in self.processes[stage]:
+                process.join()
+        self.queues[-1].put(None)
+
+    def _sample_depths(self, stop: threading.Event, interval: float):
+        while not stop.wait(interval):
+            for i, stage in enumerate(self.stages):
+                try:
+                    self.depth_samples[stage].append(self.queues[i].qsize())
+                except NotImplementedError:  # macOS
+                    return
+
+    def run(self, messages):
+        """
+        Processes page messages and yields them as they leave the last stage (in completion order).
+
+        Args:
+            messages (List[dict]): Page messages (see make_page_message)
+
+        Yields:
+            dict: Finished page messages
+        """
+        self._start()
+        started = time.perf_counter()
+        stop = threading.Event()
+        feeder = threading.Thread(target=self._feed_and_shutdown, args=(messages,), daemon=True)
+        sampler = threading.Thread(target=self._sample_depths,
+                                   args=(stop, self.settings.get('PIPELINE_SAMPLE_SECONDS', 0.5)), daemon=True)
+        feeder.start()
+        sampler.start()
+        try:
+            while True:
+                message = self.queues[-1].get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            stop.set()
+            feeder.join()
+            sampler.join()
+        self.wall_seconds = time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """
+        Returns per-stage statistics of the finished run: workers, pages, utilization
+        (busy time / (wall time x workers)) and the mean and max depth of the stage input queue.
+        A stage with high utilization and a long input queue needs more workers.
+        """
+        worker_stats = []
+        while not self.stats_queue.empty():
+            worker_stats.append(self.stats_queue.get())
+
+        result = {'wall_seconds': round(self.wall_seconds, 2), 'stages': {}}
+        for stage in self.stages:
+            stage_stats = [s for s in worker_stats if s['stage'] == stage]
+            busy = sum(s['busy'] for s in stage_stats)
+            depths = self.depth_samples[stage]
+            result['stages'][stage] = {
+                'workers': self.workers[stage],
+                'pages': sum(s['pages'] for s in stage_stats),
+                'busy_seconds': round(busy, 2),
+                'utilization': round(busy / (self.wall_seconds * self.workers[stage]), 3)
+                if self.wall_seconds else 0.0,
+                'mean_queue_depth': round(float(np.mean(depths)), 2) if depths else None,
+                'max_queue_depth': max(depths) if depths else None,
+            }
+        return result
+
+def make_page_message(index, filename, input_path, output_path) -> dict:
+    """Creates the message that carries a page and its results through the stages."""
+    return {
+        'index': index, 'filename': filename, 'file': input_path, 'output_path': output_path,
+        'image': None, 'text': None, 'cleaned': None, 'corrected': None,
+        'recognized': False, 'done': False, 'screened': False, 'manifest': [],
+    }
+
+def print_pipeline_stats(stats: dict):
+    print(f"[Pipeline] Wall time {stats['wall_seconds']:.1f} s")
+    for stage, s in stats['stages'].items():
+        depth = '-' if s['mean_queue_depth'] is None else f"{s['mean_queue_depth']:.1f} (max {s['max_queue_depth']})"
+        print(f"[Pipeline] {stage:<12} workers {s['workers']:>2}  pages {s['pages']:>5}  "
+              f"utilization {s['utilization']:>6.1%}  input queue {depth}")
+
+def run_staged_pipeline(settings: dict) -> dict:
+    """
+    Processes INPUT_FOLDER with the staged pipeline: writes the OCR text and, if postprocessing
+    is enabled, the cleaned and spell-checked text (in page order, with page markers),
+    the batch manifest and stage statistics (PIPELINE_STATS_FILE).
+
+    Args:
+        settings (dict): Processing settings
+
+    Returns:
+        dict: Stage statistics
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from postprocessing.structure_parser import format_page_marker
+    from utils.file_utils import open_page_hash_index, register_recognized_page, write_manifest, BatchScreening
+
+    input_folder = settings['INPUT_FOLDER']
+    filenames = sorted(f for f in os.listdir(input_folder) if f.lower().endswith(('.jpg', '.jpeg', '.png')))
+    messages = [make_page_message(i, f, os.path.join(input_folder, f), os.path.join(settings['PROCESSED_FOLDER'], f))
+                for i, f in enumerate(filenames)]
+
+    # Blank pages and duplicates (also of other pages of this batch) are decided before the stages start;
+    # they pass through the image stages untouched
+    hash_index = open_page_hash_index(settings)
+    screening = BatchScreening(hash_index, settings) if hash_index is not None else None
+    decisions = {}
+    if screening is not None:
+        with ProcessPoolExecutor() as pool:
+            for message, decision in zip(messages, screening.screen(pool, [m['file'] for m in messages])):
+                message['screened'] = True
+                if decision['status'] != 'process':
+                    decisions[message['index']] = decision
+                    message.update(text=decision['text'], done=True, manifest=decision['manifest'])
+    originals = {d['original'] for d in decisions.values() if d['status'] == 'batch_duplicate'}
+
+    postprocess = settings.get('ENABLE_POSTPROCESSING')
+    stages = [s for s in STAGES
+              if (s != 'ocr' or settings.get('ENABLE_OCR', True)) and (s != 'postprocess' or postprocess)]
+    pipeline = StagedPipeline(settings, stages)
+
+    outputs = {'text': settings['OUTPUT_TEXT_FILE']}
+    if postprocess:
+        outputs.update(cleaned=settings['CLEANED_TEXT_FILE'], corrected=settings['SPELLCHECKED_TEXT_FILE'])
+    files = {key: open(path, 'w', encoding='utf-8') for key, path in outputs.items()}
+
+    manifest = {'pages': []}
+    finished = {}
+    written = {}  # Pages whose duplicates in this batch reuse their results
+    next_index = 0
+    try:
+        for message in pipeline.run(messages):
+            finished[message['index']] = message
+            # Pages are written as soon as all previous pages are done
+            while next_index in finished:
+                page = finished.pop(next_index)
+                manifest['pages'].extend(page['manifest'])
+                decision = decisions.get(next_index)
+                if decision is not None and decision['status'] == 'batch_duplicate':
+                    original = written[decision['original']]
+                    page['text'] = screening.reuse(page['file'], decision, original['text'],
+                                                   original['recognized'], manifest)
+                    if page['text'] is not None:
+                        page.update(cleaned=original['cleaned'], corrected=original['corrected'])
+                if page['recognized']:
+                    page_hash = screening.page_hash(page['file']) if screening else None
+                    register_recognized_page(page['file'], page['text'], page_hash, hash_index, settings, manifest)
+                if next_index in originals:
+                    written[next_index] = page
+                if page['text'] is not None:
+                    for key, f in files.items():
+                        f.write(format_page_marker(page['filename']) + "\n")
+                        if page[key]:
+                            f.write(page[key] + "\n")
+                next_index += 1
+    finally:
+        for f in files.values():
+            f.close()
+        if screening is not None:
+            screening.close()
+        if hash_index is not None:
+            hash_index.close()
+    write_manifest(manifest, settings)
+
+    stats = pipeline.stats()
+    print_pipeline_stats(stats)
+    with open(settings['PIPELINE_STATS_FILE'], 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=4)
+    return stats
@@ -0,0 +1,394 @@
+import os
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+from typing import List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    input_folder TEXT NOT NULL,
+    output_folder TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    batch_id INTEGER NOT NULL REFERENCES batches (id),
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (batch_id, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_status ON pages (status, lease_expires);
+"""
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+class JobStore:
+    """
+    Page job queue in a SQLite database on storage shared by all processing nodes.
+    Workers claim pages with time-limited leases; pages whose lease expired
+    (crashed or stopped worker) are claimed again by other workers.
+
+    The database uses the rollback journal (not WAL) and short write transactions
+    taken with BEGIN IMMEDIATE, so locking also works with several machines
+    as long as the shared filesystem supports file locks.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 60.0):
+        self.conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    self.conn.execute(statement)
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def _write(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        # Executes a statement in its own write transaction
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = self.conn.execute(sql, params)
+            self.conn.execute('COMMIT')
+            return cursor
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def register_batch(self, name: str, input_folder: str, output_folder: str) -> int:
+        """
+        Registers a batch and queues all images of its input folder.
+        Registering an existing batch again only adds new images.
+
+        Returns:
+            int: Number of queued pages
+        """
+        filenames = sorted(f for f in os.listdir(input_folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO batches (name, input_folder, output_folder, created) VALUES (?, ?, ?, ?)',
+                (name, os.path.abspath(input_folder), os.path.abspath(output_folder), time.time())
+            )
+            batch_id = self.conn.execute('SELECT id FROM batches WHERE name = ?', (name,)).fetchone()[0]
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO pages (batch_id, filename) VALUES (?, ?)',
+                [(batch_id, f) for f in filenames]
+            )
+            queued = self.conn.total_changes - before
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return queued
+
+    def claim(self, worker: str, lease_seconds: float, max_attempts: int = 3) -> Optional[Tuple[int, str, str, str]]:
+        """
+        Leases the next pending page to the worker, re-queuing expired leases first.
+        A page whose lease expired after max_attempts attempts is marked failed instead:
+        a page that crashes its worker (segfault, OOM kill) never reaches fail().
+
+        Returns:
+            Tuple: (page id, input image path, batch output folder, filename) or None if the queue is empty
+        """
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                "UPDATE pages SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = CASE WHEN attempts >= ? "
+                "THEN 'Lease expired ' || attempts || ' time(s), last worker: ' || worker ELSE error END, "
+                "worker = NULL, lease_expires = NULL "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (max_attempts, max_attempts, now)
+            )
+            row = self.conn.execute(
+                "SELECT p.id, b.input_folder, b.output_folder, p.filename FROM pages p "
+                "JOIN batches b ON b.id = p.batch_id WHERE p.status = 'pending' ORDER BY p.id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE pages SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker, now + lease_seconds, row[0])
+                )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        if row is None:
+            return None
+        page_id, input_folder, output_folder, filename = row
+        return page_id, os.path.join(input_folder, filename), output_folder, filename
+
+    def renew(self, page_id: int, worker: str, lease_seconds: float) -> bool:
+        """Extends the lease of a page still held by the worker."""
+        cursor = self._write(
+            "UPDATE pages SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_seconds, page_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, page_id: int, worker: str) -> bool:
+        """Marks a leased page as done; returns False if the lease was lost to another worker."""
+        cursor = self._write(
+            "UPDATE pages SET status = 'done', lease_expires = NULL, error = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (page_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, page_id: int, worker: str, error: str, max_attempts: int = 3):
+        """Returns a failed page to the queue, or marks it failed after max_attempts."""
+        self._write(
+            "UPDATE pages SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_expires = NULL, error = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (max_attempts, error, page_id, worker)
+        )
+
+    def status(self) -> List[Tuple[str, str, int]]:
+        """Returns (batch name, page status, number of pages) rows."""
+        return self.conn.execute(
+            'SELECT b.name, p.status, COUNT(*) FROM pages p JOIN batches b ON b.id = p.batch_id '
+            'GROUP BY b.name, p.status ORDER BY b.name, p.status'
+        ).fetchall()
+
+    def batch_pages(self, name: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """Returns the output folder and (filename, status) of all pages of a batch."""
+        output_folder, batch_id = self.conn.execute(
+            'SELECT output_folder, id FROM batches WHERE name = ?', (name,)
+        ).fetchone()
+        rows = self.conn.execute(
+            'SELECT filename, status FROM pages WHERE batch_id = ? ORDER BY filename', (batch_id,)
+        ).fetchall()
+        return output_folder, rows
+
+    def close(self):
+        self.conn.close()
+
+def page_result_path(output_folder: str, filename: str, kind: str = 'recognized') -> str:
+    """Path of a per-page result file: <output>/pages/<image file>.<kind>.txt"""
+    return os.path.join(output_folder, 'pages', f'{filename}.{kind}.txt')
+
+def _write_atomic(path: str, text: str):
+    # Readers on other nodes never see partially written files
+    tmp_path = f'{path}.{socket.gethostname()}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def process_page(image_path: str, output_folder: str, filename: str, settings: dict):
+    """
+    Runs one page through preprocessing, OCR and text postprocessing and writes per-page results.
+
+    Args:
+        image_path (str): Source image
+        output_folder (str): Batch output folder
+        filename (str): Image file name
+        settings (dict): Processing settings
+    """
+    from ocr.tesseract_ocr import get_ocr_text
+    from utils.image_utils import preprocess_image
+    from utils.image_io import PageImage
+    from utils.file_utils import get_word_data_path
+    from image_processing.blank_detection import page_content_metrics, is_blank_page
+
+    os.makedirs(os.path.join(output_folder, 'pages'), exist_ok=True)
+    page = PageImage(image_path, settings)
+    if page.analysis is None:
+        raise IOError(f"Loading error: {image_path}")
+
+    text = ''
+    if not (settings.get('DETECT_BLANK_PAGES') and is_blank_page(page_content_metrics(page.analysis, settings), settings)):
+        image = page.full
+        if image is None:
+            raise IOError(f"Loading error: {image_path}")
+        if not settings.get('SKIP_PREPROCESSING'):
+            processed_folder = os.path.join(output_folder, 'processed')
+            os.makedirs(processed_folder, exist_ok=True)
+            image = preprocess_image(image_path, os.path.join(processed_folder, filename), settings,
+                                     image=image, analysis=page.analysis)
+        page_settings = {**settings, 'WORD_DATA_FOLDER': os.path.join(output_folder, 'word_data')}
+        if settings.get('DOCUMENT_TYPE') == 'handwritten':
+            from ocr.kraken_ocr import get_kraken_text
+            text = get_kraken_text(image, settings)
+        else:
+            text = get_ocr_text(image, settings, get_word_data_path(filename, page_settings))
+    _write_atomic(page_result_path(output_folder, filename), text)
+
+    if settings.get('ENABLE_POSTPROCESSING'):
+        from postprocessing.text_cleanup import clean_text
+        from postprocessing.spell_check import correct_spelling
+
+        corrected, _ = correct_spelling(clean_text(text), settings)
+        _write_atomic(page_result_path(output_folder, filename, 'spell_checked'), corrected)
+
+def run_worker(db_path: str, settings: dict, lease_seconds: float = 600, poll_seconds: float = 0,
+               worker: str = None) -> int:
+    """
+    Claims and processes pages until the queue is empty (or forever, polling, if poll_seconds > 0).
+    The lease is renewed in the background while a page is being processed.
+
+    Args:
+        db_path (str): Job store database on shared storage
+        settings (dict): Processing settings
+        lease_seconds (float): Lease duration; expired pages are re-queued for other workers
+        poll_seconds (float): Wait time between polls of an empty queue (0 = exit when empty)
+        worker (str): Worker id (default: host:pid)
+
+    Returns:
+        int: Number of processed pages
+    """
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    store = JobStore(db_path)
+    processed = 0
+    try:
+        while True:
+            job = store.claim(worker, lease_seconds, settings.get('QUEUE_MAX_ATTEMPTS', 3))
+            if job is None:
+                if poll_seconds <= 0:
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            page_id, image_path, output_folder, filename = job
+            stop = threading.Event()
+
+            def heartbeat():
+                # Separate connection: sqlite3 connections are not shared between threads
+                renew_store = JobStore(db_path)
+                try:
+                    while not stop.wait(lease_seconds / 3):
+                        renew_store.renew(page_id, worker, lease_seconds)
+                finally:
+                    renew_store.close()
+
+            renewer = threading.Thread(target=heartbeat, daemon=True)
+            renewer.start()
+            try:
+                process_page(image_path, output_folder, filename, settings)
+            except Exception as e:
+                print(f"[!] {worker}: {filename} failed: {e}")
+                store.fail(page_id, worker, str(e), settings.get('QUEUE_MAX_ATTEMPTS', 3))
+            else:
+                if store.complete(page_id, worker):
+                    processed += 1
+                else:
+                    print(f"[!] {worker}: lease of {filename} expired before completion")
+            finally:
+                stop.set()
+                renewer.join()
+    finally:
+        store.close()
+    return processed
+
+def collect_batch(db_path: str, name: str, output_text_file: str, kind: str = 'recognized') -> int:
+    """
+    Joins per-page results of a batch into one text file with page markers
+    (input for the export and search index stages). Done pages without a result
+    of the requested kind are reported and skipped.
+
+    Returns:
+        int: Number of pages written
+    """
+    from postprocessing.structure_parser import format_page_marker
+
+    store = JobStore(db_path)
+    try:
+        output_folder, pages = store.batch_pages(name)
+    finally:
+        store.close()
+
+    written = 0
+    with open(output_text_file, 'w', encoding='utf-8') as out_f:
+        for filename, status in pages:
+            if status != 'done':
+                continue
+            result_path = page_result_path(output_folder, filename, kind)
+            if not os.path.exists(result_path):
+                # e.g. no spell-checked results when postprocessing was disabled on the workers
+                print(f"[!] No {kind} result for {filename}, skipped: {result_path}")
+                continue
+            with open(result_path, encoding='utf-8') as f:
+                out_f.write(format_page_marker(filename) + "\n")
+                out_f.write(f.read() + "\n")
+            written += 1
+    return written
+
+def _worker_process(db_path, config_file, lease_seconds, poll_seconds):
+    from config.settings import load_settings
+
+    settings = load_settings(config_file=config_file)
+    count = run_worker(db_path, settings, lease_seconds, poll_seconds)
+    print(f"Worker {socket.gethostname()}:{os.getpid()} processed {count} page(s)")
+
+def main(argv=None):
+    from config.settings import load_settings
+
+    parser = argparse.ArgumentParser(description="Shared-storage work queue for multi-node processing")
+    parser.add_argument('--config', help="JSON file with settings overrides")
+    parser.add_argument('--queue', help="Job store database (default: QUEUE_DB_FILE setting)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    register_parser = subparsers.add_parser('register', help="Queue all images of a folder as a batch")
+    register_parser.add_argument('name')
+    register_parser.add_argument('input_folder')
+    register_parser.add_argument('output_folder')
+
+    worker_parser = subparsers.add_parser('worker', help="Process queued pages")
+    worker_parser.add_argument('--processes', type=int, default=1, help="Worker processes on this machine")
+    worker_parser.add_argument('--poll', type=float, default=0, help="Keep polling every N seconds (0 = exit when empty)")
+
+    subparsers.add_parser('status', help="Show page counts per batch and status")
+
+    collect_parser = subparsers.add_parser('collect', help="Join per-page results of a batch")
+    collect_parser.add_argument('name')
+    collect_parser.add_argument('output_file')
+    collect_parser.add_argument('--kind', default='recognized', choices=['recognized', 'spell_checked'],
+                                help="Per-page result to join (spell_checked needs ENABLE_POSTPROCESSING on the workers)")
+
+    args = parser.parse_args(argv)
+    settings = load_settings(config_file=args.config)
+    db_path = args.queue or settings['QUEUE_DB_FILE']
+    lease_seconds = settings.get('QUEUE_LEASE_SECONDS', 600)
+
+    if args.command == 'register':
+        store = JobStore(db_path)
+        try:
+            print(f"Queued pages: {store.register_batch(args.name, args.input_folder, args.output_folder)}")
+        finally:
+            store.close()
+    elif args.command == 'worker':
+        workers = [multiprocessing.Process(target=_worker_process,
+                                           args=(db_path, args.config, lease_seconds, args.poll))
+                   for _ in range(args.processes)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+    elif args.command == 'status':
+        store = JobStore(db_path)
+        try:
+            for name, status, count in store.status():
+                print(f"{name}\t{status}\t{count}")
+        finally:
+            store.close()
+    else:
+        print(f"Pages collected: {collect_batch(db_path, args.name, args.output_file, args.kind)}")
+
+if __name__ == "__main__":
+    main()